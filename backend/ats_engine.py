@@ -0,0 +1,455 @@
+"""ATS scoring engine.
+
+Inputs are tokenized exactly once into hashed sets/counters and every pattern
+is compiled at import time, so scoring a resume against a job description is
+linear in the size of both texts.
+"""
+import heapq
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Generic, List, Optional, Sequence, Set, Tuple, TypeVar, Union
+
+import numpy as np
+
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_RE = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b')
+WORD_RE = re.compile(r'\b[A-Za-z]+\b')
+
+BASE_SCORE = 60
+CONTACT_POINTS = 5
+SECTION_POINTS = 7
+SECTION_PRESENT_SCORE = 85
+KEYWORD_POINTS = 1
+MIN_KEYWORD_LENGTH = 4
+MAX_REPORTED_KEYWORDS = 10
+SECTIONS = ('experience', 'education', 'skills', 'summary')
+
+# Fields read by build_resume_text; used as the Mongo projection when scanning resumes
+RESUME_TEXT_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "personal_info.full_name": 1,
+    "personal_info.email": 1,
+    "personal_info.phone": 1,
+    "summary": 1,
+    "experience.title": 1,
+    "experience.company": 1,
+    "experience.description": 1,
+    "education.degree": 1,
+    "education.institution": 1,
+    "skills.skills": 1,
+}
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class JobDescription:
+    """Job description keywords, deduplicated in order of first appearance"""
+    keywords: Tuple[str, ...] = ()
+    keyword_set: FrozenSet[str] = frozenset()
+    keyword_index: Dict[str, int] = field(default_factory=dict, compare=False)
+
+
+@dataclass
+class ResumeTokens:
+    """A resume text tokenized once: lowered text for substring checks plus term counts"""
+    lowered: str = ""
+    terms: Counter = field(default_factory=Counter)
+    has_email: bool = False
+    has_phone: bool = False
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens used for keyword matching"""
+    return WORD_RE.findall(text.lower())
+
+
+@lru_cache(maxsize=256)
+def parse_job_description(job_description: str) -> JobDescription:
+    """Extract matchable keywords from a job description (memoized per text)"""
+    keywords = dict.fromkeys(
+        kw for kw in tokenize(job_description) if len(kw) >= MIN_KEYWORD_LENGTH
+    )
+    return JobDescription(
+        keywords=tuple(keywords),
+        keyword_set=frozenset(keywords),
+        keyword_index={kw: i for i, kw in enumerate(keywords)},
+    )
+
+
+def resume_text_parts(resume: Dict[str, Any]) -> List[Tuple[Tuple[str, str], str]]:
+    """Split the ATS text of a resume into independently tokenizable parts.
+
+    Keys are ``("header", "")``, ``("experience", item_id)``,
+    ``("education", item_id)`` and ``("skills", "")``. Every part ends in
+    whitespace (skills comes last), so no token, email, phone number or
+    section name can span two parts and scoring the parts separately gives
+    the same result as scoring the joined text.
+    """
+    personal_info = resume.get('personal_info') or {}
+    parts = [(("header", ""), f"""
+    {personal_info.get('full_name', '')}
+    {personal_info.get('email', '')}
+    {personal_info.get('phone', '')}
+    {resume.get('summary', '')}
+    """)]
+
+    for i, exp in enumerate(resume.get('experience', [])):
+        parts.append((("experience", exp.get('id') or str(i)),
+                      f"{exp.get('title', '')} {exp.get('company', '')} {exp.get('description', '')} "))
+
+    for i, edu in enumerate(resume.get('education', [])):
+        parts.append((("education", edu.get('id') or str(i)),
+                      f"{edu.get('degree', '')} {edu.get('institution', '')} "))
+
+    parts.append((("skills", ""), "".join(
+        " ".join(skill_group.get('skills', [])) for skill_group in resume.get('skills', [])
+    )))
+    return parts
+
+
+def build_resume_text(resume: Dict[str, Any]) -> str:
+    """Flatten a stored resume document into the text the ATS checks run on"""
+    return "".join(text for _, text in resume_text_parts(resume))
+
+
+class ATSEngine:
+    """Reusable ATS scorer; holds no per-request state so one instance can be shared"""
+
+    sections = SECTIONS
+
+    def tokenize_resume(self, resume_text: str) -> ResumeTokens:
+        lowered = resume_text.lower()
+        return ResumeTokens(
+            lowered=lowered,
+            terms=Counter(WORD_RE.findall(lowered)),
+            has_email=EMAIL_RE.search(resume_text) is not None,
+            has_phone=PHONE_RE.search(resume_text) is not None,
+        )
+
+    def score(
+        self,
+        resume: Union[str, ResumeTokens],
+        job_description: Union[str, JobDescription, None] = None,
+    ) -> Dict[str, Any]:
+        """Calculate ATS compatibility score"""
+        tokens = resume if isinstance(resume, ResumeTokens) else self.tokenize_resume(resume)
+        if isinstance(job_description, str):
+            job_description = parse_job_description(job_description) if job_description else None
+
+        matched_keywords, missing_keywords = self.match_keywords(tokens.terms, job_description)
+        present = {section for section in self.sections if section in tokens.lowered}
+        return self.assemble(
+            tokens.has_email, tokens.has_phone, present, len(matched_keywords),
+            matched_keywords[:MAX_REPORTED_KEYWORDS], missing_keywords[:MAX_REPORTED_KEYWORDS]
+        )
+
+    def assemble(
+        self,
+        has_email: bool,
+        has_phone: bool,
+        present_sections: Set[str],
+        matched_count: int,
+        matched_keywords: List[str],
+        missing_keywords: List[str],
+    ) -> Dict[str, Any]:
+        """Build the ATS result from precomputed signals"""
+        score = BASE_SCORE
+        recommendations = []
+
+        if has_email:
+            score += CONTACT_POINTS
+        else:
+            recommendations.append("Add email address")
+
+        if has_phone:
+            score += CONTACT_POINTS
+        else:
+            recommendations.append("Add phone number")
+
+        section_scores = {}
+        for section in self.sections:
+            if section in present_sections:
+                score += SECTION_POINTS
+                section_scores[section] = SECTION_PRESENT_SCORE
+            else:
+                recommendations.append(f"Add {section} section")
+                section_scores[section] = 0
+
+        score += KEYWORD_POINTS * matched_count
+
+        return {
+            "ats_score": min(score, 100),
+            "matched_keywords": matched_keywords,
+            "missing_keywords": missing_keywords,
+            "section_scores": section_scores,
+            "recommendations": recommendations,
+        }
+
+    @staticmethod
+    def match_keywords(
+        terms: Union[Counter, FrozenSet[str]], job_description: Optional[JobDescription]
+    ) -> Tuple[List[str], List[str]]:
+        """Split job keywords into (matched, missing) with O(1) membership checks"""
+        matched, missing = [], []
+        if job_description is None:
+            return matched, missing
+        for keyword in job_description.keywords:
+            (matched if keyword in terms else missing).append(keyword)
+        return matched, missing
+
+    def score_batch(
+        self, resume_texts: Sequence[str], job_description: JobDescription
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Score many resumes against one parsed job description.
+
+        Returns ``(scores, matches)`` where ``matches[i, j]`` is True when resume
+        ``i`` contains ``job_description.keywords[j]``. Scores equal ``score()``.
+        """
+        n = len(resume_texts)
+        index = job_description.keyword_index
+        matches = np.zeros((n, len(index)), dtype=bool)
+        contact = np.zeros(n, dtype=np.int32)
+        sections = np.zeros(n, dtype=np.int32)
+
+        for row, text in enumerate(resume_texts):
+            tokens = self.tokenize_resume(text)
+            contact[row] = tokens.has_email + tokens.has_phone
+            sections[row] = sum(section in tokens.lowered for section in self.sections)
+            columns = [index[term] for term in tokens.terms if term in index]
+            if columns:
+                matches[row, columns] = True
+
+        scores = (
+            BASE_SCORE
+            + CONTACT_POINTS * contact
+            + SECTION_POINTS * sections
+            + KEYWORD_POINTS * matches.sum(axis=1, dtype=np.int32)
+        )
+        return np.minimum(scores, 100), matches
+
+
+class TopK(Generic[T]):
+    """Bounded min-heap keeping the ``k`` highest-scored items seen so far"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[float, int, T]] = []
+        self._seq = 0
+
+    def would_accept(self, score: float) -> bool:
+        return len(self._heap) < self.k or score > self._heap[0][0]
+
+    def push(self, score: float, item: T) -> None:
+        # The sequence number breaks ties in favour of earlier items and keeps
+        # heapq from ever comparing payloads.
+        entry = (score, -self._seq, item)
+        self._seq += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif score > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List[Tuple[float, T]]:
+        """Items ordered by descending score"""
+        return [(score, item) for score, _, item in sorted(self._heap, reverse=True)]
+
+
+ats_engine = ATSEngine()
+
+
+class IncrementalATSScorer:
+    """ATS score over a set of text parts, updated one part at a time.
+
+    Each part is tokenized once and its contribution (term counts, contact
+    details, section names) is kept, so replacing a part only costs the size
+    of the old and new part plus the keywords whose presence flipped.
+    """
+
+    def __init__(self, job_description: Optional[JobDescription] = None, engine: ATSEngine = ats_engine):
+        self.engine = engine
+        self.job = job_description
+        self.parts: Dict[Tuple[str, str], Tuple[ResumeTokens, FrozenSet[str]]] = {}
+        self.terms: Dict[str, int] = {}
+        self.email_parts = 0
+        self.phone_parts = 0
+        self.section_parts: Counter = Counter()
+        self.matched: Set[str] = set()
+
+    def _apply(self, tokens: ResumeTokens, sections: FrozenSet[str], sign: int) -> None:
+        keywords = self.job.keyword_set if self.job else frozenset()
+        for term, count in tokens.terms.items():
+            before = self.terms.get(term, 0)
+            after = before + sign * count
+            if after:
+                self.terms[term] = after
+            else:
+                del self.terms[term]
+            if term in keywords and (before == 0) != (after == 0):
+                if after:
+                    self.matched.add(term)
+                else:
+                    self.matched.discard(term)
+        self.email_parts += sign * tokens.has_email
+        self.phone_parts += sign * tokens.has_phone
+        for section in sections:
+            self.section_parts[section] += sign
+
+    def set_part(self, key: Tuple[str, str], text: str) -> None:
+        if key in self.parts:
+            self._apply(*self.parts[key], sign=-1)
+        tokens = self.engine.tokenize_resume(text)
+        sections = frozenset(section for section in self.engine.sections if section in tokens.lowered)
+        self.parts[key] = (tokens, sections)
+        self._apply(tokens, sections, sign=1)
+
+    def remove_part(self, key: Tuple[str, str]) -> None:
+        if key in self.parts:
+            self._apply(*self.parts.pop(key), sign=-1)
+
+    def set_job_description(self, job_description: Optional[JobDescription]) -> None:
+        self.job = job_description
+        self.matched = {kw for kw in job_description.keywords if kw in self.terms} if job_description else set()
+
+    def result(self) -> Dict[str, Any]:
+        matched, missing = [], []
+        if self.job is not None:
+            matched = sorted(self.matched, key=self.job.keyword_index.__getitem__)[:MAX_REPORTED_KEYWORDS]
+            for keyword in self.job.keywords:
+                if len(missing) == MAX_REPORTED_KEYWORDS:
+                    break
+                if keyword not in self.matched:
+                    missing.append(keyword)
+        present = {section for section, count in self.section_parts.items() if count > 0}
+        return self.engine.assemble(
+            self.email_parts > 0, self.phone_parts > 0, present, len(self.matched), matched, missing
+        )
+
+
+class LiveATSSession:
+    """Server-side state of a resume being edited, scored incrementally.
+
+    Messages are section-level deltas:
+
+    * ``{"type": "update", "section": "personal_info" | "summary" | "skills", "value": ...}``
+    * ``{"type": "update", "section": "experience" | "education", "value": [...]}`` replaces the list
+    * ``{"type": "update", "section": "experience" | "education", "item_id": ..., "value": {...}}``
+      merges fields into one entry (creating it if needed)
+    * ``{"type": "remove", "section": "experience" | "education", "item_id": ...}``
+    * ``{"type": "job_description", "value": "..."}``
+    * ``{"type": "verify"}`` compares against a full recompute
+    """
+
+    item_sections = ("experience", "education")
+
+    def __init__(self, resume: Dict[str, Any], job_description: str = "", engine: ATSEngine = ats_engine):
+        self.engine = engine
+        self.resume = {
+            "personal_info": dict(resume.get("personal_info") or {}),
+            "summary": resume.get("summary", ""),
+            "experience": {self._item_key(item, i): dict(item) for i, item in enumerate(resume.get("experience", []))},
+            "education": {self._item_key(item, i): dict(item) for i, item in enumerate(resume.get("education", []))},
+            "skills": list(resume.get("skills", [])),
+        }
+        self.scorer = IncrementalATSScorer(parse_job_description(job_description) if job_description else None, engine)
+        for key, text in resume_text_parts(self._document()):
+            self.scorer.set_part(key, text)
+
+    @staticmethod
+    def _item_key(item: Dict[str, Any], index: int) -> str:
+        return item.get("id") or str(index)
+
+    def _document(self) -> Dict[str, Any]:
+        return {
+            **self.resume,
+            "experience": list(self.resume["experience"].values()),
+            "education": list(self.resume["education"].values()),
+        }
+
+    def _render(self, key: Tuple[str, str]) -> str:
+        section, item_id = key
+        if section == "header":
+            return resume_text_parts({"personal_info": self.resume["personal_info"], "summary": self.resume["summary"]})[0][1]
+        if section == "skills":
+            return resume_text_parts({"skills": self.resume["skills"]})[-1][1]
+        item = self.resume[section][item_id]
+        return resume_text_parts({section: [item]})[1][1]
+
+    def _replace_items(self, section: str, items: List[Dict[str, Any]]) -> None:
+        for item_id in list(self.resume[section]):
+            self.scorer.remove_part((section, item_id))
+        self.resume[section] = {self._item_key(item, i): dict(item) for i, item in enumerate(items)}
+        for item_id in self.resume[section]:
+            self.scorer.set_part((section, item_id), self._render((section, item_id)))
+
+    @staticmethod
+    def _check(message: Any) -> None:
+        """Raise ValueError for a malformed delta, before any state is touched"""
+        if not isinstance(message, dict):
+            raise ValueError("Message must be a JSON object")
+        kind, section, value = message.get("type"), message.get("section"), message.get("value")
+        item_id = message.get("item_id")
+        if item_id is not None and not isinstance(item_id, str):
+            raise ValueError("item_id must be a string")
+        if value is None or kind not in ("update", "job_description"):
+            return
+        if kind == "job_description" or section == "summary":
+            expected, valid = "a string", isinstance(value, str)
+        elif section == "personal_info" or (section in LiveATSSession.item_sections and item_id is not None):
+            expected, valid = "an object", isinstance(value, dict)
+        elif section == "skills":
+            expected = "a list of objects with a list of strings in 'skills'"
+            valid = isinstance(value, list) and all(
+                isinstance(group, dict)
+                and isinstance(group.get("skills", []), list)
+                and all(isinstance(skill, str) for skill in group.get("skills", []))
+                for group in value
+            )
+        elif section in LiveATSSession.item_sections:
+            expected = "a list of objects"
+            valid = isinstance(value, list) and all(isinstance(item, dict) for item in value)
+        else:
+            return
+        if not valid:
+            raise ValueError(f"value of {section or kind} must be {expected}")
+
+    def apply(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply one delta and return the updated score; malformed deltas change nothing"""
+        self._check(message)
+        kind = message.get("type")
+        section = message.get("section")
+        value = message.get("value")
+        item_id = message.get("item_id")
+
+        if kind == "job_description":
+            self.scorer.set_job_description(parse_job_description(value) if value else None)
+        elif kind == "verify":
+            return {**self.scorer.result(), "consistent": self.verify()}
+        elif kind == "update" and section in ("personal_info", "summary"):
+            if section == "personal_info":
+                self.resume["personal_info"].update(value or {})
+            else:
+                self.resume["summary"] = value or ""
+            self.scorer.set_part(("header", ""), self._render(("header", "")))
+        elif kind == "update" and section == "skills":
+            self.resume["skills"] = list(value or [])
+            self.scorer.set_part(("skills", ""), self._render(("skills", "")))
+        elif kind == "update" and section in self.item_sections and item_id is None:
+            self._replace_items(section, list(value or []))
+        elif kind == "update" and section in self.item_sections:
+            self.resume[section].setdefault(item_id, {"id": item_id}).update(value or {})
+            self.scorer.set_part((section, item_id), self._render((section, item_id)))
+        elif kind == "remove" and section in self.item_sections and item_id is not None:
+            self.resume[section].pop(item_id, None)
+            self.scorer.remove_part((section, item_id))
+        else:
+            raise ValueError(f"Unsupported message: type={kind!r} section={section!r}")
+        return self.scorer.result()
+
+    def verify(self) -> bool:
+        """Check the incremental state against a full recompute"""
+        expected = self.engine.score(build_resume_text(self._document()), self.scorer.job)
+        return expected == self.scorer.result()
@@ -0,0 +1,260 @@
+"""Bulk resume import from ZIP archives and multi-file uploads.
+
+Uploaded files are spooled to disk by the endpoint and imported by a
+background job. ZIP archives are read entry by entry, so at most
+``concurrency`` documents are held in memory at once. Each document goes
+through the caller's ``process`` coroutine (extraction + structuring) and the
+resulting resumes are upserted with ``bulk_write`` in batches. Resume ids are
+derived from the import id and entry name, so a job that is retried after a
+crash does not create duplicates.
+
+Spooled files live in a local directory, so a crashed import can only be
+recovered by a process that sees the same directory: one host, or a volume
+shared by every worker. Files of jobs that are abandoned are removed by the
+job's give-up hook, and ``sweep_spool`` clears whatever a dead host left
+behind once it is older than any job could still be waiting.
+"""
+import asyncio
+import os
+import time
+import uuid
+import zipfile
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+COPY_CHUNK_BYTES = 1024 * 1024
+
+# process(filename, content) -> (resume document, content hash)
+ProcessFn = Callable[[str, bytes], Awaitable[Tuple[Dict[str, Any], str]]]
+InsertedFn = Callable[[List[Dict[str, Any]]], Awaitable[Any]]
+ProgressFn = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+@dataclass
+class ImportEntry:
+    name: str
+    path: str
+    member: Optional[str] = None
+    size: int = 0
+
+
+def spool(source, directory: str, max_bytes: int) -> Tuple[str, int]:
+    """Copy a file object to ``directory`` in chunks; returns (path, size)"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, uuid.uuid4().hex)
+    size = 0
+    with open(path, "wb") as target:
+        while True:
+            chunk = source.read(COPY_CHUNK_BYTES)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                target.close()
+                os.remove(path)
+                raise ValueError(f"Upload exceeds the {max_bytes // (1024 * 1024)} MB import limit")
+            target.write(chunk)
+    return path, size
+
+
+def sweep_spool(directory: str, max_age_seconds: float) -> int:
+    """Remove spooled files older than ``max_age_seconds``; returns the number removed"""
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def remove_files(paths: List[str]) -> None:
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def list_entries(files: List[Dict[str, str]], max_entry_bytes: int) -> Tuple[List[ImportEntry], List[Dict[str, str]]]:
+    """Expand spooled uploads into importable entries and per-file failures"""
+    entries, failures = [], []
+    for upload in files:
+        filename, path = upload["filename"], upload["path"]
+        if filename.lower().endswith(".zip"):
+            try:
+                with zipfile.ZipFile(path) as archive:
+                    members = archive.infolist()
+            except zipfile.BadZipFile:
+                failures.append({"filename": filename, "error": "Not a valid ZIP archive"})
+                continue
+            for info in members:
+                name = info.filename
+                if info.is_dir() or name.startswith("__MACOSX/") or os.path.basename(name).startswith("."):
+                    continue
+                if not name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    failures.append({"filename": f"{filename}/{name}", "error": "Only PDF and DOCX files are supported"})
+                elif info.file_size > max_entry_bytes:
+                    failures.append({"filename": f"{filename}/{name}", "error": "File is too large"})
+                else:
+                    entries.append(ImportEntry(name=f"{filename}/{name}", path=path, member=name, size=info.file_size))
+        elif filename.lower().endswith(SUPPORTED_EXTENSIONS):
+            entries.append(ImportEntry(name=filename, path=path, size=os.path.getsize(path)))
+        else:
+            failures.append({"filename": filename, "error": "Only PDF, DOCX and ZIP files are supported"})
+    return entries, failures
+
+
+class BulkImporter:
+    """Runs one import: bounded-concurrency processing and batched upserts"""
+
+    def __init__(
+        self,
+        collection,
+        process: ProcessFn,
+        on_inserted: Optional[InsertedFn] = None,
+        concurrency: int = 8,
+        batch_size: int = 100,
+        max_entry_bytes: int = 10 * 1024 * 1024,
+        progress_interval: float = 1.0,
+    ):
+        self.collection = collection
+        self.process = process
+        self.on_inserted = on_inserted
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_entry_bytes = max_entry_bytes
+        self.progress_interval = progress_interval
+
+    def _read(self, archives: Dict[str, zipfile.ZipFile], entry: ImportEntry) -> bytes:
+        if entry.member is None:
+            with open(entry.path, "rb") as f:
+                return f.read(self.max_entry_bytes + 1)
+        # Declared sizes can lie; never read past the limit
+        with archives[entry.path].open(entry.member) as f:
+            return f.read(self.max_entry_bytes + 1)
+
+    async def run(
+        self,
+        import_id: str,
+        files: List[Dict[str, str]],
+        defaults: Optional[Dict[str, Any]] = None,
+        progress: Optional[ProgressFn] = None
+    ) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        entries, failures = await loop.run_in_executor(None, list_entries, files, self.max_entry_bytes)
+        state = {"total": len(entries) + len(failures), "processed": len(failures), "imported": 0, "duplicates": 0}
+        imported: List[Dict[str, str]] = []
+        duplicates: List[Dict[str, str]] = []
+        seen: Dict[str, str] = {}
+        batch: List[Dict[str, Any]] = []
+        # One open handle per archive, shared by the reader threads
+        archives: Dict[str, zipfile.ZipFile] = {}
+        for entry in entries:
+            if entry.member is not None and entry.path not in archives:
+                archives[entry.path] = zipfile.ZipFile(entry.path)
+        last_report = 0.0
+        flush_lock = asyncio.Lock()
+
+        async def report(force: bool = False) -> None:
+            nonlocal last_report
+            now = time.monotonic()
+            if progress is not None and (force or now - last_report >= self.progress_interval):
+                last_report = now
+                await progress({**state, "failed": len(failures)})
+
+        async def flush() -> None:
+            async with flush_lock:
+                if not batch:
+                    return
+                docs = batch[:]
+                batch.clear()
+                await self.collection.bulk_write(
+                    [UpdateOne({"id": doc["id"]}, {"$setOnInsert": doc}, upsert=True) for doc in docs],
+                    ordered=False
+                )
+                state["imported"] += len(docs)
+                if self.on_inserted is not None:
+                    await self.on_inserted(docs)
+
+        async def import_entry(entry: ImportEntry) -> None:
+            try:
+                content = await loop.run_in_executor(None, self._read, archives, entry)
+                if len(content) > self.max_entry_bytes:
+                    raise ValueError("File is too large")
+                document, content_hash = await self.process(os.path.basename(entry.name), content)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures.append({"filename": entry.name, "error": str(getattr(e, "detail", e))})
+                return
+            finally:
+                state["processed"] += 1
+
+            if content_hash in seen:
+                state["duplicates"] += 1
+                duplicates.append({"filename": entry.name, "duplicate_of": seen[content_hash]})
+                return
+            seen[content_hash] = entry.name
+            document.update(defaults or {})
+            document["id"] = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{import_id}/{entry.name}"))
+            imported.append({"filename": entry.name, "resume_id": document["id"]})
+            batch.append(document)
+            if len(batch) >= self.batch_size:
+                await flush()
+
+        async def worker(queue: asyncio.Queue) -> None:
+            while True:
+                entry = await queue.get()
+                try:
+                    if entry is None:
+                        return
+                    await import_entry(entry)
+                    await report()
+                finally:
+                    queue.task_done()
+
+        async def produce(queue: asyncio.Queue) -> None:
+            for entry in entries:
+                await queue.put(entry)
+            for _ in range(self.concurrency):
+                await queue.put(None)
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        tasks = [asyncio.create_task(produce(queue))]
+        tasks += [asyncio.create_task(worker(queue)) for _ in range(self.concurrency)]
+        try:
+            await report(force=True)
+            # A failing worker (e.g. bulk_write error) fails the whole import
+            await asyncio.gather(*tasks)
+            await flush()
+        finally:
+            for task in tasks:
+                task.cancel()
+            for archive in archives.values():
+                archive.close()
+        await report(force=True)
+        return {
+            **state,
+            "failed": len(failures),
+            "resumes": imported,
+            "duplicate_files": duplicates,
+            "failures": failures,
+        }
+
+
+async def copy_upload(upload_file, directory: str, max_bytes: int) -> Tuple[str, int]:
+    """Spool a Starlette UploadFile to disk without blocking the event loop"""
+    await upload_file.seek(0)
+    return await asyncio.get_running_loop().run_in_executor(None, spool, upload_file.file, directory, max_bytes)
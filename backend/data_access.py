@@ -0,0 +1,222 @@
+"""Data access for resumes and analysis collections.
+
+``ensure_indexes`` creates every index the API's queries rely on and is safe
+to run on each startup. Endpoints read through the finder functions below,
+each of which fetches only the fields its caller needs. ``QUERY_SHAPES``
+lists the filters those finders (and the search index and question bank,
+whose indexes are created here too) issue so ``find_unindexed_queries`` can
+check with ``explain`` that none of them falls back to a collection scan.
+Components that create their own indexes (job queue, caches) list their
+shapes in a ``query_shapes()`` method next to their ``ensure_indexes``.
+"""
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import OperationFailure
+
+from ats_engine import RESUME_TEXT_PROJECTION
+
+logger = logging.getLogger(__name__)
+
+# (collection, keys, options)
+INDEXES: List[Tuple[str, List[Tuple[str, int]], Dict[str, Any]]] = [
+    ("resumes", [("id", ASCENDING)], {"unique": True}),
+    ("ats_analyses", [("resume_id", ASCENDING)], {}),
+    ("resume_analyses", [("resume_id", ASCENDING)], {}),
+    ("search_documents", [("resume_id", ASCENDING)], {"unique": True}),
+    ("search_documents", [("indexed_at", ASCENDING)], {}),
+    ("resumes", [("updated_at", ASCENDING), ("id", ASCENDING)], {}),
+    ("ats_analyses", [("created_at", ASCENDING), ("id", ASCENDING)], {}),
+    ("resume_analyses", [("created_at", ASCENDING), ("id", ASCENDING)], {}),
+    ("resumes", [("user_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)], {}),
+    ("ats_analyses", [("resume_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)], {}),
+    ("question_bank", [("kind", ASCENDING), ("question_hash", ASCENDING)], {"unique": True}),
+    ("question_bank", [("kind", ASCENDING), ("category", ASCENDING), ("skill", ASCENDING), ("difficulty", ASCENDING)], {}),
+]
+
+# (collection, representative filter) for every query against the collections indexed above
+QUERY_SHAPES: List[Tuple[str, Dict[str, Any]]] = [
+    ("resumes", {"id": "shape-check"}),
+    ("resumes", {"id": {"$in": ["shape-check"]}}),
+    ("ats_analyses", {"resume_id": "shape-check"}),
+    ("resume_analyses", {"resume_id": "shape-check"}),
+    ("search_documents", {"resume_id": "shape-check"}),
+    ("search_documents", {"indexed_at": {"$gte": 0}}),
+    ("resumes", {"updated_at": {"$gte": 0}}),
+    ("ats_analyses", {"created_at": {"$gte": 0}}),
+    ("resume_analyses", {"created_at": {"$gte": 0}}),
+    ("resumes", {"user_id": "shape-check", "$or": [{"created_at": {"$lt": 0}}, {"created_at": 0, "id": {"$lt": ""}}]}),
+    ("ats_analyses", {"resume_id": "shape-check", "$or": [{"created_at": {"$lt": 0}}, {"created_at": 0, "id": {"$lt": ""}}]}),
+    ("question_bank", {"kind": "quiz", "category": "", "skill": "shape-check"}),
+    ("question_bank", {"kind": "quiz", "category": {"$in": [""]}, "skill": {"$in": ["shape-check"]}}),
+    ("question_bank", {"kind": "quiz", "difficulty": "Easy", "category": "", "skill": "shape-check"}),
+    ("question_bank", {
+        "kind": "quiz", "difficulty": "Easy", "category": {"$in": [""]}, "skill": {"$in": ["shape-check"]}
+    }),
+    ("question_bank", {"kind": "quiz", "question_hash": "shape-check"}),
+]
+
+RESUME_PROJECTION = {"_id": 0}
+SKILLS_PROJECTION = {"_id": 0, "skills.skills": 1}
+NAME_PROJECTION = {"_id": 0, "id": 1, "personal_info.full_name": 1}
+RESUME_SUMMARY_PROJECTION = {
+    "_id": 0, "id": 1, "user_id": 1, "personal_info.full_name": 1, "personal_info.email": 1,
+    "created_at": 1, "updated_at": 1,
+}
+ATS_SUMMARY_PROJECTION = {"_id": 0, "id": 1, "resume_id": 1, "ats_score": 1, "section_scores": 1, "created_at": 1}
+
+# Timestamp each collection's incremental export filters and orders on
+EXPORT_TIMESTAMP_FIELDS = {
+    "resumes": "updated_at",
+    "ats_analyses": "created_at",
+    "resume_analyses": "created_at",
+}
+
+
+async def ensure_indexes(db) -> None:
+    """Create required indexes; existing identical indexes are left untouched"""
+    for collection, keys, options in INDEXES:
+        try:
+            await db[collection].create_index(keys, **options)
+        except OperationFailure as e:
+            # Same keys with different options already exist; needs a manual migration
+            logger.warning("Could not create index %s on %s: %s", keys, collection, e)
+
+
+# Finders
+async def find_resume(db, resume_id: str) -> Optional[Dict[str, Any]]:
+    """Full resume document (without Mongo's _id)"""
+    return await db.resumes.find_one({"id": resume_id}, RESUME_PROJECTION)
+
+
+async def resume_exists(db, resume_id: str) -> bool:
+    return await db.resumes.find_one({"id": resume_id}, {"_id": 1}) is not None
+
+
+async def find_resume_for_ats(db, resume_id: str) -> Optional[Dict[str, Any]]:
+    """Only the fields ATS scoring reads"""
+    return await db.resumes.find_one({"id": resume_id}, RESUME_TEXT_PROJECTION)
+
+
+async def find_resume_skills(db, resume_id: str) -> Optional[List[str]]:
+    """Flattened skill list, or None when the resume does not exist"""
+    resume = await db.resumes.find_one({"id": resume_id}, SKILLS_PROJECTION)
+    if resume is None:
+        return None
+    skills = []
+    for skill_group in resume.get('skills', []):
+        skills.extend(skill_group.get('skills', []))
+    return skills
+
+
+async def update_resume_document(
+    db,
+    resume_id: str,
+    update: Dict[str, Any],
+    extra_filter: Optional[Dict[str, Any]] = None,
+    array_filters: Optional[List[Dict[str, Any]]] = None
+) -> Optional[Dict[str, Any]]:
+    """Apply ``update`` in one round trip and return the updated document"""
+    return await db.resumes.find_one_and_update(
+        {"id": resume_id, **(extra_filter or {})},
+        update,
+        projection=RESUME_PROJECTION,
+        array_filters=array_filters or None,
+        return_document=ReturnDocument.AFTER
+    )
+
+
+async def find_resume_names(db, resume_ids: Iterable[str]) -> Dict[str, str]:
+    """Map resume id -> candidate full name"""
+    names = {}
+    async for doc in db.resumes.find({"id": {"$in": list(resume_ids)}}, NAME_PROJECTION):
+        names[doc["id"]] = (doc.get("personal_info") or {}).get("full_name", "")
+    return names
+
+
+def export_cursor(
+    db,
+    collection: str,
+    since: Optional[datetime] = None,
+    projection: Optional[Dict[str, Any]] = None,
+    batch_size: int = 1000
+):
+    """Cursor over ``collection`` in (timestamp, id) order, optionally from ``since`` on"""
+    field = EXPORT_TIMESTAMP_FIELDS[collection]
+    query = {field: {"$gte": since}} if since is not None else {}
+    return db[collection].find(
+        query,
+        projection or RESUME_PROJECTION,
+        sort=[(field, ASCENDING), ("id", ASCENDING)],
+        batch_size=batch_size
+    )
+
+
+# Keyset pagination: newest first on (created_at, id), the id breaking ties
+def encode_page_token(document: Dict[str, Any]) -> str:
+    """Opaque cursor pointing just past ``document``"""
+    position = json.dumps([document["created_at"].isoformat(), document["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(position.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_page_token(token: str) -> Tuple[datetime, str]:
+    """Inverse of ``encode_page_token``; raises ValueError on a malformed cursor"""
+    try:
+        created_at, doc_id = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        return datetime.fromisoformat(created_at), str(doc_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+async def find_page(
+    db,
+    collection: str,
+    query: Dict[str, Any],
+    projection: Dict[str, Any],
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of ``collection`` and the cursor of the next page (None on the last)
+
+    Each page is a single index range scan from the cursor position, so deep
+    pages cost the same as the first one.
+    """
+    query = dict(query)
+    if cursor is not None:
+        created_at, doc_id = decode_page_token(cursor)
+        query["$or"] = [{"created_at": {"$lt": created_at}}, {"created_at": created_at, "id": {"$lt": doc_id}}]
+    documents = await db[collection].find(
+        query,
+        projection,
+        sort=[("created_at", DESCENDING), ("id", DESCENDING)],
+        limit=limit + 1
+    ).to_list(limit + 1)
+    if len(documents) <= limit:
+        return documents, None
+    documents = documents[:limit]
+    return documents, encode_page_token(documents[-1])
+
+
+# Index audit
+def _plan_stages(plan: Dict[str, Any]) -> Iterable[str]:
+    yield plan.get("stage", "")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+async def find_unindexed_queries(db, shapes: Optional[List[Tuple[str, Dict[str, Any]]]] = None) -> List[str]:
+    """Return a description of every query shape whose winning plan is a COLLSCAN"""
+    unindexed = []
+    for collection, query in shapes or QUERY_SHAPES:
+        explain = await db.command("explain", {"find": collection, "filter": query}, verbosity="queryPlanner")
+        plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        if "COLLSCAN" in _plan_stages(plan):
+            unindexed.append(f"{collection}: {query}")
+    return unindexed
@@ -0,0 +1,74 @@
+"""Content-derived resume metrics computed at write time.
+
+Readability, word count and prompt token estimate depend only on resume
+content, so they are computed once per content change and stored in the
+resume's ``derived`` subdocument with a hash of the content they came from.
+Readers compare that hash to know whether the stored values are current.
+"""
+import asyncio
+import hashlib
+from datetime import datetime
+from typing import Any, Dict
+
+import textstat
+
+from prompt_serializer import serialize_resume
+
+# Bump when the computation changes so stored values are recomputed
+DERIVED_VERSION = 1
+
+
+def analysis_text(resume: Dict[str, Any]) -> str:
+    """Free-text parts of a resume that readability is measured on"""
+    return " ".join([
+        resume.get('summary', ''),
+        " ".join([exp.get('description', '') for exp in resume.get('experience', [])]),
+        " ".join([proj.get('description', '') for proj in resume.get('projects', [])])
+    ])
+
+
+def content_hash(resume: Dict[str, Any]) -> str:
+    """SHA-256 of the resume content (ids, timestamps and whitespace excluded)"""
+    return hashlib.sha256(serialize_resume(resume).text.encode("utf-8")).hexdigest()
+
+
+def compute_derived(resume: Dict[str, Any]) -> Dict[str, Any]:
+    """Compute every derived metric for ``resume``"""
+    text = analysis_text(resume)
+    serialized = serialize_resume(resume)
+    return {
+        "content_hash": hashlib.sha256(serialized.text.encode("utf-8")).hexdigest(),
+        "readability_score": textstat.flesch_reading_ease(text) if text.strip() else 0,
+        "word_count": len(text.split()),
+        "token_estimate": serialized.tokens,
+        "version": DERIVED_VERSION,
+        "computed_at": datetime.utcnow(),
+    }
+
+
+def is_current(resume: Dict[str, Any]) -> bool:
+    """Whether the stored derived metrics match the resume's current content"""
+    derived = resume.get("derived") or {}
+    if derived.get("version") != DERIVED_VERSION:
+        return False
+    return derived.get("content_hash") == content_hash(resume)
+
+
+async def refresh_derived(db, resume: Dict[str, Any]) -> Dict[str, Any]:
+    """Recompute and store ``resume``'s derived metrics if its content changed
+
+    The write is conditional on ``updated_at`` so a slow refresh never
+    overwrites metrics of a newer edit.
+    """
+    if is_current(resume):
+        return resume["derived"]
+
+    derived = await asyncio.get_running_loop().run_in_executor(None, compute_derived, resume)
+
+    query = {"id": resume["id"]}
+    updated_at = resume.get("updated_at")
+    if isinstance(updated_at, datetime):
+        # Mongo stores milliseconds
+        query["updated_at"] = updated_at.replace(microsecond=updated_at.microsecond // 1000 * 1000)
+    await db.resumes.update_one(query, {"$set": {"derived": derived}})
+    return derived
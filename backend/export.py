@@ -0,0 +1,59 @@
+"""Streaming NDJSON export straight from Mongo cursors.
+
+Documents are encoded one per line and grouped into chunks of roughly
+``CHUNK_BYTES`` before being handed to the response, so memory stays bounded
+by one cursor batch plus one chunk no matter how large the collection is.
+Optional gzip output is produced incrementally with a streaming compressor.
+"""
+import json
+import zlib
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Tuple
+
+CHUNK_BYTES = 64 * 1024
+GZIP_LEVEL = 6
+
+
+def json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_line(document: Dict[str, Any]) -> bytes:
+    return json.dumps(document, default=json_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Dict[str, int]]:
+    """Turn ``"id,personal_info.full_name"`` into a projection; None means all fields"""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    if any("$" in name or name == "_id" for name in names):
+        raise ValueError("Invalid field name in fields")
+    return {"_id": 0, **{name: 1 for name in names}}
+
+
+async def ndjson_chunks(sources: Iterable[Tuple[AsyncIterator[Dict[str, Any]], Optional[Dict[str, Any]]]]) -> AsyncIterator[bytes]:
+    """Yield NDJSON chunks for every document of each (cursor, extra fields) source in order"""
+    buffer = bytearray()
+    for cursor, extra in sources:
+        async for document in cursor:
+            if extra:
+                document.update(extra)
+            buffer += encode_line(document)
+            if len(buffer) >= CHUNK_BYTES:
+                yield bytes(buffer)
+                buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes], level: int = GZIP_LEVEL) -> AsyncIterator[bytes]:
+    """Gzip a byte stream incrementally"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,210 @@
+"""Resume text extraction off the event loop.
+
+PDF/DOCX parsing is CPU-bound, so it runs in a process pool. Large PDFs are
+parsed once, split into small per-page-range PDFs, and those are extracted
+in parallel and joined in order. Size, page-count and wall-clock guards keep
+one upload from tying up the pool. A timed-out extraction retires its pool:
+new documents go to a fresh pool, and the old one is terminated (freeing
+the stuck worker) once the other documents still running in it finish.
+The module-level functions are what the worker processes execute.
+"""
+import asyncio
+import io
+import logging
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Set, Tuple
+
+import PyPDF2
+import docx
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionError(Exception):
+    """Document could not be extracted; ``status_code`` is the HTTP status to report"""
+    status_code = 400
+
+
+class ExtractionLimitError(ExtractionError):
+    status_code = 413
+
+
+class ExtractionTimeoutError(ExtractionError):
+    status_code = 504
+
+
+class ExtractionCrashError(ExtractionError):
+    """A worker process died; a server-side failure, not a bad upload"""
+    status_code = 500
+
+
+# Worker-side functions (must stay importable top-level callables)
+def _pages_text(pages) -> str:
+    return "".join((page.extract_text() or "") + "\n" for page in pages)
+
+
+def split_pdf(file_content: bytes, pages_per_task: int, max_pages: int) -> Tuple[int, str, List[bytes]]:
+    """Parse a PDF once: (page count, text, parts)
+
+    A PDF that fits one task is extracted right away; a larger one is split
+    into one small PDF per page range, so range tasks never re-parse the
+    whole file. Over ``max_pages`` nothing is extracted.
+    """
+    pages = PyPDF2.PdfReader(io.BytesIO(file_content)).pages
+    page_count = len(pages)
+    if page_count > max_pages:
+        return page_count, "", []
+    if page_count <= pages_per_task:
+        return page_count, _pages_text(pages), []
+    parts = []
+    for start in range(0, page_count, pages_per_task):
+        writer = PyPDF2.PdfWriter()
+        for i in range(start, min(start + pages_per_task, page_count)):
+            writer.add_page(pages[i])
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        parts.append(buffer.getvalue())
+    return page_count, "", parts
+
+
+def parse_pdf(file_content: bytes) -> str:
+    """Extract text from PDF file"""
+    return _pages_text(PyPDF2.PdfReader(io.BytesIO(file_content)).pages)
+
+
+def parse_docx(file_content: bytes) -> str:
+    """Extract text from DOCX file"""
+    doc = docx.Document(io.BytesIO(file_content))
+    return "".join(paragraph.text + "\n" for paragraph in doc.paragraphs)
+
+
+class DocumentExtractor:
+    """Runs document extraction in a lazily created process pool"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        pages_per_task: int = 8,
+        timeout: float = 30.0,
+        max_pages: int = 50,
+        max_bytes: int = 10 * 1024 * 1024,
+    ):
+        self.max_workers = max_workers
+        self.pages_per_task = pages_per_task
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Tasks running per pool, and pools waiting for theirs to finish before termination
+        self._tasks: Counter = Counter()
+        self._retired: Set[ProcessPoolExecutor] = set()
+        self.pending = 0
+        self.counters = {"documents": 0, "failures": 0, "timeouts": 0, "rejected": 0, "recycled": 0}
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn, not fork: the server process has Mongo/IO threads that must
+            # not be duplicated into workers.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    async def _run(self, pools: List[ProcessPoolExecutor], fn, *args):
+        """Run ``fn`` in the current pool, recording the pool in ``pools``"""
+        loop = asyncio.get_running_loop()
+        pool = self._executor()
+        pools.append(pool)
+        self.pending += 1
+        self._tasks[pool] += 1
+        try:
+            return await loop.run_in_executor(pool, fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a hostile file); start a fresh pool next time
+            if self._pool is pool:
+                self._pool = None
+            raise ExtractionCrashError("Document extraction worker crashed")
+        finally:
+            self.pending -= 1
+            self._tasks[pool] -= 1
+            if pool in self._retired and not self._tasks[pool]:
+                self._terminate(pool)
+
+    def _retire(self, pool: ProcessPoolExecutor) -> None:
+        """Send new work to a fresh pool and terminate ``pool`` once it is idle
+
+        A timed-out task keeps its worker busy (a hostile PDF can parse for
+        minutes), and cancelling the future does not stop it. Terminating
+        the pool right away would fail every other document running in it,
+        so that waits until they are done.
+        """
+        if self._pool is pool:
+            self._pool = None
+        if pool in self._retired:
+            return
+        self._retired.add(pool)
+        self.counters["recycled"] += 1
+        if not self._tasks[pool]:
+            self._terminate(pool)
+
+    def _terminate(self, pool: ProcessPoolExecutor) -> None:
+        self._retired.discard(pool)
+        del self._tasks[pool]
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _extract_pdf(self, pools: List[ProcessPoolExecutor], file_content: bytes) -> str:
+        page_count, text, parts = await self._run(pools, split_pdf, file_content, self.pages_per_task, self.max_pages)
+        if page_count > self.max_pages:
+            raise ExtractionLimitError(f"PDF has {page_count} pages; the limit is {self.max_pages}")
+        if not parts:
+            return text
+        chunks = await asyncio.gather(*(self._run(pools, parse_pdf, part) for part in parts))
+        return "".join(chunks)
+
+    async def extract(self, filename: str, file_content: bytes) -> str:
+        """Extract text from an uploaded PDF or DOCX"""
+        if len(file_content) > self.max_bytes:
+            self.counters["rejected"] += 1
+            raise ExtractionLimitError(f"File exceeds the {self.max_bytes // (1024 * 1024)} MB limit")
+
+        is_pdf = filename.lower().endswith('.pdf')
+        pools: List[ProcessPoolExecutor] = []
+        job = self._extract_pdf(pools, file_content) if is_pdf else self._run(pools, parse_docx, file_content)
+        self.counters["documents"] += 1
+        try:
+            return await asyncio.wait_for(job, self.timeout)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            for pool in set(pools):
+                self._retire(pool)
+            raise ExtractionTimeoutError(f"Extraction took longer than {self.timeout}s")
+        except ExtractionLimitError:
+            self.counters["rejected"] += 1
+            raise
+        except ExtractionError:
+            self.counters["failures"] += 1
+            raise
+        except Exception as e:
+            self.counters["failures"] += 1
+            raise ExtractionError(f"Error parsing {'PDF' if is_pdf else 'DOCX'}: {str(e)}")
+
+    def shutdown(self) -> None:
+        for pool in list(self._retired):
+            self._terminate(pool)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            **self.counters,
+            "pending": self.pending,
+            "retired_pools": len(self._retired),
+            "max_workers": self.max_workers,
+        }
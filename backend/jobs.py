@@ -0,0 +1,271 @@
+"""Background job queue for long-running AI work.
+
+Jobs are persisted in the ``jobs`` collection and executed by a bounded pool
+of in-process worker tasks. A worker claims a job atomically and holds a
+lease that it renews while the job runs. Queued jobs are leased too: the
+process holding one in its local queue renews the lease on every sweep, so
+only jobs whose process died (or whose running lease expired) are taken over
+by another sweep, and work survives a worker restart.
+"""
+import asyncio
+import logging
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+# Called with a job's params when it is abandoned after max_attempts, to release its resources
+GiveUpHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+# Id of the job the current task is running, for handlers that report progress
+current_job_id: ContextVar[Optional[str]] = ContextVar("current_job_id", default=None)
+
+
+class JobQueueFullError(Exception):
+    """Raised when the local queue cannot accept more jobs"""
+
+
+class JobQueue:
+    """Mongo-persisted job queue with leased, in-process workers"""
+
+    def __init__(
+        self,
+        collection,
+        workers: int = 4,
+        max_queued: int = 100,
+        lease_seconds: float = 60,
+        orphan_after_seconds: float = 300,
+        sweep_interval: float = 30,
+        retention_seconds: int = 7 * 86400,
+        max_attempts: int = 3,
+    ):
+        self.collection = collection
+        self.workers = workers
+        self.max_queued = max_queued
+        self.lease_seconds = lease_seconds
+        self.orphan_after_seconds = orphan_after_seconds
+        self.sweep_interval = sweep_interval
+        self.retention_seconds = retention_seconds
+        self.max_attempts = max_attempts
+        self.handlers: Dict[str, JobHandler] = {}
+        self.give_up_handlers: Dict[str, GiveUpHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Ids waiting in this process's local queue, whose queued lease it renews
+        self._pending: Set[str] = set()
+        self.counters = {"submitted": 0, "succeeded": 0, "failed": 0, "recovered": 0, "rejected": 0}
+
+    def register(self, kind: str, handler: JobHandler, on_give_up: Optional[GiveUpHandler] = None) -> None:
+        self.handlers[kind] = handler
+        if on_give_up is not None:
+            self.give_up_handlers[kind] = on_give_up
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("id", unique=True)
+        await self.collection.create_index([("status", 1), ("lease_expires_at", 1)])
+        await self.collection.create_index("finished_at", expireAfterSeconds=self.retention_seconds)
+
+    def query_shapes(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """(collection, representative filter) for every query this queue issues"""
+        name = self.collection.name
+        return [
+            (name, {"id": "shape-check"}),
+            (name, {"id": "shape-check", "status": "queued"}),
+            (name, {"id": {"$in": ["shape-check"]}, "status": "queued"}),
+            (name, {"status": {"$in": ["queued", "running"]}, "lease_expires_at": {"$lt": 0}}),
+            (name, {"status": "queued", "lease_expires_at": {"$exists": False}, "created_at": {"$lt": 0}}),
+        ]
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweeper()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, kind: str, params: Dict[str, Any]) -> str:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if self._queue is None or self._queue.full():
+            self.counters["rejected"] += 1
+            raise JobQueueFullError("Job queue is full")
+
+        job_id = str(uuid.uuid4())
+        now = datetime.utcnow()
+        await self.collection.insert_one({
+            "id": job_id,
+            "kind": kind,
+            "status": "queued",
+            "params": params,
+            "result": None,
+            "error": None,
+            "attempts": 0,
+            "created_at": now,
+            "lease_expires_at": now + timedelta(seconds=self.orphan_after_seconds),
+        })
+        self._pending.add(job_id)
+        self._queue.put_nowait(job_id)
+        self.counters["submitted"] += 1
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"id": job_id}, {"_id": 0, "params": 0})
+
+    async def update_progress(self, job_id: str, progress: Dict[str, Any]) -> None:
+        await self.collection.update_one({"id": job_id}, {"$set": {"progress": progress}})
+
+    async def _claim(self, job_id: str) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {"id": job_id, "status": "queued"},
+            {
+                "$set": {
+                    "status": "running",
+                    "started_at": now,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                },
+                "$inc": {"attempts": 1},
+            },
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _renew_lease(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await self.collection.update_one(
+                {"id": job_id, "status": "running"},
+                {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=self.lease_seconds)}}
+            )
+
+    async def _finish(self, job_id: str, status: str, result: Any = None, error: Any = None) -> None:
+        await self.collection.update_one(
+            {"id": job_id},
+            {
+                "$set": {"status": status, "result": result, "error": error, "finished_at": datetime.utcnow()},
+                "$unset": {"params": "", "lease_expires_at": ""},
+            }
+        )
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        renew = asyncio.create_task(self._renew_lease(job_id))
+        token = current_job_id.set(job_id)
+        try:
+            result = await self.handlers[job["kind"]](job.get("params") or {})
+        except asyncio.CancelledError:
+            # Shutting down: leave the job running so its lease expires and it is retried
+            raise
+        except Exception as e:
+            # HTTP-style errors (status_code/detail) are reported as-is
+            status_code = getattr(e, "status_code", 500)
+            if status_code >= 500:
+                logger.exception("Job %s (%s) failed", job_id, job["kind"])
+            self.counters["failed"] += 1
+            error = {"status_code": status_code, "detail": str(getattr(e, "detail", e))}
+            await self._finish(job_id, "failed", error=error)
+        else:
+            self.counters["succeeded"] += 1
+            await self._finish(job_id, "succeeded", result=result)
+        finally:
+            current_job_id.reset(token)
+            renew.cancel()
+
+    async def _give_up(self, job: Dict[str, Any]) -> None:
+        on_give_up = self.give_up_handlers.get(job["kind"])
+        if on_give_up is None:
+            return
+        try:
+            await on_give_up(job.get("params") or {})
+        except Exception:
+            logger.exception("Cleanup of abandoned job %s (%s) failed", job["id"], job["kind"])
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self._pending.discard(job_id)
+            try:
+                job = await self._claim(job_id)
+                if job is None:
+                    continue
+                if job["attempts"] > self.max_attempts:
+                    # Crashed the worker every time it ran; stop retrying it
+                    self.counters["failed"] += 1
+                    error = {"status_code": 500, "detail": f"Gave up after {self.max_attempts} attempts"}
+                    await self._finish(job_id, "failed", error=error)
+                    await self._give_up(job)
+                    continue
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job worker error for %s", job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _renew_queued(self, now: datetime) -> None:
+        if self._pending:
+            await self.collection.update_many(
+                {"id": {"$in": list(self._pending)}, "status": "queued"},
+                {"$set": {"lease_expires_at": now + timedelta(seconds=self.orphan_after_seconds)}}
+            )
+
+    async def recover(self) -> int:
+        """Renew the leases of locally queued jobs, then take over jobs whose lease expired"""
+        now = datetime.utcnow()
+        await self._renew_queued(now)
+        recovered = 0
+        query = {"$or": [
+            {"status": {"$in": ["queued", "running"]}, "lease_expires_at": {"$lt": now}},
+            # Queued before queued jobs carried a lease
+            {
+                "status": "queued",
+                "lease_expires_at": {"$exists": False},
+                "created_at": {"$lt": now - timedelta(seconds=self.orphan_after_seconds)},
+            },
+        ]}
+        async for job in self.collection.find(query, {"id": 1, "status": 1, "lease_expires_at": 1}):
+            if self._queue.full():
+                break
+            if job["id"] in self._pending:
+                continue
+            # Compare-and-swap on the expired lease, so one process takes the job over
+            result = await self.collection.update_one(
+                {"id": job["id"], "status": job["status"], "lease_expires_at": job.get("lease_expires_at")},
+                {"$set": {
+                    "status": "queued",
+                    "lease_expires_at": now + timedelta(seconds=self.orphan_after_seconds),
+                }}
+            )
+            if not result.modified_count:
+                continue
+            self._pending.add(job["id"])
+            self._queue.put_nowait(job["id"])
+            recovered += 1
+        self.counters["recovered"] += recovered
+        return recovered
+
+    async def _sweeper(self) -> None:
+        while True:
+            try:
+                await self.recover()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job recovery sweep failed")
+            await asyncio.sleep(self.sweep_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "queued": self.queued, "workers": self.workers, "max_queued": self.max_queued}
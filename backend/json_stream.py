@@ -0,0 +1,173 @@
+"""Incremental extraction of JSON array items from a streamed LLM response.
+
+The model answers with one JSON object whose values are lists, e.g.
+``{"pros": [...], "cons": [...]}``. ``JSONItemStream`` is fed text chunks as
+they arrive and yields ``(key, item)`` for every list element under a
+top-level key as soon as that element is complete, without waiting for the
+rest of the document. Text before the opening brace (prose, code fences) is
+ignored.
+
+``extract_json`` runs the same scanner over a complete response, so the
+object is found in one linear pass without regex backtracking, and falls
+back to ``repair_json`` for the usual LLM defects (trailing commas, an
+answer cut off before its closing brackets).
+"""
+import json
+import re
+from typing import Any, Iterable, List, Optional, Tuple
+
+TRAILING_COMMA_RE = re.compile(r',(\s*[}\]])')
+
+
+class JSONItemStream:
+    """Push parser emitting complete items of top-level JSON arrays"""
+
+    def __init__(self, keys: Optional[Iterable[str]] = None):
+        self.keys = set(keys) if keys is not None else None
+        self.buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._current_key: Optional[str] = None
+        self._item_start: Optional[int] = None
+        self._in_array = False
+        self._object_start: Optional[int] = None
+        self._object_end: Optional[int] = None
+
+    @property
+    def complete(self) -> bool:
+        return self._object_end is not None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk and return the items it completed"""
+        self.buffer += chunk
+        items = []
+        buffer = self.buffer
+        for pos in range(self._pos, len(buffer)):
+            if self._object_end is not None:
+                break
+            char = buffer[pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = buffer[self._string_start + 1:pos]
+                continue
+
+            if self._depth == 0:
+                # Skip any preamble until the top-level object opens
+                if char == "{":
+                    self._depth = 1
+                    self._object_start = pos
+                continue
+
+            if self._in_array and self._depth == 2 and self._item_start is None and char not in " \t\r\n,]":
+                self._item_start = pos
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif char == ":" and self._depth == 1:
+                self._current_key = self._last_string
+            elif char in "{[":
+                if self._depth == 1:
+                    self._in_array = char == "["
+                    self._item_start = None
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 2 and self._in_array:
+                    self._emit(pos, items)
+                    self._in_array = False
+                self._depth -= 1
+                if self._depth == 0:
+                    self._object_end = pos + 1
+            elif char == "," and self._depth == 2 and self._in_array:
+                self._emit(pos, items)
+
+        self._pos = len(buffer)
+        return items
+
+    def _emit(self, end: int, items: List[Tuple[str, Any]]) -> None:
+        start, self._item_start = self._item_start, None
+        if start is None or self._current_key is None:
+            return
+        if self.keys is not None and self._current_key not in self.keys:
+            return
+        try:
+            items.append((self._current_key, json.loads(self.buffer[start:end])))
+        except json.JSONDecodeError:
+            # Malformed item; the final parse decides whether the whole
+            # response is usable.
+            pass
+
+    def result(self) -> Optional[Any]:
+        """The complete top-level object, or None if it never closed or is invalid"""
+        if self._object_start is None or self._object_end is None:
+            return None
+        try:
+            return json.loads(self.buffer[self._object_start:self._object_end])
+        except json.JSONDecodeError:
+            return None
+
+
+def repair_json(text: str) -> Optional[Any]:
+    """Parse the first JSON object in ``text`` after fixing trailing commas and unclosed brackets"""
+    start = text.find("{")
+    if start < 0:
+        return None
+    text = TRAILING_COMMA_RE.sub(r"\1", text[start:])
+
+    closers = []
+    in_string = escape = False
+    end = len(text)
+    for pos, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            closers.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if not closers:
+                end = pos
+                break
+            closers.pop()
+            if not closers:
+                end = pos + 1
+                break
+
+    repaired = text[:end]
+    if closers:
+        # Cut off mid-answer: close the open string and brackets
+        repaired = repaired.rstrip()
+        if in_string:
+            repaired += '"'
+        repaired = repaired.rstrip(",") + "".join(reversed(closers))
+    try:
+        return json.loads(repaired)
+    except json.JSONDecodeError:
+        return None
+
+
+def extract_json(text: str) -> Tuple[Optional[Any], bool]:
+    """Return (first JSON object in ``text``, whether it needed repair)"""
+    parser = JSONItemStream()
+    parser.feed(text)
+    payload = parser.result()
+    if payload is not None:
+        return payload, False
+    payload = repair_json(text)
+    return payload, payload is not None
@@ -0,0 +1,113 @@
+"""Two-tier cache for LLM responses.
+
+Tier one is an in-process LRU with size and TTL eviction. Tier two is a Mongo
+collection with a TTL index, shared by every uvicorn worker. Entries are keyed
+by a hash of (model, system message, prompt).
+"""
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """Least-recently-used mapping whose entries also expire after ``ttl`` seconds"""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class LLMResponseCache:
+    """In-process LRU in front of a Mongo TTL collection"""
+
+    def __init__(self, collection, max_size: int = 1024, memory_ttl: float = 3600, ttl: int = 86400):
+        self.collection = collection
+        self.memory = LRUCache(max_size=max_size, ttl=memory_ttl)
+        self.ttl = ttl
+        self.counters = {"memory_hits": 0, "mongo_hits": 0, "misses": 0, "writes": 0, "errors": 0}
+
+    @staticmethod
+    def make_key(model: str, system_message: str, prompt: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, system_message, prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("created_at", expireAfterSeconds=self.ttl)
+
+    def query_shapes(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """(collection, representative filter) for every query this cache issues"""
+        return [(self.collection.name, {"_id": "shape-check"})]
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.counters["memory_hits"] += 1
+            return value
+
+        try:
+            document = await self.collection.find_one({"_id": key}, {"response": 1})
+        except PyMongoError as e:
+            self.counters["errors"] += 1
+            logger.warning("LLM cache lookup failed: %s", e)
+            document = None
+
+        if document is None:
+            self.counters["misses"] += 1
+            return None
+
+        self.counters["mongo_hits"] += 1
+        self.memory.set(key, document["response"])
+        return document["response"]
+
+    async def set(self, key: str, value: str, model: str = "") -> None:
+        self.memory.set(key, value)
+        try:
+            await self.collection.update_one(
+                {"_id": key},
+                {"$set": {"response": value, "model": model, "created_at": datetime.utcnow()}},
+                upsert=True
+            )
+            self.counters["writes"] += 1
+        except PyMongoError as e:
+            self.counters["errors"] += 1
+            logger.warning("LLM cache write failed: %s", e)
+
+    def stats(self) -> Dict[str, float]:
+        hits = self.counters["memory_hits"] + self.counters["mongo_hits"]
+        lookups = hits + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+        }
@@ -0,0 +1,162 @@
+"""Shared LLM client with a global concurrency cap and per-endpoint budgets.
+
+Callers wait in a bounded queue for a slot; when the queue is full, or no
+slot frees up within ``queue_timeout`` seconds, ``LLMSaturatedError`` is
+raised so the API can fail fast with a 503 instead of piling up upstream calls.
+Endpoint budgets are caps inside the global limit, not reservations: they
+may sum to more than ``max_in_flight``, but a budget that reaches it would
+let one endpoint hold every slot, so that is rejected.
+Which model serves a request is decided by the ``ProviderRouter``.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from llm_providers import ProviderRouter
+
+logger = logging.getLogger(__name__)
+
+
+class LLMSaturatedError(Exception):
+    """Raised when no LLM slot is available within the queue limits"""
+
+
+def parse_budgets(spec: str) -> Dict[str, int]:
+    """Parse ``"upload=4,suggestions=8"`` into ``{"upload": 4, "suggestions": 8}``"""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, limit = item.partition("=")
+        budgets[name.strip()] = int(limit)
+    return budgets
+
+
+class LLMClient:
+    """Long-lived LLM client; create one per process and share it"""
+
+    def __init__(
+        self,
+        router: ProviderRouter,
+        system_message: str,
+        max_in_flight: int = 16,
+        max_waiting: int = 64,
+        queue_timeout: float = 10.0,
+        endpoint_budgets: Optional[Dict[str, int]] = None,
+    ):
+        self.router = router
+        self.system_message = system_message
+        self.max_in_flight = max_in_flight
+        self.max_waiting = max_waiting
+        self.queue_timeout = queue_timeout
+        self.endpoint_budgets = dict(endpoint_budgets or {})
+        too_large = [name for name, limit in self.endpoint_budgets.items() if limit >= max_in_flight]
+        if too_large:
+            raise ValueError(
+                f"LLM endpoint budgets must be below the global limit of {max_in_flight}: {', '.join(too_large)}"
+            )
+        # Semaphores are created lazily so they bind to the running event loop
+        self._global: Optional[asyncio.Semaphore] = None
+        self._endpoints: Dict[str, asyncio.Semaphore] = {}
+        self.in_flight = 0
+        self.waiting = 0
+        self.counters = {"requests": 0, "rejected": 0, "timeouts": 0, "errors": 0}
+
+    def primary(self, endpoint: str = "default") -> str:
+        """Name of the provider that answers ``endpoint`` when no fallback is needed"""
+        return self.router.chain(endpoint)[0]
+
+    def model_name(self, endpoint: str = "default") -> str:
+        """Model that answers ``endpoint`` when no fallback is needed"""
+        return self.router.primary(endpoint).model_name
+
+    def _semaphores(self, endpoint: str):
+        if self._global is None:
+            self._global = asyncio.Semaphore(self.max_in_flight)
+        semaphores = []
+        if endpoint in self.endpoint_budgets:
+            if endpoint not in self._endpoints:
+                self._endpoints[endpoint] = asyncio.Semaphore(self.endpoint_budgets[endpoint])
+            semaphores.append(self._endpoints[endpoint])
+        semaphores.append(self._global)
+        return semaphores
+
+    @asynccontextmanager
+    async def slot(self, endpoint: str = "default") -> AsyncIterator[None]:
+        """Hold one upstream slot for ``endpoint``, waiting at most ``queue_timeout``"""
+        if self.waiting >= self.max_waiting:
+            self.counters["rejected"] += 1
+            raise LLMSaturatedError("LLM request queue is full")
+
+        deadline = time.monotonic() + self.queue_timeout
+        acquired = []
+        self.waiting += 1
+        try:
+            # Endpoint budget first, so a busy endpoint queues on its own
+            # budget instead of holding global slots other endpoints need.
+            for semaphore in self._semaphores(endpoint):
+                if semaphore.locked():
+                    await asyncio.wait_for(semaphore.acquire(), max(deadline - time.monotonic(), 0))
+                else:
+                    await semaphore.acquire()
+                acquired.append(semaphore)
+        except BaseException as e:
+            # Timed out or cancelled while queued: give back what we already hold
+            for semaphore in acquired:
+                semaphore.release()
+            if isinstance(e, asyncio.TimeoutError):
+                self.counters["timeouts"] += 1
+                raise LLMSaturatedError(f"No LLM capacity for '{endpoint}' within {self.queue_timeout}s")
+            raise
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            for semaphore in reversed(acquired):
+                semaphore.release()
+
+    async def _send(self, prompt: str, endpoint: str) -> Tuple[str, str]:
+        return await self.router.complete(prompt, self.system_message, endpoint)
+
+    async def complete(self, prompt: str, endpoint: str = "default") -> Tuple[str, str]:
+        """(response, name of the provider that answered)"""
+        async with self.slot(endpoint):
+            self.counters["requests"] += 1
+            try:
+                return await self._send(prompt, endpoint)
+            except Exception:
+                self.counters["errors"] += 1
+                raise
+
+    async def _stream(self, prompt: str, endpoint: str) -> AsyncIterator[str]:
+        async for chunk in self.router.stream(prompt, self.system_message, endpoint):
+            yield chunk
+
+    async def stream(self, prompt: str, endpoint: str = "default") -> AsyncIterator[str]:
+        """Yield completion text chunks as the provider produces them"""
+        async with self.slot(endpoint):
+            self.counters["requests"] += 1
+            try:
+                async for chunk in self._stream(prompt, endpoint):
+                    yield chunk
+            except Exception:
+                self.counters["errors"] += 1
+                raise
+
+    async def aclose(self) -> None:
+        await self.router.aclose()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            **self.counters,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_in_flight": self.max_in_flight,
+            "max_waiting": self.max_waiting,
+            "endpoint_budgets": self.endpoint_budgets,
+            "routing": self.router.stats(),
+        }
@@ -0,0 +1,152 @@
+"""Schema validation and repair of JSON answers from the LLM.
+
+Each AI endpoint declares a Pydantic schema for its answer. ``parse_response``
+extracts the JSON object from the raw text, validates it, and when that
+fails sends a short repair prompt (the broken answer plus the validation
+errors, without the original context) instead of re-running the whole
+generation. Malformed list elements are dropped locally first when the
+rest of the answer is valid. ``ParseMetrics`` counts outcomes per endpoint.
+"""
+import json
+import typing
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from json_stream import extract_json
+
+# The repair prompt only needs the answer itself; anything longer is cut
+MAX_REPAIR_INPUT_CHARS = 16000
+
+OUTCOMES = ("valid", "repaired_locally", "repaired_by_llm", "invalid_json", "schema_errors", "failed", "invalid_items")
+
+
+class LLMResponseError(Exception):
+    """Raised when an LLM answer cannot be turned into a valid payload"""
+
+
+class ParseMetrics:
+    """Per-endpoint counters of parse and repair outcomes"""
+
+    def __init__(self):
+        self.counters: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, endpoint: str, outcome: str, count: int = 1) -> None:
+        self.counters[endpoint][outcome] += count
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        stats = {}
+        for endpoint, counter in self.counters.items():
+            stats[endpoint] = {outcome: counter[outcome] for outcome in OUTCOMES}
+            parsed = counter["valid"] + counter["repaired_locally"] + counter["repaired_by_llm"]
+            total = parsed + counter["failed"]
+            stats[endpoint]["success_rate"] = round(parsed / total, 4) if total else 0.0
+        return stats
+
+
+@lru_cache(maxsize=None)
+def item_adapters(schema: Type[BaseModel]) -> Dict[str, TypeAdapter]:
+    """TypeAdapters for the element type of every list field of ``schema``"""
+    adapters = {}
+    for name, field in schema.model_fields.items():
+        annotation = field.annotation
+        if typing.get_origin(annotation) is typing.Union:
+            annotation = next(arg for arg in typing.get_args(annotation) if arg is not type(None))
+        if typing.get_origin(annotation) is list:
+            adapters[name] = TypeAdapter(typing.get_args(annotation)[0])
+    return adapters
+
+
+def dump(schema: Type[BaseModel], payload: Any) -> Dict[str, Any]:
+    """Validate ``payload`` and return only the fields the model actually sent"""
+    return schema.model_validate(payload).dict(exclude_unset=True)
+
+
+def prune_invalid_items(schema: Type[BaseModel], payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop list elements that do not validate, keeping the rest of the answer
+
+    A list that loses every element is left as is so the answer still fails.
+    """
+    pruned = dict(payload)
+    for name, adapter in item_adapters(schema).items():
+        items = payload.get(name)
+        if not isinstance(items, list):
+            continue
+        valid = []
+        for item in items:
+            try:
+                adapter.validate_python(item)
+            except ValidationError:
+                continue
+            valid.append(item)
+        if valid or not items:
+            pruned[name] = valid
+    return pruned
+
+
+def repair_prompt(schema: Type[BaseModel], response: str, error: str) -> str:
+    return f"""
+    The following answer was supposed to be a single JSON object matching this JSON schema:
+    {json.dumps(schema.model_json_schema())}
+
+    It could not be used because: {error}
+
+    Answer:
+    {response[:MAX_REPAIR_INPUT_CHARS]}
+
+    Return only the corrected JSON object. Keep the existing content; do not add commentary.
+    """
+
+
+async def parse_response(
+    response: str,
+    schema: Type[BaseModel],
+    complete: Callable[[str], Awaitable[str]],
+    metrics: ParseMetrics,
+    endpoint: str,
+    payload: Optional[Any] = None
+) -> Dict[str, Any]:
+    """Validate an LLM answer against ``schema``, repairing it once if needed
+
+    ``payload`` skips extraction when the caller already parsed the object
+    (e.g. a streaming parser). ``complete`` sends the repair prompt.
+    """
+    repaired = False
+    if payload is None:
+        payload, repaired = extract_json(response)
+
+    if payload is None:
+        metrics.record(endpoint, "invalid_json")
+        error = "no complete JSON object found"
+    else:
+        try:
+            result = dump(schema, payload)
+        except ValidationError as e:
+            metrics.record(endpoint, "schema_errors")
+            error = str(e)
+            result = None
+            if isinstance(payload, dict):
+                try:
+                    result = dump(schema, prune_invalid_items(schema, payload))
+                except ValidationError:
+                    pass
+            if result is not None:
+                metrics.record(endpoint, "repaired_locally")
+                return result
+        else:
+            metrics.record(endpoint, "repaired_locally" if repaired else "valid")
+            return result
+
+    try:
+        fixed, _ = extract_json(await complete(repair_prompt(schema, response, error)))
+        result = dump(schema, fixed)
+    except ValidationError as e:
+        metrics.record(endpoint, "failed")
+        raise LLMResponseError(f"Invalid AI response: {e.error_count()} validation errors") from e
+    except Exception:
+        metrics.record(endpoint, "failed")
+        raise
+    metrics.record(endpoint, "repaired_by_llm")
+    return result
@@ -0,0 +1,318 @@
+"""Pluggable LLM providers with per-endpoint routing and latency-budget fallback.
+
+A provider is one configured model behind ``complete``/``stream``. Providers
+are registered by name in a ``ProviderRouter``, and each endpoint routes to
+a chain of them (``suggestions=fast>default``). With a latency budget, every
+provider but the last gets that many seconds (to the first chunk when
+streaming) before the router moves on, and a provider whose recent p95
+already exceeds the budget is skipped. Routing decisions and per-provider
+latency are kept for ``stats()``.
+"""
+import abc
+import asyncio
+import json
+import time
+import uuid
+from collections import Counter, defaultdict, deque
+from typing import AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+import httpx
+from emergentintegrations.llm.chat import LlmChat, UserMessage
+
+from json_stream import extract_json
+
+GEMINI_STREAM_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:streamGenerateContent"
+
+# Latency samples older than this no longer count, so a skipped provider is retried
+LATENCY_WINDOW_SECONDS = 60.0
+LATENCY_SAMPLES = 256
+# A provider is only skipped for being slow once it has this many recent samples
+MIN_LATENCY_SAMPLES = 20
+
+
+class LLMProvider(abc.ABC):
+    """One model behind a uniform completion interface"""
+
+    kind = "base"
+
+    def __init__(self, model: str = ""):
+        self.model = model
+
+    @property
+    def model_name(self) -> str:
+        return f"{self.kind}/{self.model}" if self.model else self.kind
+
+    @abc.abstractmethod
+    async def complete(self, prompt: str, system_message: str) -> str:
+        """Full response text for ``prompt``"""
+
+    async def stream(self, prompt: str, system_message: str) -> AsyncIterator[str]:
+        # Providers without a streaming transport answer in one chunk
+        yield await self.complete(prompt, system_message)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class LlmChatProvider(LLMProvider):
+    """Any provider emergentintegrations' LlmChat supports (gemini, openai, anthropic)"""
+
+    def __init__(self, api_key: Optional[str], provider: str, model: str):
+        super().__init__(model)
+        self.kind = provider
+        self.api_key = api_key
+        self._http: Optional[httpx.AsyncClient] = None
+
+    async def complete(self, prompt: str, system_message: str) -> str:
+        # LlmChat keeps conversation history per session, so every completion
+        # gets its own session; only the configuration is shared.
+        chat = LlmChat(
+            api_key=self.api_key,
+            session_id=str(uuid.uuid4()),
+            system_message=system_message
+        ).with_model(self.kind, self.model)
+        return await chat.send_message(UserMessage(text=prompt))
+
+    async def stream(self, prompt: str, system_message: str) -> AsyncIterator[str]:
+        if self.kind != "gemini" or not self.api_key:
+            yield await self.complete(prompt, system_message)
+            return
+
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=httpx.Timeout(60.0, connect=10.0))
+        body = {
+            "systemInstruction": {"parts": [{"text": system_message}]},
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+        }
+        async with self._http.stream(
+            "POST",
+            GEMINI_STREAM_URL.format(model=self.model),
+            params={"alt": "sse"},
+            # In a header, not the query string, so it never shows up in error messages or URLs
+            headers={"x-goog-api-key": self.api_key},
+            json=body,
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                event = json.loads(line[5:])
+                for candidate in event.get("candidates", [])[:1]:
+                    for part in candidate.get("content", {}).get("parts", []):
+                        if part.get("text"):
+                            yield part["text"]
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+class LocalProvider(LLMProvider):
+    """Deterministic offline stand-in: answers with the JSON template the prompt asks for
+
+    Every AI prompt embeds an example of the object it wants; echoing it gives
+    a schema-shaped answer without network access, for tests and dry runs.
+    """
+
+    kind = "local"
+
+    async def complete(self, prompt: str, system_message: str) -> str:
+        payload, _ = extract_json(prompt)
+        return json.dumps(payload if payload is not None else {})
+
+
+# kind -> factory(api_key, model); register more with ``register_provider_type``
+PROVIDER_TYPES: Dict[str, Callable[[Optional[str], str], LLMProvider]] = {
+    "gemini": lambda api_key, model: LlmChatProvider(api_key, "gemini", model),
+    "openai": lambda api_key, model: LlmChatProvider(api_key, "openai", model),
+    "anthropic": lambda api_key, model: LlmChatProvider(api_key, "anthropic", model),
+    "local": lambda api_key, model: LocalProvider(model),
+}
+
+
+def register_provider_type(kind: str, factory: Callable[[Optional[str], str], LLMProvider]) -> None:
+    PROVIDER_TYPES[kind] = factory
+
+
+def _items(spec: str) -> List[Tuple[str, str]]:
+    items = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        items.append((name.strip(), value.strip()))
+    return items
+
+
+def parse_providers(spec: str, api_key: Optional[str] = None) -> Dict[str, LLMProvider]:
+    """Parse ``"default=gemini:gemini-2.0-flash,local=local"`` into named providers"""
+    providers = {}
+    for name, value in _items(spec):
+        kind, _, model = value.partition(":")
+        if kind not in PROVIDER_TYPES:
+            raise ValueError(f"Unknown LLM provider type '{kind}' for '{name}'")
+        providers[name] = PROVIDER_TYPES[kind](api_key, model)
+    return providers
+
+
+def parse_routes(spec: str) -> Dict[str, List[str]]:
+    """Parse ``"suggestions=fast>default"`` into ``{"suggestions": ["fast", "default"]}``"""
+    return {endpoint: [name.strip() for name in chain.split(">")] for endpoint, chain in _items(spec)}
+
+
+def parse_latency_budgets(spec: str) -> Dict[str, float]:
+    """Parse ``"suggestions=3,analysis=20"`` into seconds per endpoint"""
+    return {endpoint: float(seconds) for endpoint, seconds in _items(spec)}
+
+
+class ProviderStats:
+    """Request outcomes and a rolling window of latencies for one provider"""
+
+    def __init__(self):
+        self.counters = {"requests": 0, "errors": 0, "timeouts": 0}
+        self.latencies: Deque[Tuple[float, float]] = deque(maxlen=LATENCY_SAMPLES)
+
+    def observe(self, seconds: float, outcome: Optional[str] = None) -> None:
+        self.counters["requests"] += 1
+        if outcome:
+            self.counters[outcome] += 1
+        self.latencies.append((time.monotonic(), seconds))
+
+    def recent(self) -> List[float]:
+        cutoff = time.monotonic() - LATENCY_WINDOW_SECONDS
+        return sorted(seconds for at, seconds in self.latencies if at >= cutoff)
+
+    def p95(self) -> Optional[float]:
+        recent = self.recent()
+        if len(recent) < MIN_LATENCY_SAMPLES:
+            return None
+        return recent[int(len(recent) * 0.95) - 1]
+
+    def summary(self) -> Dict[str, object]:
+        recent = self.recent()
+
+        def percentile(p: float) -> Optional[float]:
+            return round(recent[max(int(len(recent) * p) - 1, 0)] * 1000, 1) if recent else None
+
+        return {
+            **self.counters,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "mean_ms": round(sum(recent) / len(recent) * 1000, 1) if recent else None,
+        }
+
+
+class ProviderRouter:
+    """Routes each endpoint to its provider chain, falling back on errors and slow providers"""
+
+    def __init__(
+        self,
+        providers: Dict[str, LLMProvider],
+        routes: Optional[Dict[str, List[str]]] = None,
+        latency_budgets: Optional[Dict[str, float]] = None,
+        default: str = "default",
+    ):
+        self.providers = dict(providers)
+        self.routes = dict(routes or {})
+        self.latency_budgets = dict(latency_budgets or {})
+        self.default = default
+        for endpoint, chain in [("default", [default]), *self.routes.items()]:
+            unknown = [name for name in chain if name not in self.providers]
+            if unknown or not chain:
+                raise ValueError(f"Route '{endpoint}' uses unknown LLM providers: {', '.join(unknown)}")
+        self.provider_stats: Dict[str, ProviderStats] = defaultdict(ProviderStats)
+        self.decisions: Dict[str, Counter] = defaultdict(Counter)
+
+    def chain(self, endpoint: str) -> List[str]:
+        return self.routes.get(endpoint) or [self.default]
+
+    def primary(self, endpoint: str) -> LLMProvider:
+        return self.providers[self.chain(endpoint)[0]]
+
+    def _attempts(self, endpoint: str) -> List[Tuple[str, Optional[float]]]:
+        """(provider, timeout) pairs to try in order; the last provider is never cut off"""
+        chain = self.chain(endpoint)
+        budget = self.latency_budgets.get(endpoint)
+        attempts = []
+        for name in chain[:-1]:
+            p95 = self.provider_stats[name].p95()
+            if budget is not None and p95 is not None and p95 > budget:
+                self.decisions[endpoint]["skipped_slow"] += 1
+                continue
+            attempts.append((name, budget))
+        attempts.append((chain[-1], None))
+        return attempts
+
+    def _failed(self, endpoint: str, name: str, started: float, timed_out: bool) -> None:
+        self.provider_stats[name].observe(time.monotonic() - started, "timeouts" if timed_out else "errors")
+        self.decisions[endpoint]["fallbacks"] += 1
+
+    async def complete(self, prompt: str, system_message: str, endpoint: str = "default") -> Tuple[str, str]:
+        """(response, name of the provider that gave it) from the first provider that answers"""
+        attempts = self._attempts(endpoint)
+        for index, (name, timeout) in enumerate(attempts):
+            last = index == len(attempts) - 1
+            started = time.monotonic()
+            try:
+                response = await asyncio.wait_for(self.providers[name].complete(prompt, system_message), timeout)
+            except Exception as e:
+                if last:
+                    self.provider_stats[name].observe(time.monotonic() - started, "errors")
+                    raise
+                self._failed(endpoint, name, started, isinstance(e, asyncio.TimeoutError))
+                continue
+            self.provider_stats[name].observe(time.monotonic() - started)
+            self.decisions[endpoint][name] += 1
+            return response, name
+
+    async def stream(self, prompt: str, system_message: str, endpoint: str = "default") -> AsyncIterator[str]:
+        """Stream from the first provider that produces a chunk within the budget
+
+        Once a chunk has been yielded the provider is committed to; later
+        errors propagate to the caller.
+        """
+        attempts = self._attempts(endpoint)
+        for index, (name, timeout) in enumerate(attempts):
+            last = index == len(attempts) - 1
+            started = time.monotonic()
+            chunks = self.providers[name].stream(prompt, system_message)
+            try:
+                first = await asyncio.wait_for(chunks.__anext__(), timeout)
+            except StopAsyncIteration:
+                first = None
+            except Exception as e:
+                await chunks.aclose()
+                if last:
+                    self.provider_stats[name].observe(time.monotonic() - started, "errors")
+                    raise
+                self._failed(endpoint, name, started, isinstance(e, asyncio.TimeoutError))
+                continue
+
+            self.decisions[endpoint][name] += 1
+            try:
+                if first is not None:
+                    yield first
+                    async for chunk in chunks:
+                        yield chunk
+            except Exception:
+                self.provider_stats[name].observe(time.monotonic() - started, "errors")
+                raise
+            finally:
+                await chunks.aclose()
+            self.provider_stats[name].observe(time.monotonic() - started)
+            return
+
+    async def aclose(self) -> None:
+        for provider in self.providers.values():
+            await provider.aclose()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "default": self.default,
+            "routes": {endpoint: self.chain(endpoint) for endpoint in self.routes},
+            "latency_budgets": self.latency_budgets,
+            "decisions": {endpoint: dict(counter) for endpoint, counter in self.decisions.items()},
+            "providers": {
+                name: {"model": provider.model_name, **self.provider_stats[name].summary()}
+                for name, provider in self.providers.items()
+            },
+        }
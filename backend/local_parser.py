@@ -0,0 +1,345 @@
+"""Rule-based resume parser.
+
+Splits extracted resume text into sections with a heading detector, then
+parses each section with contact/date-range regexes and bullet grouping
+into the same JSON shape the LLM parser returns. Every section gets a
+confidence in [0, 1] so callers can send only documents or sections the
+rules could not handle to the LLM.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from ats_engine import EMAIL_RE
+
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about me", "about"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history", "internships", "internship"),
+    "education": ("education", "academic background", "academics", "education and training", "qualifications"),
+    "skills": ("skills", "technical skills", "core competencies", "competencies", "key skills",
+               "skills and tools", "technologies", "tools and technologies", "areas of expertise"),
+    "projects": ("projects", "personal projects", "academic projects", "key projects", "selected projects"),
+    "certifications": ("certifications", "certification", "certificates", "licenses and certifications",
+                       "licenses & certifications", "courses and certifications"),
+}
+HEADING_LOOKUP = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+
+PHONE_RE = re.compile(r'(?<!\w)(\+?\d{1,3}[\s.-]?)?(\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4})(?!\w)')
+LINKEDIN_RE = re.compile(r'(?:https?://)?(?:[\w-]+\.)?linkedin\.com/[^\s|,;]+', re.IGNORECASE)
+GITHUB_RE = re.compile(r'(?:https?://)?(?:www\.)?github\.com/[^\s|,;]+', re.IGNORECASE)
+URL_RE = re.compile(r'(?:https?://|www\.)[^\s|,;]+', re.IGNORECASE)
+LOCATION_RE = re.compile(r'\b([A-Z][a-zA-Z.]+(?: [A-Z][a-zA-Z.]+)*, (?:[A-Z]{2}|[A-Z][a-zA-Z]+(?: [A-Z][a-zA-Z]+)*))\b')
+TRAILING_LOCATION_RE = re.compile(r'(?:^|[,|(]\s*|\s[-–—]\s*)([A-Z][a-zA-Z.]+(?: [A-Z][a-zA-Z.]+)*, [A-Z]{2})\)?\s*$')
+MONTH = r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\.?'
+DATE = rf'(?:{MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}}-\d{{2}}|\d{{4}})'
+DATE_RANGE_RE = re.compile(
+    rf'(?P<start>{DATE})\s*(?:-|–|—|to|until)\s*(?P<end>{DATE}|present|current|now|ongoing)',
+    re.IGNORECASE
+)
+SINGLE_DATE_RE = re.compile(rf'\b{DATE}\b', re.IGNORECASE)
+BULLET_RE = re.compile(r'^\s*(?:[•●▪◦·\-*–]|\d+[.)])\s+')
+GPA_RE = re.compile(r'\b(?:GPA|CGPA)\s*[:\-]?\s*([\d.]+(?:\s*/\s*[\d.]+)?)', re.IGNORECASE)
+DEGREE_RE = re.compile(
+    r"\b(?:Bachelor|Master|Doctor|Ph\.?\s?D|B\.?\s?(?:S|Sc|A|E|Tech|Com)\b\.?|M\.?\s?(?:S|Sc|A|E|Tech|BA)\b\.?"
+    r"|MBA|Associate|Diploma|High School)", re.IGNORECASE
+)
+INSTITUTION_RE = re.compile(r'\b(?:University|College|Institute|School|Academy|Polytechnic)\b', re.IGNORECASE)
+TECHNOLOGIES_RE = re.compile(r'^(?:technologies|tech stack|stack|tools|built with)\s*[:\-]\s*(.+)$', re.IGNORECASE)
+FIELD_SPLIT_RE = re.compile(r'\s+(?:at|@)\s+|\s*[|•·]\s*|\s+[-–—]\s+|,\s+')
+
+# Sections that decide whether the document as a whole parsed well
+CORE_SECTIONS = ("personal_info", "experience", "education", "skills")
+# Share of an entry's score kept when it has no description; grouping mistakes
+# usually show up as heading-only entries
+UNDESCRIBED_ENTRY_WEIGHT = 0.5
+
+
+def _normalize_heading(line: str) -> str:
+    return re.sub(r'[^a-z& ]', '', line.lower()).strip()
+
+
+def detect_heading(line: str) -> Optional[str]:
+    """Section name if ``line`` is a section heading"""
+    stripped = line.strip().rstrip(":")
+    if not stripped or len(stripped) > 40 or BULLET_RE.match(line):
+        return None
+    return HEADING_LOOKUP.get(_normalize_heading(stripped))
+
+
+def split_sections(text: str) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Split text into (header lines, {section: lines}) at detected headings"""
+    header: List[str] = []
+    sections: Dict[str, List[str]] = {}
+    current = None
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        section = detect_heading(line)
+        if section is not None:
+            current = section
+            sections.setdefault(section, [])
+        elif current is None:
+            header.append(line)
+        else:
+            sections[current].append(raw_line.rstrip())
+    return header, sections
+
+
+def group_entries(lines: List[str]) -> List[Tuple[List[str], List[str]]]:
+    """Group section lines into entries of (heading lines, bullet lines).
+
+    A new entry starts at a non-bullet line that follows bullets, or at a
+    non-bullet line carrying a date range when the current entry already has one.
+    Links and "Technologies:" lines continue the current entry.
+    """
+    entries: List[Tuple[List[str], List[str]]] = []
+    head: List[str] = []
+    bullets: List[str] = []
+    for line in lines:
+        is_bullet = BULLET_RE.match(line) is not None
+        text = BULLET_RE.sub("", line).strip()
+        if is_bullet or URL_RE.fullmatch(text) or GITHUB_RE.fullmatch(text) or (
+            (head or bullets) and TECHNOLOGIES_RE.match(text)
+        ):
+            bullets.append(text)
+            continue
+        starts_new = bullets or (
+            DATE_RANGE_RE.search(text) and any(DATE_RANGE_RE.search(h) for h in head)
+        )
+        if starts_new and (head or bullets):
+            entries.append((head, bullets))
+            head, bullets = [], []
+        if len(head) >= 3:
+            # Long unbulleted paragraphs are description text
+            bullets.append(text)
+        else:
+            head.append(text)
+    if head or bullets:
+        entries.append((head, bullets))
+    return entries
+
+
+def _pop_date_range(lines: List[str]) -> Tuple[List[str], str, str]:
+    remaining = []
+    start = end = ""
+    for line in lines:
+        match = DATE_RANGE_RE.search(line) if not start else None
+        if match:
+            start, end = match.group("start"), match.group("end")
+            line = (line[:match.start()] + line[match.end():]).strip(" ,|-–—()")
+        if line:
+            remaining.append(line)
+    return remaining, start, end
+
+
+def _pop_location(lines: List[str]) -> Tuple[List[str], str]:
+    """Strip a trailing "City, ST" from the first line that ends with one"""
+    for i, line in enumerate(lines):
+        match = TRAILING_LOCATION_RE.search(line)
+        if match:
+            rest = line[:match.start()].strip(" ,|-–—(")
+            return [l for l in lines[:i] + [rest] + lines[i + 1:] if l], match.group(1)
+    return lines, ""
+
+
+def _fields(lines: List[str]) -> List[str]:
+    return [part.strip() for line in lines for part in FIELD_SPLIT_RE.split(line) if part and part.strip()]
+
+
+def parse_personal_info(header: List[str], text: str) -> Tuple[Dict[str, str], float]:
+    info = {"full_name": "", "email": "", "phone": "", "location": "", "linkedin": "", "github": "", "website": ""}
+    email = EMAIL_RE.search(text)
+    phone = PHONE_RE.search(text)
+    linkedin = LINKEDIN_RE.search(text)
+    github = GITHUB_RE.search(text)
+    info["email"] = email.group() if email else ""
+    info["phone"] = phone.group().strip() if phone else ""
+    info["linkedin"] = linkedin.group() if linkedin else ""
+    info["github"] = github.group() if github else ""
+    for url in URL_RE.findall("\n".join(header)):
+        if "linkedin.com" not in url.lower() and "github.com" not in url.lower():
+            info["website"] = url
+            break
+
+    for line in header[:5]:
+        if info["location"] == "":
+            location = LOCATION_RE.search(line)
+            if location and not EMAIL_RE.search(location.group()):
+                info["location"] = location.group(1)
+        candidate = line.split("|")[0].strip()
+        words = candidate.split()
+        if (
+            not info["full_name"]
+            and 2 <= len(words) <= 4
+            and all(word.replace(".", "").replace("-", "").replace("'", "").isalpha() for word in words)
+        ):
+            info["full_name"] = candidate.title() if candidate.isupper() else candidate
+
+    confidence = 0.4 * bool(info["full_name"]) + 0.35 * bool(info["email"]) + 0.25 * bool(info["phone"])
+    return info, round(confidence, 2)
+
+
+def parse_experience(lines: List[str]) -> Tuple[List[Dict[str, Any]], float]:
+    experience = []
+    for head, bullets in group_entries(lines):
+        head, start, end = _pop_date_range(head)
+        head, location = _pop_location(head)
+        fields = _fields(head)
+        if not location:
+            location = next((f for f in fields if LOCATION_RE.fullmatch(f)), "")
+            fields = [f for f in fields if f != location]
+        experience.append({
+            "title": fields[0] if fields else "",
+            "company": fields[1] if len(fields) > 1 else "",
+            "location": location,
+            "start_date": start,
+            "end_date": end,
+            "description": "\n".join(bullets),
+            "is_current": end.lower() in ("present", "current", "now", "ongoing"),
+        })
+    if not experience:
+        return [], 0.0
+    complete = sum(
+        (bool(e["title"]) and bool(e["company"]) and bool(e["start_date"]))
+        * (1.0 if e["description"] else UNDESCRIBED_ENTRY_WEIGHT)
+        for e in experience
+    )
+    return experience, round(complete / len(experience), 2)
+
+
+def parse_education(lines: List[str]) -> Tuple[List[Dict[str, Any]], float]:
+    education = []
+    for head, bullets in group_entries(lines):
+        head, start, end = _pop_date_range(head)
+        if not start:
+            for i, line in enumerate(head):
+                date = SINGLE_DATE_RE.search(line)
+                if date:
+                    end = date.group()
+                    head[i] = (line[:date.start()] + line[date.end():]).strip(" ,|-–—()")
+                    break
+        head, location = _pop_location(head)
+        all_lines = [line for line in head + bullets if line]
+        gpa = next((m.group(1) for m in map(GPA_RE.search, all_lines) if m), "")
+        fields = [f for f in _fields(head) if not GPA_RE.search(f)]
+        degree = next((f for f in fields if DEGREE_RE.search(f)), "")
+        institution = next((f for f in fields if INSTITUTION_RE.search(f) and f != degree), "")
+        location = location or next((f for f in fields if LOCATION_RE.fullmatch(f)), "")
+        coursework = next((line.split(":", 1)[1].strip() for line in bullets
+                           if line.lower().startswith(("relevant coursework", "coursework"))), "")
+        education.append({
+            "degree": degree or (fields[0] if fields else ""),
+            "institution": institution or (fields[1] if len(fields) > 1 else ""),
+            "location": location,
+            "start_date": start,
+            "end_date": end,
+            "gpa": gpa,
+            "relevant_coursework": coursework,
+        })
+    if not education:
+        return [], 0.0
+    complete = sum(bool(DEGREE_RE.search(e["degree"])) and bool(e["institution"]) for e in education)
+    return education, round(complete / len(education), 2)
+
+
+def parse_skills(lines: List[str]) -> Tuple[List[Dict[str, Any]], float]:
+    groups: List[Dict[str, Any]] = []
+    uncategorized: List[str] = []
+    for line in lines:
+        text = BULLET_RE.sub("", line).strip()
+        category, sep, rest = text.partition(":")
+        items = rest if sep and len(category) <= 40 else text
+        skills = [s.strip() for s in re.split(r'[,|;•·/]', items) if s.strip()]
+        if sep and len(category) <= 40:
+            groups.append({"category": category.strip(), "skills": skills})
+        else:
+            uncategorized.extend(skills)
+    if uncategorized:
+        groups.append({"category": "General", "skills": uncategorized})
+    if not groups:
+        return [], 0.0
+    # Long "skills" are usually sentences the splitter could not handle
+    skills = [s for group in groups for s in group["skills"]]
+    short = sum(len(s.split()) <= 4 for s in skills)
+    return groups, round(short / len(skills), 2) if skills else 0.0
+
+
+def parse_projects(lines: List[str]) -> Tuple[List[Dict[str, Any]], float]:
+    projects = []
+    for head, bullets in group_entries(lines):
+        head, _, _ = _pop_date_range(head)
+        text = "\n".join(head + bullets)
+        github = GITHUB_RE.search(text)
+        live = next((u for u in URL_RE.findall(text) if "github.com" not in u.lower()), "")
+        technologies = ""
+        description = []
+        for line in head[1:] + bullets:
+            tech = TECHNOLOGIES_RE.match(line)
+            if tech:
+                technologies = tech.group(1).strip()
+            elif line:
+                description.append(line)
+        name = _fields(head[:1])[0] if head and _fields(head[:1]) else ""
+        projects.append({
+            "name": name,
+            "description": "\n".join(description),
+            "technologies": technologies,
+            "github_link": github.group() if github else "",
+            "live_link": live,
+        })
+    if not projects:
+        return [], 0.0
+    complete = sum(bool(p["name"]) * (1.0 if p["description"] else UNDESCRIBED_ENTRY_WEIGHT) for p in projects)
+    return projects, round(complete / len(projects), 2)
+
+
+def parse_certifications(lines: List[str]) -> Tuple[List[Dict[str, Any]], float]:
+    certifications = []
+    for line in lines:
+        text = BULLET_RE.sub("", line).strip()
+        if not text:
+            continue
+        date = SINGLE_DATE_RE.search(text)
+        if date:
+            text = (text[:date.start()] + text[date.end():]).strip(" ,|-–—()")
+        fields = _fields([text])
+        certifications.append({
+            "name": fields[0] if fields else text,
+            "issuer": fields[1] if len(fields) > 1 else "",
+            "date": date.group() if date else "",
+            "credential_id": "",
+        })
+    if not certifications:
+        return [], 0.0
+    return certifications, 1.0
+
+
+def parse_resume_text(text: str) -> Dict[str, Any]:
+    """Parse resume text into ``{"parsed_data", "confidence", "section_confidence"}``"""
+    header, sections = split_sections(text)
+    personal_info, personal_confidence = parse_personal_info(header, text)
+
+    parsed: Dict[str, Any] = {"personal_info": personal_info}
+    confidence: Dict[str, float] = {"personal_info": personal_confidence}
+
+    summary_lines = [BULLET_RE.sub("", line).strip() for line in sections.get("summary", [])]
+    parsed["summary"] = " ".join(line for line in summary_lines if line)
+    confidence["summary"] = 1.0 if parsed["summary"] or "summary" not in sections else 0.0
+
+    parsers = {
+        "experience": parse_experience,
+        "education": parse_education,
+        "skills": parse_skills,
+        "projects": parse_projects,
+        "certifications": parse_certifications,
+    }
+    for section, parse in parsers.items():
+        parsed[section], confidence[section] = parse(sections.get(section, []))
+        # Optional sections that simply are not in the document are not a parse failure
+        if section not in sections and section not in CORE_SECTIONS:
+            confidence[section] = 1.0
+
+    overall = sum(confidence[section] for section in CORE_SECTIONS) / len(CORE_SECTIONS)
+    return {"parsed_data": parsed, "confidence": round(overall, 2), "section_confidence": confidence}
@@ -0,0 +1,203 @@
+"""Compact, token-budgeted resume rendering for LLM prompts.
+
+Stored resumes carry ids, timestamps, empty fields and JSON punctuation that
+cost prompt tokens without telling the model anything. ``serialize_resume``
+renders only the content as short labelled lines and, when a token budget
+is given, trims the least useful content first: older experience and
+project descriptions, then coursework and trailing list entries, and only
+as a last resort the most recent role.
+"""
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Rough average for English text with the Gemini/GPT tokenizers
+CHARS_PER_TOKEN = 4
+SHORT_DESCRIPTION_CHARS = 160
+TRUNCATION_MARKER = "…"
+
+CONTACT_FIELDS = (
+    ("full_name", "Name"),
+    ("email", "Email"),
+    ("phone", "Phone"),
+    ("location", "Location"),
+    ("linkedin", "LinkedIn"),
+    ("github", "GitHub"),
+    ("website", "Website"),
+)
+
+
+@dataclass
+class SerializedResume:
+    text: str
+    tokens: int
+    truncated: bool = False
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def shorten(text: str, limit: int) -> str:
+    """Cut ``text`` to at most ``limit`` characters at a word boundary"""
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0]
+    return cut.rstrip(",.;:") + TRUNCATION_MARKER
+
+
+def _clean(value: Any) -> str:
+    return " ".join(str(value).split()) if value else ""
+
+
+def _join(*parts: str, sep: str = ", ") -> str:
+    return sep.join(part for part in parts if part)
+
+
+def _dates(start: str, end: str, current: bool = False) -> str:
+    end = "Present" if current and not end else end
+    dates = _join(_clean(start), _clean(end), sep=" - ")
+    return f"({dates})" if dates else ""
+
+
+def _compact(resume: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of the prompt-relevant content with ids, metadata and empty entries removed"""
+    def entries(section: str, fields: List[str]) -> List[Dict[str, Any]]:
+        items = []
+        for item in resume.get(section) or []:
+            item = {field: item.get(field) for field in fields if item.get(field)}
+            if item:
+                items.append(item)
+        return items
+
+    return {
+        "personal_info": {
+            field: _clean(value) for field, value in (resume.get("personal_info") or {}).items() if _clean(value)
+        },
+        "summary": _clean(resume.get("summary")),
+        "experience": entries(
+            "experience", ["title", "company", "location", "start_date", "end_date", "is_current", "description"]
+        ),
+        "education": entries(
+            "education", ["degree", "institution", "location", "start_date", "end_date", "gpa", "relevant_coursework"]
+        ),
+        "skills": [
+            {"category": _clean(group.get("category")), "skills": [_clean(s) for s in group.get("skills") or [] if _clean(s)]}
+            for group in resume.get("skills") or []
+            if any(_clean(s) for s in group.get("skills") or [])
+        ],
+        "projects": entries("projects", ["name", "technologies", "description", "github_link", "live_link"]),
+        "certifications": entries("certifications", ["name", "issuer", "date", "credential_id"]),
+    }
+
+
+def render(content: Dict[str, Any]) -> str:
+    """Render compacted content as labelled lines"""
+    lines = []
+    info = content["personal_info"]
+    contact = _join(*(f"{label}: {info[field]}" for field, label in CONTACT_FIELDS if info.get(field)), sep=" | ")
+    if contact:
+        lines.append(contact)
+    if content["summary"]:
+        lines.append(f"Summary: {content['summary']}")
+
+    if content["experience"]:
+        lines.append("Experience:")
+        for job in content["experience"]:
+            heading = _join(_clean(job.get("title")), _clean(job.get("company")), _clean(job.get("location")))
+            lines.append(_join(f"- {heading}", _dates(job.get("start_date"), job.get("end_date"), job.get("is_current")), sep=" "))
+            if job.get("description"):
+                lines.append(f"  {_clean(job['description'])}")
+
+    if content["education"]:
+        lines.append("Education:")
+        for school in content["education"]:
+            heading = _join(_clean(school.get("degree")), _clean(school.get("institution")), _clean(school.get("location")))
+            gpa = f"GPA {_clean(school['gpa'])}" if school.get("gpa") else ""
+            lines.append(_join(f"- {heading}", _dates(school.get("start_date"), school.get("end_date")), gpa, sep=" "))
+            if school.get("relevant_coursework"):
+                lines.append(f"  Coursework: {_clean(school['relevant_coursework'])}")
+
+    if content["skills"]:
+        lines.append("Skills:")
+        for group in content["skills"]:
+            skills = ", ".join(group["skills"])
+            lines.append(f"- {group['category']}: {skills}" if group["category"] else f"- {skills}")
+
+    if content["projects"]:
+        lines.append("Projects:")
+        for project in content["projects"]:
+            technologies = f"[{_clean(project['technologies'])}]" if project.get("technologies") else ""
+            links = _join(_clean(project.get("github_link")), _clean(project.get("live_link")), sep=" ")
+            lines.append(_join(f"- {_clean(project.get('name'))}", technologies, links, sep=" "))
+            if project.get("description"):
+                lines.append(f"  {_clean(project['description'])}")
+
+    if content["certifications"]:
+        lines.append("Certifications:")
+        for cert in content["certifications"]:
+            heading = _join(_clean(cert.get("name")), _clean(cert.get("issuer")))
+            lines.append(_join(f"- {heading}", f"({_clean(cert['date'])})" if cert.get("date") else "", sep=" "))
+
+    return "\n".join(lines)
+
+
+def _reductions(content: Dict[str, Any]) -> Iterator[Callable[[], None]]:
+    """Content reductions in the order they are applied, least useful first.
+
+    Entries are assumed newest first, as resumes are written, so trimming
+    walks each list from the end.
+    """
+    def shorten_field(item: Dict[str, Any], field: str) -> Callable[[], None]:
+        return lambda: item.__setitem__(field, shorten(item[field], SHORT_DESCRIPTION_CHARS))
+
+    def drop_field(item: Dict[str, Any], field: str) -> Callable[[], None]:
+        return lambda: item.pop(field, None)
+
+    def drop_last(section: str) -> Callable[[], None]:
+        return lambda: content[section].pop()
+
+    older_jobs = content["experience"][1:][::-1]
+    projects = content["projects"][::-1]
+    for item in older_jobs:
+        if item.get("description"):
+            yield shorten_field(item, "description")
+    for item in projects:
+        if item.get("description"):
+            yield shorten_field(item, "description")
+    for item in content["education"]:
+        if item.get("relevant_coursework"):
+            yield drop_field(item, "relevant_coursework")
+    for item in older_jobs + projects:
+        if item.get("description"):
+            yield drop_field(item, "description")
+    for _ in range(len(content["certifications"])):
+        yield drop_last("certifications")
+    for _ in range(len(content["projects"])):
+        yield drop_last("projects")
+    if content["summary"]:
+        yield lambda: content.__setitem__("summary", shorten(content["summary"], SHORT_DESCRIPTION_CHARS))
+    if content["experience"] and content["experience"][0].get("description"):
+        yield shorten_field(content["experience"][0], "description")
+    for _ in range(len(content["experience"]) - 1):
+        yield drop_last("experience")
+
+
+def serialize_resume(resume: Dict[str, Any], max_tokens: Optional[int] = None) -> SerializedResume:
+    """Render ``resume`` for a prompt, trimming by priority to fit ``max_tokens``"""
+    content = _compact(resume)
+    text = render(content)
+    if max_tokens is None or estimate_tokens(text) <= max_tokens:
+        return SerializedResume(text=text, tokens=estimate_tokens(text))
+
+    for reduce in _reductions(content):
+        reduce()
+        text = render(content)
+        if estimate_tokens(text) <= max_tokens:
+            return SerializedResume(text=text, tokens=estimate_tokens(text), truncated=True)
+
+    # Still over budget after every reduction: hard cut
+    limit = max(max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARKER), 0)
+    text = text[:limit].rsplit(" ", 1)[0] + TRUNCATION_MARKER
+    return SerializedResume(text=text, tokens=estimate_tokens(text), truncated=True)
@@ -0,0 +1,187 @@
+"""Skill-indexed bank of generated quiz and interview questions.
+
+Generated questions are stored in the ``question_bank`` collection keyed by
+kind (quiz/interview), category, normalized skill and difficulty, and
+deduplicated on a hash of their normalized text. Requests are assembled by
+sampling the bank; only the shortfall goes to the LLM, and keys whose stock
+runs low are topped up by background generation: at most one refill call per
+request, covering up to ``refill_keys`` keys that are not already refilling.
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+# (category, normalized skill); generic HR/behavioral questions use skill ""
+BankKey = Tuple[str, str]
+# refill(counts, difficulty) generates and stores counts[key] more questions per key in one call
+Refill = Callable[[Dict[BankKey, int], Optional[str]], Awaitable[Any]]
+
+SKILL_CHARS_RE = re.compile(r'[^a-z0-9+#. ]')
+QUESTION_CHARS_RE = re.compile(r'[^a-z0-9 ]')
+DUPLICATE_KEY_ERROR = 11000
+
+
+def normalize_skill(skill: str) -> str:
+    """Lowercase, collapse whitespace; keeps the punctuation of C++, C#, .NET"""
+    return " ".join(SKILL_CHARS_RE.sub(" ", skill.lower()).split()).strip(".")
+
+
+def question_hash(kind: str, text: str) -> str:
+    normalized = " ".join(QUESTION_CHARS_RE.sub(" ", text.lower()).split())
+    return hashlib.sha256(f"{kind}:{normalized}".encode("utf-8")).hexdigest()
+
+
+def spread(total: int, keys: List[BankKey]) -> Dict[BankKey, int]:
+    """Split ``total`` questions across ``keys`` as evenly as possible, earlier keys first"""
+    if not keys:
+        return {}
+    base, extra = divmod(total, len(keys))
+    counts = {key: base + (1 if i < extra else 0) for i, key in enumerate(keys)}
+    return {key: count for key, count in counts.items() if count}
+
+
+class QuestionBank:
+    """Mongo-backed question pool with sampling and background refill"""
+
+    def __init__(self, collection, min_stock: int = 30, refill_batch: int = 10, refill_keys: int = 3):
+        self.collection = collection
+        self.min_stock = min_stock
+        self.refill_batch = refill_batch
+        self.refill_keys = refill_keys
+        self._refilling: Set[Tuple[str, BankKey, Optional[str]]] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self.counters = {"served": 0, "generated": 0, "stored": 0, "duplicates": 0, "refills": 0}
+
+    def _filter(self, kind: str, difficulty: Optional[str]) -> Dict[str, Any]:
+        query: Dict[str, Any] = {"kind": kind}
+        if difficulty:
+            query["difficulty"] = difficulty
+        return query
+
+    async def stock(self, kind: str, keys: Iterable[BankKey], difficulty: Optional[str] = None) -> Dict[BankKey, int]:
+        """Number of stored questions per (category, skill)"""
+        keys = list(keys)
+        query = self._filter(kind, difficulty)
+        query["category"] = {"$in": sorted({category for category, _ in keys})}
+        query["skill"] = {"$in": sorted({skill for _, skill in keys})}
+        counts = dict.fromkeys(keys, 0)
+        pipeline = [{"$match": query}, {"$group": {"_id": {"category": "$category", "skill": "$skill"}, "n": {"$sum": 1}}}]
+        async for row in self.collection.aggregate(pipeline):
+            key = (row["_id"]["category"], row["_id"]["skill"])
+            if key in counts:
+                counts[key] = row["n"]
+        return counts
+
+    async def sample(self, kind: str, key: BankKey, n: int, difficulty: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = {**self._filter(kind, difficulty), "category": key[0], "skill": key[1]}
+        pipeline = [{"$match": query}, {"$sample": {"size": n}}, {"$project": {"_id": 0, "question": 1}}]
+        return [doc["question"] async for doc in self.collection.aggregate(pipeline)]
+
+    async def assemble(
+        self,
+        kind: str,
+        wanted: Dict[BankKey, int],
+        refill: Refill,
+        difficulty: Optional[str] = None
+    ) -> Tuple[Dict[BankKey, List[Dict[str, Any]]], Dict[BankKey, int]]:
+        """Sample ``wanted`` counts from the bank
+
+        Returns (questions per key, shortfall per key). Keys left with fewer
+        than ``min_stock`` questions are topped up by one background ``refill``.
+        """
+        stock = await self.stock(kind, wanted, difficulty)
+        keys = [key for key, n in wanted.items() if stock[key]]
+        samples = await asyncio.gather(*(self.sample(kind, key, min(wanted[key], stock[key]), difficulty) for key in keys))
+        found = dict(zip(keys, samples))
+
+        shortfall = {}
+        low = []
+        for key, n in wanted.items():
+            served = len(found.get(key, []))
+            self.counters["served"] += served
+            if served < n:
+                shortfall[key] = n - served
+            # Questions generated for the shortfall are stored too, so only
+            # refill beyond that
+            if stock[key] + max(n - served, 0) < self.min_stock:
+                low.append(key)
+        self.schedule_refill(kind, low, difficulty, refill)
+        return found, shortfall
+
+    async def add(
+        self,
+        kind: str,
+        questions: List[Tuple[BankKey, str, Dict[str, Any]]],
+    ) -> int:
+        """Store (key, difficulty, question) entries, skipping duplicates; returns the number stored"""
+        self.counters["generated"] += len(questions)
+        now = datetime.utcnow()
+        docs = {}
+        for (category, skill), difficulty, question in questions:
+            digest = question_hash(kind, question.get("question", ""))
+            docs.setdefault(digest, {
+                "id": str(uuid.uuid4()),
+                "kind": kind,
+                "category": category,
+                "skill": skill,
+                "difficulty": difficulty,
+                "question_hash": digest,
+                "question": question,
+                "created_at": now,
+            })
+        if not docs:
+            return 0
+
+        try:
+            result = await self.collection.insert_many(list(docs.values()), ordered=False)
+            stored = len(result.inserted_ids)
+        except BulkWriteError as e:
+            if any(error.get("code") != DUPLICATE_KEY_ERROR for error in e.details.get("writeErrors", [])):
+                raise
+            stored = e.details.get("nInserted", 0)
+        self.counters["stored"] += stored
+        self.counters["duplicates"] += len(questions) - stored
+        return stored
+
+    def schedule_refill(self, kind: str, keys: List[BankKey], difficulty: Optional[str], refill: Refill) -> None:
+        """Generate ``refill_batch`` more questions for up to ``refill_keys`` of ``keys`` in one call
+
+        Keys with a refill already in progress are skipped; keys over the cap
+        are left for a later request.
+        """
+        markers = [(kind, key, difficulty) for key in keys if (kind, key, difficulty) not in self._refilling]
+        markers = markers[:self.refill_keys]
+        if not markers:
+            return
+        self._refilling.update(markers)
+        self.counters["refills"] += 1
+        counts = {key: self.refill_batch for _, key, _ in markers}
+
+        async def run() -> None:
+            try:
+                await refill(counts, difficulty)
+            except Exception:
+                logger.exception("Question bank refill failed for %s %s", kind, list(counts))
+            finally:
+                self._refilling.difference_update(markers)
+
+        task = asyncio.create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "refills_in_progress": len(self._refilling)}
@@ -0,0 +1,158 @@
+"""BM25 full-text search over resumes.
+
+The index lives in memory (term -> {resume_id: term frequency}) and is kept
+current incrementally. Each resume's term vector is persisted to the
+``search_documents`` collection, so a restart only replays stored vectors
+instead of re-tokenizing every resume, and other workers pick up changes by
+syncing on ``indexed_at``. Writers' clocks and commit order can disagree, so
+each sync re-reads an overlap window before the watermark; a per-document
+``version`` counter incremented by the server makes those re-reads no-ops
+and keeps a stale read from replacing a newer vector.
+"""
+import heapq
+import logging
+import math
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+from ats_engine import RESUME_TEXT_PROJECTION, build_resume_text, tokenize
+
+logger = logging.getLogger(__name__)
+
+SEARCH_COLLECTION = "search_documents"
+
+
+class SearchIndex:
+    """Incrementally maintained inverted index with BM25 ranking"""
+
+    def __init__(
+        self,
+        k1: float = 1.5,
+        b: float = 0.75,
+        sync_interval: float = 1.0,
+        sync_overlap: float = 5.0
+    ):
+        self.k1 = k1
+        self.b = b
+        self.sync_interval = sync_interval
+        self.sync_overlap = sync_overlap
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.doc_terms: Dict[str, Tuple[str, ...]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        # resume_id -> version of the applied term vector
+        self.doc_versions: Dict[str, int] = {}
+        self.total_length = 0
+        self.watermark: Optional[datetime] = None
+        self._last_sync = 0.0
+
+    @property
+    def document_count(self) -> int:
+        return len(self.doc_lengths)
+
+    # In-memory maintenance
+    def add(self, resume_id: str, term_counts: Dict[str, int]) -> None:
+        self.remove(resume_id)
+        for term, tf in term_counts.items():
+            self.postings[term][resume_id] = tf
+        length = sum(term_counts.values())
+        self.doc_terms[resume_id] = tuple(term_counts)
+        self.doc_lengths[resume_id] = length
+        self.total_length += length
+
+    def remove(self, resume_id: str) -> None:
+        self.doc_versions.pop(resume_id, None)
+        terms = self.doc_terms.pop(resume_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(resume_id, None)
+                if not posting:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(resume_id, 0)
+
+    def search(self, query: str, top_k: int = 10) -> Tuple[int, List[Tuple[str, float]]]:
+        """Return (number of matching resumes, top_k (resume_id, score) pairs)"""
+        n = self.document_count
+        if not n:
+            return 0, []
+        avg_length = self.total_length / n
+        k1, b = self.k1, self.b
+        scores: Dict[str, float] = defaultdict(float)
+
+        for term, query_tf in Counter(tokenize(query)).items():
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            df = len(posting)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5)) * query_tf
+            for resume_id, tf in posting.items():
+                norm = k1 * (1 - b + b * self.doc_lengths[resume_id] / avg_length)
+                scores[resume_id] += idf * tf * (k1 + 1) / (tf + norm)
+
+        top = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return len(scores), top
+
+    # Persistence
+    @staticmethod
+    def term_counts(resume: Dict[str, Any]) -> Dict[str, int]:
+        return dict(Counter(tokenize(build_resume_text(resume))))
+
+    async def index_resume(self, db, resume: Dict[str, Any]) -> None:
+        """Persist a resume's term vector and apply it to the in-memory index"""
+        terms = self.term_counts(resume)
+        stored = await db[SEARCH_COLLECTION].find_one_and_update(
+            {"resume_id": resume["id"]},
+            {"$set": {"terms": terms, "indexed_at": datetime.utcnow()}, "$inc": {"version": 1}},
+            projection={"_id": 0, "version": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self.add(resume["id"], terms)
+        self.doc_versions[resume["id"]] = stored["version"]
+
+    def _apply(self, document: Dict[str, Any]) -> None:
+        resume_id = document["resume_id"]
+        # Vectors stored before versioning count as version 0
+        version = document.get("version", 0)
+        if resume_id not in self.doc_versions or version > self.doc_versions[resume_id]:
+            self.add(resume_id, document.get("terms", {}))
+            self.doc_versions[resume_id] = version
+        indexed_at = document.get("indexed_at")
+        if indexed_at and (self.watermark is None or indexed_at > self.watermark):
+            self.watermark = indexed_at
+
+    async def load(self, db) -> None:
+        """Load persisted term vectors; backfill from resumes only when none exist"""
+        async for document in db[SEARCH_COLLECTION].find({}, {"_id": 0}):
+            self._apply(document)
+
+        if not self.document_count:
+            await self.rebuild(db)
+        self._last_sync = time.monotonic()
+        logger.info("Search index loaded with %d resumes", self.document_count)
+
+    async def rebuild(self, db) -> None:
+        """Index every stored resume from scratch"""
+        async for resume in db.resumes.find({}, RESUME_TEXT_PROJECTION):
+            await self.index_resume(db, resume)
+
+    async def sync(self, db, force: bool = False) -> None:
+        """Apply term vectors written by other workers since the last sync"""
+        now = time.monotonic()
+        if not force and now - self._last_sync < self.sync_interval:
+            return
+        self._last_sync = now
+        query = {}
+        if self.watermark:
+            query = {"indexed_at": {"$gte": self.watermark - timedelta(seconds=self.sync_overlap)}}
+        async for document in db[SEARCH_COLLECTION].find(query, {"_id": 0}):
+            self._apply(document)
+
+
+search_index = SearchIndex()
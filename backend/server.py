@@ -1,29 +1,83 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File
+from fastapi import FastAPI, APIRouter, BackgroundTasks, HTTPException, UploadFile, File, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
 from dotenv import load_dotenv
+from starlette.datastructures import UploadFile as StarletteUploadFile
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Optional, Dict, Any, AsyncIterator, Awaitable, Callable, Literal, Set, Tuple, Type
 import uuid
-from datetime import datetime
-import PyPDF2
-import docx
-import io
-import re
+from datetime import datetime, timezone
 import json
-from emergentintegrations.llm.chat import LlmChat, UserMessage
-import textstat
 import asyncio
+import random
+import tempfile
+import time
+
+from ats_engine import (
+    RESUME_TEXT_PROJECTION,
+    LiveATSSession,
+    TopK,
+    ats_engine,
+    build_resume_text,
+    parse_job_description,
+)
+from data_access import (
+    ATS_SUMMARY_PROJECTION,
+    QUERY_SHAPES,
+    RESUME_SUMMARY_PROJECTION,
+    ensure_indexes,
+    export_cursor,
+    find_resume,
+    find_resume_for_ats,
+    find_resume_names,
+    find_page,
+    find_resume_skills,
+    find_unindexed_queries,
+    resume_exists,
+    update_resume_document,
+)
+from bulk_import import BulkImporter, copy_upload, remove_files, sweep_spool
+from derived_metrics import refresh_derived
+from export import gzip_chunks, ndjson_chunks, parse_fields
+from extraction import DocumentExtractor, ExtractionError
+from jobs import JobQueue, JobQueueFullError, current_job_id
+from json_stream import JSONItemStream
+from llm_cache import LLMResponseCache
+from llm_client import LLMClient, LLMSaturatedError, parse_budgets
+from llm_providers import ProviderRouter, parse_latency_budgets, parse_providers, parse_routes
+from llm_parsing import LLMResponseError, ParseMetrics, item_adapters, parse_response
+from local_parser import parse_resume_text
+from metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    LLM_BUCKETS,
+    SIZE_BUCKETS,
+    LoopLagMonitor,
+    MetricsMiddleware,
+    MetricsRegistry,
+    MongoCommandMetrics,
+    executor_queue_depth,
+)
+from prompt_serializer import serialize_resume
+from question_bank import BankKey, QuestionBank, normalize_skill, spread
+from search_index import search_index
+from singleflight import SingleFlight
+from upload_cache import UploadCache
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# Prometheus metrics, served at GET /metrics
+metrics_registry = MetricsRegistry()
+
+# MongoDB connection; every command is timed by the metrics listener
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[MongoCommandMetrics(metrics_registry)])
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
@@ -35,6 +89,98 @@ api_router = APIRouter(prefix="/api")
 # AI Integration
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 
+# Named providers and per-endpoint chains, e.g.
+# LLM_PROVIDERS="default=gemini:gemini-2.0-flash,fast=gemini:gemini-2.0-flash-lite,local=local"
+# LLM_ROUTES="suggestions=fast>default,bulk-import=local"
+# LLM_LATENCY_BUDGETS="suggestions=3" (seconds before falling back to the next provider)
+llm_router = ProviderRouter(
+    parse_providers(os.environ.get('LLM_PROVIDERS', 'default=gemini:gemini-2.0-flash'), api_key=GEMINI_API_KEY),
+    routes=parse_routes(os.environ.get('LLM_ROUTES', '')),
+    latency_budgets=parse_latency_budgets(os.environ.get('LLM_LATENCY_BUDGETS', ''))
+)
+
+# Shared LLM client: one per worker, with a global in-flight cap and per-endpoint budgets
+# (caps inside the global limit, each below it, so they may sum to more than it)
+llm_client = LLMClient(
+    router=llm_router,
+    system_message="You are an expert career counselor and resume writer. Provide helpful, professional advice.",
+    max_in_flight=int(os.environ.get('LLM_MAX_IN_FLIGHT', 16)),
+    max_waiting=int(os.environ.get('LLM_MAX_WAITING', 64)),
+    queue_timeout=float(os.environ.get('LLM_QUEUE_TIMEOUT_SECONDS', 10)),
+    endpoint_budgets=parse_budgets(os.environ.get(
+        'LLM_ENDPOINT_BUDGETS', 'upload=4,analysis=6,interview=4,quiz=4,suggestions=8,bulk-import=2'
+    ))
+)
+
+# PDF/DOCX extraction runs in a process pool so uploads never block the event loop
+document_extractor = DocumentExtractor(
+    max_workers=int(os.environ['EXTRACTION_WORKERS']) if os.environ.get('EXTRACTION_WORKERS') else None,
+    pages_per_task=int(os.environ.get('EXTRACTION_PAGES_PER_TASK', 8)),
+    timeout=float(os.environ.get('EXTRACTION_TIMEOUT_SECONDS', 30)),
+    max_pages=int(os.environ.get('EXTRACTION_MAX_PAGES', 50)),
+    max_bytes=int(os.environ.get('EXTRACTION_MAX_BYTES', 10 * 1024 * 1024))
+)
+
+# Uploads whose local parse scores below this go to the LLM whole; above it only
+# sections scoring below LOCAL_PARSER_SECTION_CONFIDENCE do
+LOCAL_PARSER_MIN_CONFIDENCE = float(os.environ.get('LOCAL_PARSER_MIN_CONFIDENCE', 0.6))
+LOCAL_PARSER_SECTION_CONFIDENCE = float(os.environ.get('LOCAL_PARSER_SECTION_CONFIDENCE', 0.5))
+
+# Estimated token budget for a resume embedded in a prompt; older content is trimmed first
+PROMPT_RESUME_TOKEN_BUDGET = int(os.environ.get('PROMPT_RESUME_TOKEN_BUDGET', 1500))
+
+# Extraction/parsing results of uploaded files, keyed by SHA-256 of the bytes
+upload_cache = UploadCache(db.upload_cache, ttl=int(os.environ.get('UPLOAD_CACHE_TTL_SECONDS', 30 * 86400)))
+
+# Persistent queue for AI work requested with ?async=true
+job_queue = JobQueue(
+    db.jobs,
+    workers=int(os.environ.get('JOB_WORKERS', 4)),
+    max_queued=int(os.environ.get('JOB_QUEUE_SIZE', 100))
+)
+
+# Concurrent identical prompts await a single upstream call
+llm_singleflight = SingleFlight()
+
+# Outcomes of validating/repairing AI JSON answers, per endpoint
+llm_parse_metrics = ParseMetrics()
+
+# Generated quiz/interview questions, reused across resumes with the same skills
+question_bank = QuestionBank(
+    db.question_bank,
+    min_stock=int(os.environ.get('QUESTION_BANK_MIN_STOCK', 30)),
+    refill_batch=int(os.environ.get('QUESTION_BANK_REFILL_BATCH', 10)),
+    refill_keys=int(os.environ.get('QUESTION_BANK_REFILL_KEYS', 3))
+)
+
+# LLM response cache (in-process LRU + shared Mongo TTL collection)
+llm_cache = LLMResponseCache(
+    db.llm_cache,
+    max_size=int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 1024)),
+    memory_ttl=float(os.environ.get('LLM_CACHE_MEMORY_TTL_SECONDS', 3600)),
+    ttl=int(os.environ.get('LLM_CACHE_TTL_SECONDS', 86400))
+)
+
+# Where request time goes: upstream LLM calls, document parsing, executor backlog
+llm_request_seconds = metrics_registry.histogram(
+    "llm_request_duration_seconds", "Upstream LLM call latency, including the wait for a slot",
+    ("endpoint", "outcome"), LLM_BUCKETS
+)
+llm_prompt_chars = metrics_registry.histogram("llm_prompt_chars", "LLM prompt size", ("endpoint",), SIZE_BUCKETS)
+llm_response_chars = metrics_registry.histogram("llm_response_chars", "LLM response size", ("endpoint",), SIZE_BUCKETS)
+document_parse_seconds = metrics_registry.histogram(
+    "document_parse_duration_seconds", "PDF/DOCX text extraction latency", ("parser", "outcome")
+)
+metrics_registry.gauge(
+    "extraction_pending_tasks", "Extraction tasks queued or running in the process pool",
+    function=lambda: document_extractor.pending
+)
+metrics_registry.gauge(
+    "default_executor_queue_depth", "Work items waiting for a thread in the default executor",
+    function=lambda: executor_queue_depth(getattr(asyncio.get_running_loop(), "_default_executor", None))
+)
+loop_lag_monitor = LoopLagMonitor(metrics_registry, interval=float(os.environ.get('METRICS_LOOP_LAG_INTERVAL_SECONDS', 0.5)))
+
 # Models
 class PersonalInfo(BaseModel):
     full_name: str = ""
@@ -84,6 +230,15 @@ class Certification(BaseModel):
     date: str = ""
     credential_id: str = ""
 
+class ResumeDerived(BaseModel):
+    # Recomputed in the background whenever the content hash changes
+    content_hash: str = ""
+    readability_score: float = 0.0
+    word_count: int = 0
+    token_estimate: int = 0
+    version: int = 0
+    computed_at: Optional[datetime] = None
+
 class Resume(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -96,6 +251,18 @@ class Resume(BaseModel):
     summary: str = ""
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    derived: Optional[ResumeDerived] = None
+
+class ResumeItemChange(BaseModel):
+    op: Literal["add", "update", "remove"]
+    section: Literal["education", "experience", "projects", "certifications"]
+    item_id: Optional[str] = None
+    value: Dict[str, Any] = {}
+
+class ResumePatch(BaseModel):
+    # Section- or field-level replacements, e.g. {"summary": "..."} or {"personal_info.email": "..."}
+    fields: Dict[str, Any] = {}
+    items: List[ResumeItemChange] = []
 
 class ATSAnalysis(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -108,6 +275,59 @@ class ATSAnalysis(BaseModel):
     job_description: str = ""
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class ATSRankRequest(BaseModel):
+    job_description: str
+    resume_ids: Optional[List[str]] = None
+    filter: Dict[str, Any] = {}
+    top_k: int = Field(default=10, ge=1, le=1000)
+    batch_size: int = Field(default=1000, ge=1, le=10000)
+
+class RankedResume(BaseModel):
+    resume_id: str
+    full_name: str = ""
+    ats_score: int
+    matched_count: int
+    matched_keywords: List[str] = []
+    missing_keywords: List[str] = []
+
+class ATSRanking(BaseModel):
+    keyword_count: int
+    scanned: int
+    results: List[RankedResume] = []
+
+class ResumeSearchHit(BaseModel):
+    resume_id: str
+    full_name: str = ""
+    score: float
+
+class ResumeSearchResults(BaseModel):
+    query: str
+    total_hits: int
+    results: List[ResumeSearchHit] = []
+
+class ResumeSummary(BaseModel):
+    id: str
+    user_id: str
+    full_name: str = ""
+    email: str = ""
+    created_at: datetime
+    updated_at: datetime
+
+class ResumeSummaryPage(BaseModel):
+    results: List[ResumeSummary] = []
+    next_cursor: Optional[str] = None
+
+class ATSAnalysisSummary(BaseModel):
+    id: str
+    resume_id: str
+    ats_score: int
+    section_scores: Dict[str, int] = {}
+    created_at: datetime
+
+class ATSAnalysisPage(BaseModel):
+    results: List[ATSAnalysisSummary] = []
+    next_cursor: Optional[str] = None
+
 class ResumeAnalysis(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     resume_id: str
@@ -123,6 +343,7 @@ class InterviewQuestion(BaseModel):
     question: str
     category: str  # "HR", "Behavioral", "Technical"
     difficulty: str  # "Easy", "Medium", "Hard"
+    skill_category: str = ""
 
 class QuizQuestion(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -131,10 +352,40 @@ class QuizQuestion(BaseModel):
     correct_answer: int
     explanation: str
     skill_category: str
+    difficulty: str = ""
 
 class JobRoleSuggestion(BaseModel):
     job_role: str
 
+# Schemas the AI endpoints' JSON answers are validated against
+class AnalysisFeedback(BaseModel):
+    pros: List[str]
+    cons: List[str]
+    suggestions: List[str]
+
+class ResumeInterviewQuestions(BaseModel):
+    behavioral_questions: List[InterviewQuestion]
+
+class InterviewQuestionSet(BaseModel):
+    hr_questions: List[InterviewQuestion]
+    behavioral_questions: List[InterviewQuestion]
+    technical_questions: List[InterviewQuestion]
+
+class TechnicalQuiz(BaseModel):
+    questions: List[QuizQuestion]
+
+class SkillSuggestions(BaseModel):
+    technical: List[str] = []
+    soft: List[str] = []
+    tools: List[str] = []
+
+class JobSuggestions(BaseModel):
+    summary_suggestions: List[str]
+    skills_suggestions: SkillSuggestions
+    experience_keywords: List[str] = []
+    project_ideas: List[str] = []
+    certification_recommendations: List[str] = []
+
 class ResumeCreate(BaseModel):
     personal_info: PersonalInfo
     education: List[Education] = []
@@ -144,96 +395,297 @@ class ResumeCreate(BaseModel):
     certifications: List[Certification] = []
     summary: str = ""
 
+class ParsedResume(BaseModel):
+    # Upload parsing may ask the AI for only some sections
+    personal_info: Optional[PersonalInfo] = None
+    summary: Optional[str] = None
+    education: Optional[List[Education]] = None
+    experience: Optional[List[Experience]] = None
+    projects: Optional[List[Project]] = None
+    skills: Optional[List[Skill]] = None
+    certifications: Optional[List[Certification]] = None
+
 # Helper Functions
-def parse_pdf(file_content: bytes) -> str:
-    """Extract text from PDF file"""
+RESUME_ITEM_MODELS = {
+    "education": Education,
+    "experience": Experience,
+    "projects": Project,
+    "certifications": Certification,
+}
+RESUME_SECTION_MODELS = {**RESUME_ITEM_MODELS, "skills": Skill}
+
+def validate_patch_field(path: str, value: Any) -> Any:
+    """Validate one entry of ResumePatch.fields and return its stored form"""
+    section, _, field = path.partition(".")
+    if path == "summary":
+        if not isinstance(value, str):
+            raise HTTPException(status_code=422, detail="summary must be a string")
+        return value
+    if path == "personal_info":
+        if not isinstance(value, dict):
+            raise HTTPException(status_code=422, detail="personal_info must be an object")
+        return PersonalInfo(**value).dict()
+    if section == "personal_info" and field in PersonalInfo.model_fields:
+        return PersonalInfo(**{field: value}).dict()[field]
+    if path in RESUME_SECTION_MODELS:
+        model = RESUME_SECTION_MODELS[path]
+        if not isinstance(value, list) or not all(isinstance(item, dict) for item in value):
+            raise HTTPException(status_code=422, detail=f"{path} must be a list of objects")
+        return [model(**item).dict() for item in value]
+    raise HTTPException(status_code=422, detail=f"Field '{path}' cannot be patched")
+
+def build_resume_patch(
+    patch: ResumePatch
+) -> Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]:
+    """Translate a ResumePatch into (extra filter, update document, array filters)"""
+    set_ops: Dict[str, Any] = {}
+    push_ops: Dict[str, List[Dict[str, Any]]] = {}
+    pull_ops: Dict[str, List[str]] = {}
+    extra_filter: Dict[str, Any] = {}
+    array_filters: List[Dict[str, Any]] = []
+    touched: Dict[str, str] = {}
+    # One array filter identifier per targeted item; Mongo rejects unused filters
+    identifiers: Dict[Tuple[str, str], str] = {}
+    updated_fields: Set[Tuple[str, str, str]] = set()
+    
+    def touch(section: str, operator: str) -> None:
+        # Mongo rejects one update that applies two operators to the same array
+        if touched.setdefault(section, operator) != operator:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Conflicting changes to '{section}'; send them in separate requests"
+            )
+    
+    for path, value in patch.fields.items():
+        section, _, field = path.partition(".")
+        touch(section, "$set" if field else "$replace")
+        set_ops[path] = validate_patch_field(path, value)
+    
+    for change in patch.items:
+        model = RESUME_ITEM_MODELS[change.section]
+        if change.op == "add":
+            touch(change.section, "$push")
+            push_ops.setdefault(change.section, []).append(model(**change.value).dict())
+            continue
+        
+        if not change.item_id:
+            raise HTTPException(status_code=422, detail=f"item_id is required to {change.op} an item")
+        # Every targeted item must exist, otherwise the whole update matches nothing
+        condition = {f"{change.section}.id": change.item_id}
+        if condition not in extra_filter.setdefault("$and", []):
+            extra_filter["$and"].append(condition)
+        
+        if change.op == "remove":
+            touch(change.section, "$pull")
+            pull_ops.setdefault(change.section, []).append(change.item_id)
+        else:
+            touch(change.section, "$set")
+            if not change.value:
+                raise HTTPException(status_code=422, detail="value must name at least one field to update")
+            unknown = set(change.value) - set(model.model_fields) | ({"id"} & set(change.value))
+            if unknown:
+                raise HTTPException(status_code=422, detail=f"Cannot update {sorted(unknown)} on {change.section}")
+            validated = model(**change.value)
+            target = (change.section, change.item_id)
+            if target not in identifiers:
+                identifiers[target] = f"i{len(identifiers)}"
+                array_filters.append({f"{identifiers[target]}.id": change.item_id})
+            for field in change.value:
+                if (*target, field) in updated_fields:
+                    raise HTTPException(
+                        status_code=409,
+                        detail=f"'{field}' of {change.section} item {change.item_id} is updated twice"
+                    )
+                updated_fields.add((*target, field))
+                set_ops[f"{change.section}.$[{identifiers[target]}].{field}"] = getattr(validated, field)
+    
+    set_ops["updated_at"] = datetime.utcnow()
+    update: Dict[str, Any] = {"$set": set_ops}
+    if push_ops:
+        update["$push"] = {section: {"$each": items} for section, items in push_ops.items()}
+    if pull_ops:
+        update["$pull"] = {section: {"id": {"$in": ids}} for section, ids in pull_ops.items()}
+    return extra_filter, update, array_filters
+
+async def extract_resume_text(filename: str, file_content: bytes) -> str:
+    """Extract text from an uploaded PDF/DOCX in the extraction process pool"""
+    parser = "parse_pdf" if filename.lower().endswith('.pdf') else "parse_docx"
+    started = time.perf_counter()
     try:
-        pdf_file = io.BytesIO(file_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error parsing PDF: {str(e)}")
+        text = await document_extractor.extract(filename, file_content)
+    except ExtractionError as e:
+        document_parse_seconds.observe(time.perf_counter() - started, parser, "error")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    document_parse_seconds.observe(time.perf_counter() - started, parser, "ok")
+    return text
 
-def parse_docx(file_content: bytes) -> str:
-    """Extract text from DOCX file"""
+def observe_llm_call(endpoint: str, prompt: str, response_chars: Optional[int], started: float, outcome: str) -> None:
+    llm_request_seconds.observe(time.perf_counter() - started, endpoint, outcome)
+    llm_prompt_chars.observe(len(prompt), endpoint)
+    if response_chars is not None:
+        llm_response_chars.observe(response_chars, endpoint)
+
+async def complete_llm(prompt: str, endpoint: str) -> Tuple[str, str]:
+    """``llm_client.complete`` with latency and size metrics"""
+    started = time.perf_counter()
+    outcome, response = "cancelled", None
     try:
-        doc_file = io.BytesIO(file_content)
-        doc = docx.Document(doc_file)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error parsing DOCX: {str(e)}")
+        response, provider = await llm_client.complete(prompt, endpoint=endpoint)
+        outcome = "ok"
+        return response, provider
+    except LLMSaturatedError:
+        outcome = "saturated"
+        raise
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        observe_llm_call(endpoint, prompt, len(response) if response is not None else None, started, outcome)
 
-async def get_ai_suggestions(prompt: str) -> str:
-    """Get AI suggestions using Gemini"""
+async def stream_llm(prompt: str, endpoint: str) -> AsyncIterator[str]:
+    """``llm_client.stream`` with latency and size metrics"""
+    started = time.perf_counter()
+    outcome, size = "cancelled", 0
     try:
-        chat = LlmChat(
-            api_key=GEMINI_API_KEY,
-            session_id=str(uuid.uuid4()),
-            system_message="You are an expert career counselor and resume writer. Provide helpful, professional advice."
-        ).with_model("gemini", "gemini-2.0-flash")
-        
-        user_message = UserMessage(text=prompt)
-        response = await chat.send_message(user_message)
-        return response
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"AI service error: {str(e)}")
+        async for chunk in llm_client.stream(prompt, endpoint=endpoint):
+            size += len(chunk)
+            yield chunk
+        outcome = "ok"
+    except LLMSaturatedError:
+        outcome = "saturated"
+        raise
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        observe_llm_call(endpoint, prompt, size if outcome == "ok" else None, started, outcome)
 
-def calculate_ats_score(resume_text: str, job_description: str = "") -> Dict[str, Any]:
-    """Calculate ATS compatibility score"""
-    score = 60  # Base score
-    recommendations = []
-    matched_keywords = []
-    missing_keywords = []
-    
-    # Check for contact information
-    if re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', resume_text):
-        score += 5
-    else:
-        recommendations.append("Add email address")
+async def get_ai_suggestions(prompt: str, endpoint: str = "default") -> Tuple[str, str]:
+    """Get AI suggestions from the provider routed to ``endpoint``
+
+    Returns the answer and the name of the provider that gave it, which is
+    not the route's primary when the router fell back. Concurrent identical
+    prompts share one upstream call. ``endpoint`` selects the provider chain
+    and the concurrency budget the call is charged to.
+    """
+    flight_key = llm_cache.make_key(llm_client.model_name(endpoint), llm_client.system_message, prompt)
+    try:
+        return await llm_singleflight.do(flight_key, lambda: complete_llm(prompt, endpoint))
+    except LLMSaturatedError as e:
+        raise HTTPException(status_code=503, detail=f"AI service busy: {str(e)}", headers={"Retry-After": "5"})
+    except Exception:
+        # Upstream errors can carry request details; log them, send a generic message
+        logger.exception("AI call for %s failed", endpoint)
+        raise HTTPException(status_code=500, detail="AI service error")
+
+async def get_ai_json(prompt: str, schema, endpoint: str, cache: bool = False) -> Dict[str, Any]:
+    """Get an AI answer as a dict validated against ``schema``
+
+    With ``cache=True`` identical (model, system message, prompt) requests are
+    answered from the LLM response cache. Only answers that validated are
+    written, as the validated JSON, so a hit never needs a repair call.
+    Answers from a fallback provider are not cached: the key names the
+    route's primary model, and a fallback (e.g. ``local``) answer would
+    otherwise be served in its place until the entry expires.
+    """
+    prompt_key = llm_cache.make_key(llm_client.model_name(endpoint), llm_client.system_message, prompt)
+    if cache:
+        cached = await llm_cache.get(prompt_key)
+        if cached is not None:
+            return await parse_ai_response(cached, schema, endpoint)
     
-    if re.search(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', resume_text):
-        score += 5
-    else:
-        recommendations.append("Add phone number")
+    response, provider = await get_ai_suggestions(prompt, endpoint=endpoint)
+    result = await parse_ai_response(response, schema, endpoint)
+    if cache and provider == llm_client.primary(endpoint):
+        await llm_cache.set(prompt_key, json.dumps(result, default=str), model=llm_client.model_name(endpoint))
+    return result
+
+async def parse_ai_response(response: str, schema, endpoint: str, payload: Any = None) -> Dict[str, Any]:
+    """Validate an AI answer, making one cheap repair call if it is malformed"""
+    async def repair(prompt: str) -> str:
+        response, _ = await get_ai_suggestions(prompt, endpoint=endpoint)
+        return response
+    
+    return await parse_response(response, schema, repair, llm_parse_metrics, endpoint, payload=payload)
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def stream_ai_response(
+    prompt: str,
+    endpoint: str,
+    schema,
+    finalize: Callable[[Dict[str, Any]], Awaitable[Any]]
+) -> StreamingResponse:
+    """Stream an AI JSON answer as SSE
+
+    Emits one ``item`` event per completed, schema-valid element of the list
+    fields of ``schema`` while tokens arrive, then a ``result`` event carrying
+    what the non-streaming endpoint would return (``finalize`` applied to the
+    validated object). Failures after the stream has started are reported as
+    ``error`` events.
+    """
+    adapters = item_adapters(schema)
     
-    # Check for sections
-    sections = ['experience', 'education', 'skills', 'summary']
-    section_scores = {}
+    async def events():
+        parser = JSONItemStream(adapters)
+        try:
+            async for chunk in stream_llm(prompt, endpoint):
+                for key, item in parser.feed(chunk):
+                    try:
+                        item = adapters[key].dump_python(adapters[key].validate_python(item), exclude_unset=True)
+                    except ValidationError:
+                        llm_parse_metrics.record(endpoint, "invalid_items")
+                        continue
+                    yield sse_event("item", {"key": key, "item": item})
+            
+            payload = await parse_ai_response(parser.buffer, schema, endpoint, payload=parser.result())
+            result = await finalize(payload)
+            yield sse_event("result", jsonable_encoder(result))
+        except LLMSaturatedError as e:
+            yield sse_event("error", {"status_code": 503, "detail": f"AI service busy: {str(e)}"})
+        except HTTPException as e:
+            yield sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+        except LLMResponseError as e:
+            yield sse_event("error", {"status_code": 500, "detail": f"Could not parse AI response: {str(e)}"})
+        except Exception:
+            # Upstream errors can carry request details; log them, send a generic message
+            logger.exception("Streaming AI response for %s failed", endpoint)
+            yield sse_event("error", {"status_code": 500, "detail": "AI service error"})
     
-    for section in sections:
-        if section.lower() in resume_text.lower():
-            score += 7
-            section_scores[section] = 85
-        else:
-            recommendations.append(f"Add {section} section")
-            section_scores[section] = 0
-    
-    # Job description keyword matching
-    if job_description:
-        job_keywords = re.findall(r'\b[A-Za-z]+\b', job_description.lower())
-        job_keywords = [kw for kw in job_keywords if len(kw) > 3]
-        resume_keywords = re.findall(r'\b[A-Za-z]+\b', resume_text.lower())
-        
-        for keyword in set(job_keywords):
-            if keyword in resume_keywords:
-                matched_keywords.append(keyword)
-                score += 1
-            else:
-                missing_keywords.append(keyword)
-    
-    return {
-        "ats_score": min(score, 100),
-        "matched_keywords": matched_keywords[:10],
-        "missing_keywords": missing_keywords[:10],
-        "section_scores": section_scores,
-        "recommendations": recommendations
-    }
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def resume_prompt_text(resume: Dict[str, Any]) -> str:
+    """Compact resume text for prompts, trimmed to PROMPT_RESUME_TOKEN_BUDGET"""
+    serialized = serialize_resume(resume, PROMPT_RESUME_TOKEN_BUDGET)
+    logger.debug(
+        "Resume %s serialized to ~%d prompt tokens%s",
+        resume.get("id"), serialized.tokens, " (truncated)" if serialized.truncated else ""
+    )
+    return serialized.text
+
+def calculate_ats_score(resume_text: str, job_description: str = "") -> Dict[str, Any]:
+    """Calculate ATS compatibility score"""
+    return ats_engine.score(resume_text, job_description)
+
+# Operators that would let a caller run server-side code through a filter
+FORBIDDEN_FILTER_OPERATORS = {"$where", "$function", "$accumulator"}
+
+def validate_query_filter(query: Any) -> None:
+    """Reject user-supplied Mongo filters that contain code-execution operators"""
+    if isinstance(query, dict):
+        for key, value in query.items():
+            if key in FORBIDDEN_FILTER_OPERATORS:
+                raise HTTPException(status_code=400, detail=f"Operator {key} is not allowed in filter")
+            validate_query_filter(value)
+    elif isinstance(query, list):
+        for item in query:
+            validate_query_filter(item)
 
 # API Routes
 @api_router.get("/")
@@ -241,55 +693,116 @@ async def root():
     return {"message": "SmartHirePro API is running"}
 
 @api_router.post("/resume", response_model=Resume)
-async def create_resume(resume_data: ResumeCreate):
+async def create_resume(resume_data: ResumeCreate, background_tasks: BackgroundTasks):
     """Create a new resume"""
     resume = Resume(**resume_data.dict())
     resume.updated_at = datetime.utcnow()
     
-    result = await db.resumes.insert_one(resume.dict())
+    resume_doc = resume.dict()
+    await db.resumes.insert_one(resume_doc)
+    await search_index.index_resume(db, resume_doc)
+    background_tasks.add_task(refresh_derived, db, resume_doc)
     return resume
 
+def trusted_response(model: Type[BaseModel], document: Dict[str, Any]) -> ORJSONResponse:
+    """Serialize a document this API wrote itself without validating it again
+
+    Stored resumes were validated on the way in, so re-running the nested
+    models (and FastAPI's response_model pass) only costs CPU. Unknown keys
+    are dropped and missing fields with a plain default (``""``, ``[]``,
+    ``None``) are filled in; documents missing anything else, such as
+    ``personal_info`` or ``created_at`` in older records, take the validating
+    path so no model instances or made-up timestamps reach the encoder.
+    """
+    content = {}
+    for name, field in model.model_fields.items():
+        if name in document:
+            content[name] = document[name]
+        elif field.default_factory is None and isinstance(field.default, (str, int, float, list, type(None))):
+            content[name] = field.default
+        else:
+            return ORJSONResponse(model(**document).model_dump(mode="json"))
+    return ORJSONResponse(content)
+
 @api_router.get("/resume/{resume_id}", response_model=Resume)
 async def get_resume(resume_id: str):
     """Get resume by ID"""
-    resume = await db.resumes.find_one({"id": resume_id})
+    resume = await find_resume(db, resume_id)
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
-    return Resume(**resume)
+    return trusted_response(Resume, resume)
 
 @api_router.put("/resume/{resume_id}", response_model=Resume)
-async def update_resume(resume_id: str, resume_data: ResumeCreate):
+async def update_resume(resume_id: str, resume_data: ResumeCreate, background_tasks: BackgroundTasks):
     """Update existing resume"""
-    resume = await db.resumes.find_one({"id": resume_id})
-    if not resume:
-        raise HTTPException(status_code=404, detail="Resume not found")
-    
     updated_data = resume_data.dict()
     updated_data["updated_at"] = datetime.utcnow()
     
-    await db.resumes.update_one({"id": resume_id}, {"$set": updated_data})
+    updated_resume = await update_resume_document(db, resume_id, {"$set": updated_data})
+    if not updated_resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
     
-    updated_resume = await db.resumes.find_one({"id": resume_id})
-    return Resume(**updated_resume)
+    await search_index.index_resume(db, updated_resume)
+    background_tasks.add_task(refresh_derived, db, updated_resume)
+    return trusted_response(Resume, updated_resume)
 
-@api_router.post("/resume/upload")
-async def upload_resume(file: UploadFile = File(...)):
-    """Upload and parse resume file"""
-    if not file.filename.lower().endswith(('.pdf', '.docx')):
-        raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
+@api_router.patch("/resume/{resume_id}", response_model=Resume)
+async def patch_resume(resume_id: str, patch: ResumePatch, background_tasks: BackgroundTasks):
+    """Apply section- or item-level changes to a resume"""
+    try:
+        extra_filter, update, array_filters = build_resume_patch(patch)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     
-    file_content = await file.read()
+    updated_resume = await update_resume_document(db, resume_id, update, extra_filter, array_filters)
+    if not updated_resume:
+        if await resume_exists(db, resume_id):
+            raise HTTPException(status_code=404, detail="Resume item not found")
+        raise HTTPException(status_code=404, detail="Resume not found")
     
-    if file.filename.lower().endswith('.pdf'):
-        text = parse_pdf(file_content)
-    else:
-        text = parse_docx(file_content)
+    await search_index.index_resume(db, updated_resume)
+    background_tasks.add_task(refresh_derived, db, updated_resume)
+    return trusted_response(Resume, updated_resume)
+
+@api_router.get("/resumes/search", response_model=ResumeSearchResults)
+async def search_resumes(q: str, top_k: int = Query(default=10, ge=1, le=100)):
+    """Full-text BM25 search over stored resumes"""
+    await search_index.sync(db)
+    total_hits, ranked = search_index.search(q, top_k)
     
-    # Use AI to parse the resume text into structured data
-    prompt = f"""
-    Parse the following resume text and extract structured information. Return a JSON object with the following structure:
-    {{
-        "personal_info": {{
+    names = await find_resume_names(db, [resume_id for resume_id, _ in ranked]) if ranked else {}
+    
+    return ResumeSearchResults(
+        query=q,
+        total_hits=total_hits,
+        results=[
+            ResumeSearchHit(resume_id=resume_id, full_name=names.get(resume_id, ""), score=round(score, 4))
+            for resume_id, score in ranked
+        ]
+    )
+
+@api_router.get("/resumes", response_model=ResumeSummaryPage)
+async def list_resumes(user_id: str, cursor: Optional[str] = None, limit: int = Query(default=20, ge=1, le=100)):
+    """A user's resumes, newest first; pass ``next_cursor`` back as ``cursor`` for the next page"""
+    try:
+        documents, next_cursor = await find_page(db, "resumes", {"user_id": user_id}, RESUME_SUMMARY_PROJECTION, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return ResumeSummaryPage(
+        results=[
+            ResumeSummary(
+                full_name=(doc.get("personal_info") or {}).get("full_name", ""),
+                email=(doc.get("personal_info") or {}).get("email", ""),
+                **{key: doc[key] for key in ("id", "user_id", "created_at", "updated_at")}
+            )
+            for doc in documents
+        ],
+        next_cursor=next_cursor
+    )
+
+RESUME_PARSE_TEMPLATES = {
+    "personal_info": """{
             "full_name": "",
             "email": "",
             "phone": "",
@@ -297,10 +810,10 @@ async def upload_resume(file: UploadFile = File(...)):
             "linkedin": "",
             "github": "",
             "website": ""
-        }},
-        "summary": "",
-        "experience": [
-            {{
+        }""",
+    "summary": '""',
+    "experience": """[
+            {
                 "title": "",
                 "company": "",
                 "location": "",
@@ -308,10 +821,10 @@ async def upload_resume(file: UploadFile = File(...)):
                 "end_date": "",
                 "description": "",
                 "is_current": false
-            }}
-        ],
-        "education": [
-            {{
+            }
+        ]""",
+    "education": """[
+            {
                 "degree": "",
                 "institution": "",
                 "location": "",
@@ -319,31 +832,40 @@ async def upload_resume(file: UploadFile = File(...)):
                 "end_date": "",
                 "gpa": "",
                 "relevant_coursework": ""
-            }}
-        ],
-        "skills": [
-            {{
+            }
+        ]""",
+    "skills": """[
+            {
                 "category": "",
                 "skills": []
-            }}
-        ],
-        "projects": [
-            {{
+            }
+        ]""",
+    "projects": """[
+            {
                 "name": "",
                 "description": "",
                 "technologies": "",
                 "github_link": "",
                 "live_link": ""
-            }}
-        ],
-        "certifications": [
-            {{
+            }
+        ]""",
+    "certifications": """[
+            {
                 "name": "",
                 "issuer": "",
                 "date": "",
                 "credential_id": ""
-            }}
-        ]
+            }
+        ]""",
+}
+
+def build_parse_prompt(text: str, sections: List[str]) -> str:
+    """Prompt asking the LLM to structure only the given resume sections"""
+    structure = ",\n        ".join(f'"{section}": {RESUME_PARSE_TEMPLATES[section]}' for section in sections)
+    return f"""
+    Parse the following resume text and extract structured information. Return a JSON object with the following structure:
+    {{
+        {structure}
     }}
     
     Resume text:
@@ -351,42 +873,181 @@ async def upload_resume(file: UploadFile = File(...)):
     
     Please extract and structure the information accurately. If any information is not available, leave the field empty.
     """
+
+@api_router.post("/resume/upload")
+async def upload_resume(file: UploadFile = File(...), async_job: bool = Query(default=False, alias="async")):
+    """Upload and parse resume file
+
+    With ``async=true`` the file is queued and a job id is returned immediately.
+    """
+    if not file.filename.lower().endswith(('.pdf', '.docx')):
+        raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
+    
+    # Read one byte past the limit so oversized files are rejected without buffering them whole
+    file_content = await file.read(document_extractor.max_bytes + 1)
+    
+    if async_job:
+        if len(file_content) > document_extractor.max_bytes:
+            raise HTTPException(status_code=413, detail="File is too large")
+        return await submit_job("upload", {"filename": file.filename, "file_content": file_content})
+    
+    return await process_resume_upload(file.filename, file_content)
+
+async def process_resume_upload(filename: str, file_content: bytes, endpoint: str = "upload") -> Dict[str, Any]:
+    """Extract text from an uploaded file and structure it, using AI only where local parsing is unsure"""
+    # Repeat uploads of the same bytes reuse earlier extraction/parsing results
+    content_hash = await asyncio.get_running_loop().run_in_executor(None, upload_cache.digest, file_content)
+    cached = await upload_cache.get(content_hash, len(file_content))
+    if cached and cached.get("parsed_data") is not None:
+        return {"parsed_data": cached["parsed_data"], "raw_text": cached["raw_text"], "content_hash": content_hash, "cached": True}
+    
+    if cached and cached.get("raw_text") is not None:
+        text = cached["raw_text"]
+    else:
+        text = await extract_resume_text(filename, file_content)
+        await upload_cache.put(content_hash, len(file_content), text)
+    
+    # Well-formatted resumes parse locally; only what the rules are unsure of goes to the LLM
+    local = await asyncio.get_running_loop().run_in_executor(None, parse_resume_text, text)
+    parsed_data = local["parsed_data"]
+    if local["confidence"] < LOCAL_PARSER_MIN_CONFIDENCE:
+        sections = list(RESUME_PARSE_TEMPLATES)
+    else:
+        sections = [
+            section for section, confidence in local["section_confidence"].items()
+            if confidence < LOCAL_PARSER_SECTION_CONFIDENCE
+        ]
+    result = {"raw_text": text, "content_hash": content_hash, "cached": False, "confidence": local["confidence"]}
+    
+    if not sections:
+        await upload_cache.put(content_hash, len(file_content), text, parsed_data)
+        return {"parsed_data": parsed_data, **result, "parser": "local"}
     
     try:
-        ai_response = await get_ai_suggestions(prompt)
-        # Extract JSON from AI response
-        json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
-        if json_match:
-            parsed_data = json.loads(json_match.group())
-            return {"parsed_data": parsed_data, "raw_text": text}
-        else:
-            return {"parsed_data": None, "raw_text": text, "error": "Could not parse resume structure"}
+        ai_data = await get_ai_json(build_parse_prompt(text, sections), ParsedResume, endpoint)
+        parsed_data = {**parsed_data, **{s: ai_data[s] for s in sections if s in ai_data}}
+        await upload_cache.put(content_hash, len(file_content), text, parsed_data)
+        parser = "llm" if len(sections) == len(RESUME_PARSE_TEMPLATES) else "hybrid"
+        return {"parsed_data": parsed_data, **result, "parser": parser}
+    except LLMResponseError:
+        error = "Could not parse resume structure"
+    except HTTPException as e:
+        if e.status_code == 503:
+            raise
+        error = e.detail
     except Exception as e:
-        return {"parsed_data": None, "raw_text": text, "error": str(e)}
+        error = str(e)
+    
+    # The local parse is still better than nothing when the LLM is unavailable
+    if local["confidence"] > 0:
+        return {"parsed_data": parsed_data, **result, "parser": "local", "error": error}
+    return {"parsed_data": None, **result, "error": error}
+
+# Bulk import
+BULK_IMPORT_DIR = os.environ.get('BULK_IMPORT_DIR') or os.path.join(tempfile.gettempdir(), 'smarthirepro-imports')
+BULK_IMPORT_MAX_BYTES = int(os.environ.get('BULK_IMPORT_MAX_BYTES', 500 * 1024 * 1024))
+BULK_IMPORT_MAX_FILES = int(os.environ.get('BULK_IMPORT_MAX_FILES', 1000))
+BULK_IMPORT_RETRIES = 4
+# Spooled files older than this belong to no live job and are removed at startup
+BULK_IMPORT_SPOOL_MAX_AGE_SECONDS = float(os.environ.get('BULK_IMPORT_SPOOL_MAX_AGE_SECONDS', 86400))
+
+async def read_bulk_import_form(request: Request) -> Tuple[List[StarletteUploadFile], Optional[str]]:
+    """(files, user_id) from the multipart form, with BULK_IMPORT_MAX_FILES as the file limit
+
+    Declaring ``File(...)`` parameters would parse the form with Starlette's
+    fixed default of 1000 files and report more as a generic 400.
+    """
+    try:
+        form = await request.form(max_files=BULK_IMPORT_MAX_FILES)
+    except StarletteHTTPException as e:
+        if "Too many files" in str(e.detail):
+            raise HTTPException(
+                status_code=413, detail=f"Import exceeds the limit of {BULK_IMPORT_MAX_FILES} files per request"
+            )
+        raise
+    files = [item for item in form.getlist("files") if isinstance(item, StarletteUploadFile)]
+    if not files:
+        raise HTTPException(status_code=422, detail="No files uploaded in the 'files' field")
+    user_id = form.get("user_id")
+    return files, user_id if isinstance(user_id, str) else None
+
+@api_router.post("/resumes/bulk-import")
+async def bulk_import_resumes(request: Request):
+    """Import many resumes from PDF/DOCX files and ZIP archives
+
+    Multipart form: ``files`` (repeated, up to BULK_IMPORT_MAX_FILES) and an
+    optional ``user_id``. Uploads are spooled to disk and imported by a
+    background job; poll ``GET /api/jobs/{job_id}`` for progress and
+    per-file failures.
+    """
+    files, user_id = await read_bulk_import_form(request)
+    spooled = []
+    remaining = BULK_IMPORT_MAX_BYTES
+    try:
+        for upload in files:
+            path, size = await copy_upload(upload, BULK_IMPORT_DIR, remaining)
+            spooled.append({"filename": upload.filename or "upload", "path": path})
+            remaining -= size
+    except ValueError:
+        remove_files([f["path"] for f in spooled])
+        raise HTTPException(
+            status_code=413, detail=f"Import exceeds the {BULK_IMPORT_MAX_BYTES // (1024 * 1024)} MB limit"
+        )
+    
+    params = {"import_id": str(uuid.uuid4()), "files": spooled, "user_id": user_id}
+    try:
+        return await submit_job("bulk-import", params)
+    except HTTPException:
+        remove_files([f["path"] for f in spooled])
+        raise
+
+async def import_resume_file(filename: str, file_content: bytes) -> Tuple[Dict[str, Any], str]:
+    """Extract and structure one imported file into a resume document"""
+    for attempt in range(BULK_IMPORT_RETRIES + 1):
+        try:
+            upload = await process_resume_upload(filename, file_content, endpoint="bulk-import")
+            break
+        except HTTPException as e:
+            # The import budget is small on purpose; back off instead of failing the file
+            if e.status_code != 503 or attempt == BULK_IMPORT_RETRIES:
+                raise
+            await asyncio.sleep(2 ** attempt)
+    
+    parsed_data = upload.get("parsed_data")
+    if parsed_data is None:
+        raise ValueError(upload.get("error") or "Could not parse resume structure")
+    fields = {key: value for key, value in parsed_data.items() if value is not None}
+    resume = Resume(**ResumeCreate(**{"personal_info": {}, **fields}).dict())
+    return resume.dict(), upload["content_hash"]
+
+async def index_imported_resumes(resumes: List[Dict[str, Any]]) -> None:
+    for resume in resumes:
+        await search_index.index_resume(db, resume)
+        await refresh_derived(db, resume)
+
+bulk_importer = BulkImporter(
+    db.resumes,
+    process=import_resume_file,
+    on_inserted=index_imported_resumes,
+    concurrency=int(os.environ.get('BULK_IMPORT_CONCURRENCY', 8)),
+    batch_size=int(os.environ.get('BULK_IMPORT_BATCH_SIZE', 100)),
+    max_entry_bytes=document_extractor.max_bytes
+)
+
+@api_router.get("/resume/upload/stats")
+async def get_upload_cache_stats():
+    """Upload dedupe cache hit rate and bytes saved for this worker"""
+    return upload_cache.stats()
 
 @api_router.post("/resume/{resume_id}/ats-analysis", response_model=ATSAnalysis)
 async def analyze_ats_score(resume_id: str, job_description: str = ""):
     """Analyze resume for ATS compatibility"""
-    resume = await db.resumes.find_one({"id": resume_id})
+    resume = await find_resume_for_ats(db, resume_id)
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
     
     # Convert resume to text for analysis
-    resume_text = f"""
-    {resume.get('personal_info', {}).get('full_name', '')}
-    {resume.get('personal_info', {}).get('email', '')}
-    {resume.get('personal_info', {}).get('phone', '')}
-    {resume.get('summary', '')}
-    """
-    
-    for exp in resume.get('experience', []):
-        resume_text += f"{exp.get('title', '')} {exp.get('company', '')} {exp.get('description', '')} "
-    
-    for edu in resume.get('education', []):
-        resume_text += f"{edu.get('degree', '')} {edu.get('institution', '')} "
-    
-    for skill_group in resume.get('skills', []):
-        resume_text += " ".join(skill_group.get('skills', []))
+    resume_text = build_resume_text(resume)
     
     # Calculate ATS score
     ats_data = calculate_ats_score(resume_text, job_description)
@@ -400,15 +1061,138 @@ async def analyze_ats_score(resume_id: str, job_description: str = ""):
     await db.ats_analyses.insert_one(analysis.dict())
     return analysis
 
+@api_router.get("/resume/{resume_id}/ats-analyses", response_model=ATSAnalysisPage)
+async def list_ats_analyses(resume_id: str, cursor: Optional[str] = None, limit: int = Query(default=20, ge=1, le=100)):
+    """ATS score history of a resume, newest first"""
+    if not await resume_exists(db, resume_id):
+        raise HTTPException(status_code=404, detail="Resume not found")
+    
+    try:
+        documents, next_cursor = await find_page(db, "ats_analyses", {"resume_id": resume_id}, ATS_SUMMARY_PROJECTION, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return ATSAnalysisPage(results=[ATSAnalysisSummary(**doc) for doc in documents], next_cursor=next_cursor)
+
+@api_router.websocket("/resume/{resume_id}/ats-live")
+async def live_ats_score(websocket: WebSocket, resume_id: str, job_description: str = ""):
+    """Live ATS scoring: apply section-level edits and push the updated score
+
+    See ``LiveATSSession`` for the message format. Every reply is the same
+    shape as the ATS analysis plus ``elapsed_ms``; nothing is persisted.
+    """
+    resume = await find_resume_for_ats(db, resume_id)
+    if not resume:
+        await websocket.close(code=4404)
+        return
+    
+    await websocket.accept()
+    session = LiveATSSession(resume, job_description)
+    await websocket.send_json({"type": "score", **session.scorer.result()})
+    
+    try:
+        while True:
+            raw_message = await websocket.receive_text()
+            started = time.perf_counter()
+            try:
+                result = session.apply(json.loads(raw_message))
+            except (ValueError, TypeError, AttributeError) as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+            await websocket.send_json({"type": "score", **result, "elapsed_ms": elapsed_ms})
+    except WebSocketDisconnect:
+        pass
+
+@api_router.post("/ats/rank", response_model=ATSRanking)
+async def rank_resumes(rank_request: ATSRankRequest):
+    """Rank stored resumes against one job description"""
+    job = parse_job_description(rank_request.job_description)
+    if not job.keywords:
+        raise HTTPException(status_code=400, detail="Job description has no matchable keywords")
+    
+    validate_query_filter(rank_request.filter)
+    query = dict(rank_request.filter)
+    if rank_request.resume_ids is not None:
+        query["id"] = {"$in": rank_request.resume_ids}
+    
+    loop = asyncio.get_running_loop()
+    top = TopK(rank_request.top_k)
+    scanned = 0
+    
+    async def score_batch(batch: List[Dict[str, Any]]) -> None:
+        # Tokenizing is CPU-bound; keep it off the event loop
+        texts = [build_resume_text(doc) for doc in batch]
+        scores, matches = await loop.run_in_executor(None, ats_engine.score_batch, texts, job)
+        for row, doc in enumerate(batch):
+            score = int(scores[row])
+            if top.would_accept(score):
+                top.push(score, (doc, matches[row].copy()))
+    
+    cursor = db.resumes.find(query, RESUME_TEXT_PROJECTION, batch_size=rank_request.batch_size)
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= rank_request.batch_size:
+            await score_batch(batch)
+            scanned += len(batch)
+            batch = []
+    if batch:
+        await score_batch(batch)
+        scanned += len(batch)
+    
+    keywords = job.keywords
+    results = []
+    for score, (doc, row_matches) in top.items():
+        matched = [keywords[i] for i in row_matches.nonzero()[0]]
+        missing = [keywords[i] for i in (~row_matches).nonzero()[0][:10]]
+        results.append(RankedResume(
+            resume_id=doc.get("id", ""),
+            full_name=(doc.get("personal_info") or {}).get("full_name", ""),
+            ats_score=score,
+            matched_count=len(matched),
+            matched_keywords=matched[:10],
+            missing_keywords=missing
+        ))
+    
+    return ATSRanking(keyword_count=len(keywords), scanned=scanned, results=results)
+
+async def save_resume_analysis(resume_id: str, resume: Dict[str, Any], feedback: Dict[str, Any]) -> ResumeAnalysis:
+    """Combine AI feedback with readability metrics and store the analysis"""
+    # Stored at write time; only recomputed here for resumes written before that
+    derived = await refresh_derived(db, resume)
+    
+    analysis = ResumeAnalysis(
+        resume_id=resume_id,
+        pros=feedback.get('pros', []),
+        cons=feedback.get('cons', []),
+        suggestions=feedback.get('suggestions', []),
+        readability_score=derived["readability_score"],
+        word_count=derived["word_count"]
+    )
+    
+    await db.resume_analyses.insert_one(analysis.dict())
+    return analysis
+
 @api_router.post("/resume/{resume_id}/analysis", response_model=ResumeAnalysis)
-async def analyze_resume(resume_id: str):
-    """Analyze resume for pros, cons, and suggestions"""
-    resume = await db.resumes.find_one({"id": resume_id})
+async def analyze_resume(
+    resume_id: str,
+    stream: bool = False,
+    async_job: bool = Query(default=False, alias="async")
+):
+    """Analyze resume for pros, cons, and suggestions
+
+    With ``stream=true`` the response is an SSE stream of pros/cons/suggestions;
+    with ``async=true`` the analysis is queued and a job id is returned.
+    """
+    resume = await find_resume(db, resume_id)
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
     
-    # Convert resume to text
-    resume_text = json.dumps(resume, default=str)
+    if async_job:
+        return await submit_job("analysis", {"resume_id": resume_id})
+    
+    resume_text = resume_prompt_text(resume)
     
     prompt = f"""
     Analyze the following resume and provide detailed feedback. Return a JSON object with:
@@ -428,47 +1212,212 @@ async def analyze_resume(resume_id: str):
     5. Professional language usage
     """
     
+    if stream:
+        return stream_ai_response(
+            prompt, "analysis", AnalysisFeedback,
+            lambda feedback: save_resume_analysis(resume_id, resume, feedback)
+        )
+    
     try:
-        ai_response = await get_ai_suggestions(prompt)
-        json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
-        
-        if json_match:
-            feedback = json.loads(json_match.group())
-            
-            # Calculate readability score
-            text_for_analysis = " ".join([
-                resume.get('summary', ''),
-                " ".join([exp.get('description', '') for exp in resume.get('experience', [])]),
-                " ".join([proj.get('description', '') for proj in resume.get('projects', [])])
-            ])
-            
-            readability_score = textstat.flesch_reading_ease(text_for_analysis) if text_for_analysis else 0
-            word_count = len(text_for_analysis.split()) if text_for_analysis else 0
-            
-            analysis = ResumeAnalysis(
-                resume_id=resume_id,
-                pros=feedback.get('pros', []),
-                cons=feedback.get('cons', []),
-                suggestions=feedback.get('suggestions', []),
-                readability_score=readability_score,
-                word_count=word_count
-            )
-            
-            await db.resume_analyses.insert_one(analysis.dict())
-            return analysis
-        else:
-            raise HTTPException(status_code=500, detail="Could not parse AI analysis")
+        feedback = await get_ai_json(prompt, AnalysisFeedback, "analysis")
+        return await save_resume_analysis(resume_id, resume, feedback)
+    except LLMResponseError:
+        raise HTTPException(status_code=500, detail="Could not parse AI analysis")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+async def passthrough(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return payload
+
+# Question bank
+QUIZ_SIZE = 15
+INTERVIEW_QUESTIONS_PER_CATEGORY = 5
+# Behavioral questions generated from the candidate's own resume instead of the bank (0: bank only)
+INTERVIEW_RESUME_QUESTIONS = int(os.environ.get('INTERVIEW_RESUME_QUESTIONS', INTERVIEW_QUESTIONS_PER_CATEGORY))
+INTERVIEW_CATEGORY_FIELDS = {
+    "HR": "hr_questions",
+    "Behavioral": "behavioral_questions",
+    "Technical": "technical_questions",
+}
+
+def bank_skill(skill_category: str, skills: List[str]) -> str:
+    """Bank skill for a generated question: the requested skill it names, else its own"""
+    skill = normalize_skill(skill_category)
+    if not skill:
+        return skills[0] if skills else ""
+    if skill in skills:
+        return skill
+    return next((s for s in skills if s in skill or skill in s), skill)
+
+def normalize_difficulty(difficulty: Optional[str]) -> str:
+    return (difficulty or "").strip().capitalize()
+
+def quiz_prompt(counts: Dict[BankKey, int], difficulty: Optional[str]) -> str:
+    plan = ", ".join(f"{n} about {skill}" for (_, skill), n in counts.items())
+    skills = ", ".join(skill for _, skill in counts)
+    level = f"All questions must be {difficulty} difficulty." if difficulty else "Include a mix of difficulty levels."
+    return f"""
+    Create a technical quiz with {sum(counts.values())} multiple choice questions: {plan}
+    
+    Return a JSON object with:
+    {{
+        "questions": [
+            {{
+                "question": "question text",
+                "options": ["option1", "option2", "option3", "option4"],
+                "correct_answer": 0,
+                "explanation": "explanation text",
+                "skill_category": "exactly one of: {skills}",
+                "difficulty": "Easy|Medium|Hard"
+            }}
+        ]
+    }}
+    
+    Make questions practical and relevant to the skills. {level}
+    """
+
+async def bank_quiz_questions(quiz: Dict[str, Any], skills: List[str], difficulty: Optional[str]) -> Dict[str, Any]:
+    """Add AI-generated quiz questions to the question bank"""
+    await question_bank.add("quiz", [
+        (("", bank_skill(question.get("skill_category", ""), skills)),
+         normalize_difficulty(question.get("difficulty") or difficulty), question)
+        for question in quiz.get("questions", [])
+    ])
+    return quiz
+
+async def generate_quiz_questions(counts: Dict[BankKey, int], difficulty: Optional[str]) -> List[Dict[str, Any]]:
+    """Generate quiz questions for the given (category, skill) counts and bank them"""
+    quiz = await get_ai_json(quiz_prompt(counts, difficulty), TechnicalQuiz, "quiz")
+    await bank_quiz_questions(quiz, [skill for _, skill in counts], difficulty)
+    return quiz["questions"][:sum(counts.values())]
+
+async def refill_quiz_questions(counts: Dict[BankKey, int], difficulty: Optional[str]) -> None:
+    await generate_quiz_questions(counts, difficulty)
+
+async def generate_bank_interview_questions(counts: Dict[BankKey, int]) -> Dict[str, List[Dict[str, Any]]]:
+    """Generate candidate-neutral interview questions for the given counts and bank them"""
+    technical = {skill: n for (category, skill), n in counts.items() if category == "Technical"}
+    technical_plan = ", ".join(f"{n} about {skill or 'general software engineering'}" for skill, n in technical.items())
+    prompt = f"""
+    Generate general interview questions that do not refer to any particular candidate or employer.
+    Return a JSON object with:
+    {{
+        "hr_questions": [
+            {{"question": "question text", "category": "HR", "difficulty": "Easy|Medium|Hard"}}
+        ],
+        "behavioral_questions": [
+            {{"question": "question text", "category": "Behavioral", "difficulty": "Easy|Medium|Hard"}}
+        ],
+        "technical_questions": [
+            {{"question": "question text", "category": "Technical", "difficulty": "Easy|Medium|Hard", "skill_category": "exactly one of: {', '.join(technical)}"}}
+        ]
+    }}
+    
+    Generate {counts.get(("HR", ""), 0)} HR questions, {counts.get(("Behavioral", ""), 0)} behavioral questions and {sum(technical.values())} technical questions ({technical_plan or 'none'}).
+    """
+    
+    questions = await get_ai_json(prompt, InterviewQuestionSet, "interview")
+    skills = list(technical)
+    entries = []
+    for category, field in INTERVIEW_CATEGORY_FIELDS.items():
+        for question in questions.get(field, []):
+            skill = bank_skill(question.get("skill_category", ""), skills) if category == "Technical" else ""
+            entries.append(((category, skill), normalize_difficulty(question.get("difficulty")), question))
+    await question_bank.add("interview", entries)
+    return questions
+
+async def refill_interview_questions(counts: Dict[BankKey, int], difficulty: Optional[str]) -> None:
+    await generate_bank_interview_questions(counts)
+
+async def assemble_bank_interview_questions(wanted: Dict[BankKey, int]) -> Dict[str, List[Dict[str, Any]]]:
+    """Interview questions from the bank, generating only what it lacks"""
+    found, shortfall = await question_bank.assemble("interview", wanted, refill_interview_questions)
+    
+    result = {field: [] for field in INTERVIEW_CATEGORY_FIELDS.values()}
+    for (category, _), sampled in found.items():
+        result[INTERVIEW_CATEGORY_FIELDS[category]].extend(sampled)
+    if shortfall:
+        generated = await generate_bank_interview_questions(shortfall)
+        for category, field in INTERVIEW_CATEGORY_FIELDS.items():
+            missing = sum(n for (c, _), n in shortfall.items() if c == category)
+            result[field].extend(generated.get(field, [])[:missing])
+    return result
+
+async def generate_resume_interview_questions(resume: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Behavioral questions about the candidate's own roles and projects (never banked)"""
+    prompt = f"""
+    Based on the following resume, generate {INTERVIEW_RESUME_QUESTIONS} behavioral interview questions about the candidate's own roles, projects and achievements.
+    Return a JSON object with:
+    {{
+        "behavioral_questions": [
+            {{"question": "question text", "category": "Behavioral", "difficulty": "Easy|Medium|Hard"}}
+        ]
+    }}
+    
+    Resume: {resume_prompt_text(resume)}
+    """
+    
+    questions = await get_ai_json(prompt, ResumeInterviewQuestions, "interview")
+    return questions["behavioral_questions"][:INTERVIEW_RESUME_QUESTIONS]
+
+async def assemble_interview_questions(resume: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Interview questions for ``resume``
+
+    HR and technical questions come from the bank, generating only what it
+    lacks. Behavioral questions are generated from the resume itself, in
+    parallel, unless INTERVIEW_RESUME_QUESTIONS is 0.
+    """
+    skills = [skill for group in resume.get('skills', []) for skill in group.get('skills', [])]
+    skills = list(dict.fromkeys(skill for skill in map(normalize_skill, skills[:10]) if skill))
+    wanted = {
+        ("HR", ""): INTERVIEW_QUESTIONS_PER_CATEGORY,
+        **spread(INTERVIEW_QUESTIONS_PER_CATEGORY, [("Technical", skill) for skill in skills or [""]]),
+    }
+    if INTERVIEW_RESUME_QUESTIONS <= 0:
+        wanted[("Behavioral", "")] = INTERVIEW_QUESTIONS_PER_CATEGORY
+        return await assemble_bank_interview_questions(wanted)
+    
+    result, personal = await asyncio.gather(
+        assemble_bank_interview_questions(wanted), generate_resume_interview_questions(resume)
+    )
+    result["behavioral_questions"] = personal
+    return result
+
 @api_router.post("/resume/{resume_id}/interview-questions")
-async def generate_interview_questions(resume_id: str):
-    """Generate interview questions based on resume"""
-    resume = await db.resumes.find_one({"id": resume_id})
+async def generate_interview_questions(
+    resume_id: str,
+    stream: bool = False,
+    async_job: bool = Query(default=False, alias="async")
+):
+    """Generate interview questions based on resume
+
+    HR and technical questions are sampled from the question bank by skill;
+    only what the bank cannot cover is generated. Behavioral questions are
+    generated from the resume. With ``stream=true`` questions are instead
+    generated live from the full resume and each is sent as an SSE event as
+    soon as it parses; with ``async=true`` the request is queued and a job id
+    is returned.
+    """
+    resume = await find_resume(db, resume_id)
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
     
-    resume_text = json.dumps(resume, default=str)
+    if async_job:
+        return await submit_job("interview-questions", {"resume_id": resume_id})
+    
+    if not stream:
+        try:
+            return await assemble_interview_questions(resume)
+        except LLMResponseError:
+            raise HTTPException(status_code=500, detail="Could not generate questions")
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Question generation failed: {str(e)}")
+    
+    resume_text = resume_prompt_text(resume)
     
     prompt = f"""
     Based on the following resume, generate interview questions in three categories.
@@ -490,60 +1439,51 @@ async def generate_interview_questions(resume_id: str):
     Resume: {resume_text}
     """
     
-    try:
-        ai_response = await get_ai_suggestions(prompt)
-        json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
-        
-        if json_match:
-            questions = json.loads(json_match.group())
-            return questions
-        else:
-            raise HTTPException(status_code=500, detail="Could not generate questions")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Question generation failed: {str(e)}")
+    return stream_ai_response(prompt, "interview", InterviewQuestionSet, passthrough)
 
 @api_router.post("/resume/{resume_id}/quiz")
-async def generate_technical_quiz(resume_id: str):
-    """Generate technical quiz based on resume skills"""
-    resume = await db.resumes.find_one({"id": resume_id})
-    if not resume:
+async def generate_technical_quiz(
+    resume_id: str,
+    stream: bool = False,
+    async_job: bool = Query(default=False, alias="async"),
+    difficulty: Optional[Literal["Easy", "Medium", "Hard"]] = None
+):
+    """Generate technical quiz based on resume skills
+
+    Questions are sampled from the question bank; only skills the bank cannot
+    cover are sent to the AI. With ``stream=true`` the whole quiz is generated
+    live and each question is sent as an SSE event as soon as it parses; with
+    ``async=true`` the request is queued and a job id is returned.
+    """
+    skills = await find_resume_skills(db, resume_id)
+    if skills is None:
         raise HTTPException(status_code=404, detail="Resume not found")
     
-    skills = []
-    for skill_group in resume.get('skills', []):
-        skills.extend(skill_group.get('skills', []))
-    
+    skills = list(dict.fromkeys(skill for skill in map(normalize_skill, skills[:10]) if skill))
     if not skills:
         raise HTTPException(status_code=400, detail="No skills found in resume")
     
-    prompt = f"""
-    Create a technical quiz with 15 multiple choice questions based on these skills: {', '.join(skills[:10])}
+    if async_job:
+        return await submit_job("quiz", {"resume_id": resume_id, "difficulty": difficulty})
     
-    Return a JSON object with:
-    {{
-        "questions": [
-            {{
-                "question": "question text",
-                "options": ["option1", "option2", "option3", "option4"],
-                "correct_answer": 0,
-                "explanation": "explanation text",
-                "skill_category": "relevant skill"
-            }}
-        ]
-    }}
-    
-    Make questions practical and relevant to the skills. Include a mix of difficulty levels.
-    """
+    if stream:
+        prompt = quiz_prompt(spread(QUIZ_SIZE, [("", skill) for skill in skills]), difficulty)
+        return stream_ai_response(
+            prompt, "quiz", TechnicalQuiz, lambda quiz: bank_quiz_questions(quiz, skills, difficulty)
+        )
     
     try:
-        ai_response = await get_ai_suggestions(prompt)
-        json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
-        
-        if json_match:
-            quiz = json.loads(json_match.group())
-            return quiz
-        else:
-            raise HTTPException(status_code=500, detail="Could not generate quiz")
+        wanted = spread(QUIZ_SIZE, [("", skill) for skill in skills])
+        found, shortfall = await question_bank.assemble("quiz", wanted, refill_quiz_questions, difficulty)
+        questions = [question for sampled in found.values() for question in sampled]
+        if shortfall:
+            questions.extend(await generate_quiz_questions(shortfall, difficulty))
+        random.shuffle(questions)
+        return {"questions": questions}
+    except LLMResponseError:
+        raise HTTPException(status_code=500, detail="Could not generate quiz")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Quiz generation failed: {str(e)}")
 
@@ -569,17 +1509,149 @@ async def get_job_suggestions(job_role_input: JobRoleSuggestion):
     """
     
     try:
-        ai_response = await get_ai_suggestions(prompt)
-        json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
-        
-        if json_match:
-            suggestions = json.loads(json_match.group())
-            return suggestions
-        else:
-            raise HTTPException(status_code=500, detail="Could not generate suggestions")
+        return await get_ai_json(prompt, JobSuggestions, "suggestions", cache=True)
+    except LLMResponseError:
+        raise HTTPException(status_code=500, detail="Could not generate suggestions")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Suggestion generation failed: {str(e)}")
 
+# Export
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps are stored as naive UTC"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def export_projection(fields: Optional[str]) -> Optional[Dict[str, int]]:
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def ndjson_response(name: str, chunks, gzip: bool) -> StreamingResponse:
+    filename = f"{name}.ndjson.gz" if gzip else f"{name}.ndjson"
+    return StreamingResponse(
+        gzip_chunks(chunks) if gzip else chunks,
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@api_router.get("/export/resumes")
+async def export_resumes(
+    updated_since: Optional[datetime] = None,
+    fields: Optional[str] = None,
+    gzip: bool = False,
+    batch_size: int = Query(default=1000, ge=1, le=10000)
+):
+    """Stream resumes as NDJSON in updated_at order
+
+    ``updated_since`` limits the export to resumes changed at or after that
+    time; ``fields`` is a comma-separated projection.
+    """
+    cursor = export_cursor(db, "resumes", naive_utc(updated_since), export_projection(fields), batch_size)
+    return ndjson_response("resumes", ndjson_chunks([(cursor, None)]), gzip)
+
+@api_router.get("/export/analyses")
+async def export_analyses(
+    updated_since: Optional[datetime] = None,
+    analysis_type: Optional[Literal["ats", "resume"]] = Query(default=None, alias="type"),
+    fields: Optional[str] = None,
+    gzip: bool = False,
+    batch_size: int = Query(default=1000, ge=1, le=10000)
+):
+    """Stream ATS analyses, then resume analyses, as NDJSON
+
+    Each type is in created_at order; the two are not interleaved. Each
+    line carries ``type`` ("ats" or "resume"); ``type`` restricts the
+    export to one of them.
+    """
+    projection = export_projection(fields)
+    since = naive_utc(updated_since)
+    sources = [
+        (export_cursor(db, f"{kind}_analyses", since, projection, batch_size), {"type": kind})
+        for kind in ([analysis_type] if analysis_type else ["ats", "resume"])
+    ]
+    return ndjson_response("analyses", ndjson_chunks(sources), gzip)
+
+@api_router.get("/llm/cache/stats")
+async def get_llm_cache_stats():
+    """LLM response cache hit/miss counters for this worker"""
+    return llm_cache.stats()
+
+@api_router.get("/llm/stats")
+async def get_llm_stats():
+    """LLM client concurrency, queue, request-coalescing and response-parsing counters for this worker"""
+    return {**llm_client.stats(), "singleflight": llm_singleflight.stats(), "parsing": llm_parse_metrics.stats()}
+
+# Background jobs
+async def submit_job(kind: str, params: Dict[str, Any]) -> JSONResponse:
+    """Queue a background job and answer 202 with its id"""
+    try:
+        job_id = await job_queue.submit(kind, params)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return JSONResponse(status_code=202, content={"job_id": job_id, "status": "queued"})
+
+async def run_upload_job(params: Dict[str, Any]) -> Any:
+    return await process_resume_upload(params["filename"], params["file_content"])
+
+async def run_analysis_job(params: Dict[str, Any]) -> Any:
+    return jsonable_encoder(await analyze_resume(params["resume_id"], stream=False, async_job=False))
+
+async def run_interview_questions_job(params: Dict[str, Any]) -> Any:
+    return await generate_interview_questions(params["resume_id"], stream=False, async_job=False)
+
+async def run_quiz_job(params: Dict[str, Any]) -> Any:
+    return await generate_technical_quiz(
+        params["resume_id"], stream=False, async_job=False, difficulty=params.get("difficulty")
+    )
+
+async def run_bulk_import_job(params: Dict[str, Any]) -> Any:
+    job_id = current_job_id.get()
+    
+    async def report_progress(progress: Dict[str, Any]) -> None:
+        await job_queue.update_progress(job_id, progress)
+    
+    defaults = {"user_id": params["user_id"]} if params.get("user_id") else None
+    try:
+        result = await bulk_importer.run(params["import_id"], params["files"], defaults, report_progress)
+    except Exception:
+        await remove_bulk_import_files(params)
+        raise
+    await remove_bulk_import_files(params)
+    return result
+
+async def remove_bulk_import_files(params: Dict[str, Any]) -> None:
+    """Delete an import's spooled uploads; also runs when the job is abandoned"""
+    paths = [f["path"] for f in params.get("files", [])]
+    await asyncio.get_running_loop().run_in_executor(None, remove_files, paths)
+
+job_queue.register("upload", run_upload_job)
+job_queue.register("analysis", run_analysis_job)
+job_queue.register("interview-questions", run_interview_questions_job)
+job_queue.register("quiz", run_quiz_job)
+job_queue.register("bulk-import", run_bulk_import_job, on_give_up=remove_bulk_import_files)
+
+@api_router.get("/question-bank/stats")
+async def get_question_bank_stats():
+    """Question bank serving/generation counters for this worker"""
+    return question_bank.stats()
+
+@api_router.get("/jobs/stats")
+async def get_job_stats():
+    """Job queue counters for this worker"""
+    return job_queue.stats()
+
+@api_router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get status and result of a background job"""
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -591,6 +1663,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so request latency includes every other middleware
+app.add_middleware(MetricsMiddleware, registry=metrics_registry)
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -598,6 +1678,62 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def bootstrap_indexes():
+    await ensure_indexes(db)
+    await llm_cache.ensure_indexes()
+    await upload_cache.ensure_indexes()
+    await job_queue.ensure_indexes()
+    if os.environ.get('DB_QUERY_AUDIT', '').lower() in ('1', 'true', 'yes'):
+        shapes = [
+            *QUERY_SHAPES,
+            *llm_cache.query_shapes(),
+            *upload_cache.query_shapes(),
+            *job_queue.query_shapes(),
+        ]
+        for query in await find_unindexed_queries(db, shapes):
+            logger.warning("Query is not served by an index: %s", query)
+
+@app.on_event("startup")
+async def load_search_index():
+    await search_index.load(db)
+
+@app.on_event("startup")
+async def sweep_bulk_import_spool():
+    removed = await asyncio.get_running_loop().run_in_executor(
+        None, sweep_spool, BULK_IMPORT_DIR, BULK_IMPORT_SPOOL_MAX_AGE_SECONDS
+    )
+    if removed:
+        logger.info("Removed %d stale bulk import files", removed)
+
+@app.on_event("startup")
+async def start_job_queue():
+    await job_queue.start()
+
+@app.on_event("startup")
+async def start_loop_lag_monitor():
+    loop_lag_monitor.start()
+
+@app.on_event("shutdown")
+async def stop_loop_lag_monitor():
+    await loop_lag_monitor.stop()
+
+@app.on_event("shutdown")
+async def stop_job_queue():
+    await job_queue.stop()
+
+@app.on_event("shutdown")
+async def stop_question_bank():
+    await question_bank.stop()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    client.close()
+
+@app.on_event("shutdown")
+async def shutdown_llm_client():
+    await llm_client.aclose()
+
+@app.on_event("shutdown")
+async def shutdown_document_extractor():
+    document_extractor.shutdown()
\ No newline at end of file
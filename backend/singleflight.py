@@ -0,0 +1,43 @@
+"""Single-flight coalescing of identical concurrent async calls.
+
+The first caller for a key starts the work as an independent task; callers
+arriving while it is in flight await the same task. Every caller awaits
+through ``asyncio.shield``, so one caller being cancelled (e.g. a client
+disconnecting) never cancels the shared call for the others.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key"""
+
+    def __init__(self):
+        self._calls: Dict[str, "asyncio.Future"] = {}
+        self.counters = {"leaders": 0, "coalesced": 0}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.counters["leaders"] += 1
+        else:
+            self.counters["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: "asyncio.Future") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "in_flight_keys": len(self._calls)}
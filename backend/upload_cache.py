@@ -0,0 +1,76 @@
+"""Content-addressed cache of uploaded resume files.
+
+Uploads are keyed by the SHA-256 of their bytes. The extracted ``raw_text``
+is stored as soon as extraction finishes and the structured ``parsed_data``
+once the LLM has structured it, so a repeat upload skips both steps (or
+only retries the LLM when an earlier attempt failed). Lookups are plain
+reads and hits are counted in process; entries expire ``ttl`` seconds after
+they were created.
+"""
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+class UploadCache:
+    """SHA-256 keyed store of extraction and parsing results"""
+
+    def __init__(self, collection, ttl: int = 30 * 86400):
+        self.collection = collection
+        self.ttl = ttl
+        self.counters = {"hits": 0, "partial_hits": 0, "misses": 0, "bytes_saved": 0, "errors": 0}
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("created_at", expireAfterSeconds=self.ttl)
+
+    def query_shapes(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """(collection, representative filter) for every query this cache issues"""
+        return [(self.collection.name, {"_id": "shape-check"})]
+
+    @staticmethod
+    def digest(file_content: bytes) -> str:
+        return hashlib.sha256(file_content).hexdigest()
+
+    async def get(self, digest: str, size: int) -> Optional[Dict[str, Any]]:
+        """Cached entry for ``digest``; counts a hit only when it has parsed_data"""
+        try:
+            entry = await self.collection.find_one({"_id": digest}, {"raw_text": 1, "parsed_data": 1})
+        except PyMongoError as e:
+            self.counters["errors"] += 1
+            logger.warning("Upload cache lookup failed: %s", e)
+            return None
+
+        if entry is None:
+            self.counters["misses"] += 1
+        elif entry.get("parsed_data") is not None:
+            self.counters["hits"] += 1
+            self.counters["bytes_saved"] += size
+        else:
+            self.counters["partial_hits"] += 1
+        return entry
+
+    async def put(self, digest: str, size: int, raw_text: str, parsed_data: Optional[Dict[str, Any]] = None) -> None:
+        update = {"raw_text": raw_text, "size": size, "updated_at": datetime.utcnow()}
+        if parsed_data is not None:
+            update["parsed_data"] = parsed_data
+        try:
+            await self.collection.update_one(
+                {"_id": digest},
+                {"$set": update, "$setOnInsert": {"created_at": datetime.utcnow()}},
+                upsert=True
+            )
+        except PyMongoError as e:
+            self.counters["errors"] += 1
+            logger.warning("Upload cache write failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["partial_hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_rate": round(self.counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
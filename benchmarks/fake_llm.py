@@ -0,0 +1,184 @@
+"""
+Fake LLM backend for offline benchmarks
+
+``FakeLLM`` is an LLM provider; ``install(llm_client)`` routes every endpoint
+to it, so AI endpoints run their real code path (slots, budgets, routing,
+caching, JSON parsing and repair) against canned answers.
+Latency, jitter, error and malformed-answer rates are configurable; answers
+are chosen from the prompt and contain unique question texts so the question
+bank fills up the way it does in production.
+"""
+
+import asyncio
+import itertools
+import json
+import math
+import random
+import re
+from typing import AsyncIterator, Dict, List, Optional
+
+from llm_providers import LLMProvider, ProviderRouter
+
+DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+COUNT_RE = re.compile(r'(\d+) about ([^,()]+)')
+INTERVIEW_COUNTS_RE = re.compile(r'Generate (\d+) HR questions, (\d+) behavioral questions')
+
+
+class InjectedLLMError(Exception):
+    """Raised for requests the fake is configured to fail"""
+
+
+class FakeLLM(LLMProvider):
+    kind = "fake"
+
+    def __init__(
+        self,
+        latency: float = 0.5,
+        jitter: float = 0.2,
+        distribution: str = "lognormal",
+        error_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        stream_chunks: int = 8,
+        seed: Optional[int] = None,
+    ):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"distribution must be one of {', '.join(DISTRIBUTIONS)}")
+        super().__init__(distribution)
+        self.latency = latency
+        self.jitter = jitter
+        self.distribution = distribution
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.stream_chunks = max(stream_chunks, 1)
+        self.random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self.counters = {"requests": 0, "errors": 0, "malformed": 0}
+
+    def install(self, llm_client) -> None:
+        llm_client.router = ProviderRouter({"default": self})
+
+    def sample_latency(self) -> float:
+        """Seconds for one completion; ``latency`` is the mean (median for lognormal)"""
+        if self.distribution == "fixed":
+            value = self.latency
+        elif self.distribution == "uniform":
+            value = self.random.uniform(self.latency - self.jitter, self.latency + self.jitter)
+        elif self.distribution == "normal":
+            value = self.random.gauss(self.latency, self.jitter)
+        elif self.distribution == "lognormal":
+            value = self.latency * math.exp(self.random.gauss(0, self.jitter))
+        else:
+            value = self.random.expovariate(1 / self.latency) if self.latency > 0 else 0
+        return max(value, 0.0)
+
+    def _answer(self, prompt: str) -> str:
+        self.counters["requests"] += 1
+        if self.random.random() < self.error_rate:
+            self.counters["errors"] += 1
+            raise InjectedLLMError("Injected LLM failure")
+        text = json.dumps(self.respond(prompt))
+        if self.random.random() < self.malformed_rate:
+            # Cut-off answer, as when the provider stops early
+            self.counters["malformed"] += 1
+            text = "```json\n" + text[:max(len(text) * 2 // 3, 1)]
+        return text
+
+    async def complete(self, prompt: str, system_message: str) -> str:
+        # Injected errors arrive after the latency too, as real upstream failures do
+        await asyncio.sleep(self.sample_latency())
+        return self._answer(prompt)
+
+    async def stream(self, prompt: str, system_message: str) -> AsyncIterator[str]:
+        delay = self.sample_latency() / self.stream_chunks
+        await asyncio.sleep(delay)
+        text = self._answer(prompt)
+        size = math.ceil(len(text) / self.stream_chunks)
+        for start in range(0, len(text), size):
+            if start:
+                await asyncio.sleep(delay)
+            yield text[start:start + size]
+
+    # Canned answers
+    def _question(self, label: str) -> str:
+        return f"{label} question #{next(self._ids)}: describe how you would approach it?"
+
+    def _difficulty(self) -> str:
+        return self.random.choice(["Easy", "Medium", "Hard"])
+
+    def quiz(self, counts: List[tuple]) -> Dict[str, object]:
+        questions = []
+        for n, skill in counts:
+            for _ in range(n):
+                questions.append({
+                    "question": self._question(skill),
+                    "options": ["Option A", "Option B", "Option C", "Option D"],
+                    "correct_answer": self.random.randrange(4),
+                    "explanation": "Option A is the documented behaviour.",
+                    "skill_category": skill,
+                    "difficulty": self._difficulty(),
+                })
+        return {"questions": questions}
+
+    def interview(self, hr: int, behavioral: int, technical: List[tuple]) -> Dict[str, object]:
+        return {
+            "hr_questions": [
+                {"question": self._question("HR"), "category": "HR", "difficulty": self._difficulty()}
+                for _ in range(hr)
+            ],
+            "behavioral_questions": [
+                {"question": self._question("Behavioral"), "category": "Behavioral", "difficulty": self._difficulty()}
+                for _ in range(behavioral)
+            ],
+            "technical_questions": [
+                {"question": self._question(skill), "category": "Technical", "difficulty": self._difficulty(), "skill_category": skill}
+                for n, skill in technical for _ in range(n)
+            ],
+        }
+
+    def respond(self, prompt: str) -> Dict[str, object]:
+        """Canned JSON answer for the kind of prompt"""
+        # Repair prompts embed the target schema; answer it directly
+        repair = "was supposed to be a single JSON object" in prompt
+        if "Parse the following resume" in prompt or (repair and "ParsedResume" in prompt):
+            return {
+                "personal_info": {"full_name": "Jordan Example", "email": "jordan@example.com", "phone": "+1 555 0100"},
+                "summary": "Backend engineer focused on reliable distributed systems.",
+                "experience": [{"title": "Software Engineer", "company": "Example Corp", "start_date": "2019",
+                                "end_date": "Present", "description": "Built services in Python.", "is_current": True}],
+                "education": [{"degree": "B.S. Computer Science", "institution": "Example University", "end_date": "2018"}],
+                "skills": [{"category": "Technical", "skills": ["Python", "MongoDB", "Docker"]}],
+                "projects": [],
+                "certifications": [],
+            }
+        if "Analyze the following resume" in prompt or (repair and "AnalysisFeedback" in prompt):
+            return {
+                "pros": ["Clear impact statements", "Relevant technical skills"],
+                "cons": ["Summary is generic"],
+                "suggestions": ["Quantify results in each role", "Tailor the summary to the target job"],
+            }
+        if "Create a technical quiz" in prompt or (repair and "TechnicalQuiz" in prompt):
+            counts = [(int(n), skill.strip()) for n, skill in COUNT_RE.findall(prompt.split("\n", 2)[1])]
+            return self.quiz(counts or [(15, "general programming")])
+        if "Generate general interview questions" in prompt:
+            match = INTERVIEW_COUNTS_RE.search(prompt)
+            hr, behavioral = (int(match.group(1)), int(match.group(2))) if match else (5, 5)
+            technical_part = prompt.rsplit("technical questions (", 1)[-1]
+            technical = [(int(n), skill.strip()) for n, skill in COUNT_RE.findall(technical_part)]
+            return self.interview(hr, behavioral, technical)
+        if "behavioral interview questions about the candidate" in prompt or (repair and "ResumeInterviewQuestions" in prompt):
+            return {"behavioral_questions": self.interview(0, 5, [])["behavioral_questions"]}
+        if "generate interview questions" in prompt or (repair and "InterviewQuestionSet" in prompt):
+            return self.interview(5, 5, [(5, "")])
+        if "resume content suggestions" in prompt or (repair and "JobSuggestions" in prompt):
+            return {
+                "summary_suggestions": ["Lead with years of experience and domain", "Name the systems you own"],
+                "skills_suggestions": {"technical": ["Python", "SQL"], "soft": ["Communication"], "tools": ["Docker", "Git"]},
+                "experience_keywords": ["scalability", "ownership"],
+                "project_ideas": ["Open-source CLI tool"],
+                "certification_recommendations": ["AWS Certified Developer"],
+            }
+        return {}
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counters)
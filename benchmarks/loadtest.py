@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Offline load test for the SmartHirePro API
+
+Runs the FastAPI app in-process with an in-memory Mongo stand-in
+(mongomock-motor) or a local mongod (``--mongo-url``), and replaces the LLM
+transport with ``FakeLLM`` so AI endpoints run their full code path without
+network access. Each scenario drives one ``/api/*`` endpoint with a fixed
+number of concurrent clients and reports p50/p95/p99 latency, throughput and
+event-loop lag. mongomock runs queries synchronously on the event loop, so
+database-heavy scenarios show more loop lag than they would against mongod.
+
+Results can be saved as a baseline and later runs compared against it:
+
+    python benchmarks/loadtest.py --save-baseline benchmarks/baseline.json
+    python benchmarks/loadtest.py --baseline benchmarks/baseline.json --tolerance 0.2
+
+The comparison exits with status 1 when any scenario regresses by more than
+the tolerance.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, "..", "backend"))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from fake_llm import DISTRIBUTIONS, FakeLLM  # noqa: E402
+
+LAG_INTERVAL = 0.01
+JOB_DESCRIPTION = "Senior Python engineer with MongoDB, FastAPI, Docker and AWS experience building REST APIs."
+SKILLS = ["Python", "JavaScript", "MongoDB", "Docker", "AWS", "React", "SQL", "Kubernetes", "FastAPI", "Go"]
+ROLES = ["Backend Engineer", "Frontend Engineer", "Data Engineer", "DevOps Engineer", "Product Manager"]
+
+
+def resume_payload(i: int, experience: int = 6) -> Dict[str, Any]:
+    rng = random.Random(i)
+    return {
+        "personal_info": {"full_name": f"Candidate {i}", "email": f"candidate{i}@example.com", "location": "Austin, TX"},
+        "summary": "Engineer building reliable distributed systems and developer tooling.",
+        "experience": [
+            {"title": "Software Engineer", "company": f"Company {i}-{j}", "start_date": f"{2010 + j}",
+             "end_date": f"{2011 + j}", "description": "Designed REST APIs in Python and FastAPI; reduced latency by 30%."}
+            for j in range(experience)
+        ],
+        "education": [{"degree": "B.S. Computer Science", "institution": "Example University", "end_date": "2010"}],
+        "skills": [{"category": "Technical", "skills": rng.sample(SKILLS, 4)}],
+        "projects": [{"name": "Tooling", "description": "CLI for data pipelines", "technologies": "Python, Kafka"}],
+    }
+
+
+def docx_bytes(i: int) -> bytes:
+    """A small resume DOCX; ``i`` makes the bytes unique so uploads miss the cache"""
+    from docx import Document
+
+    document = Document()
+    for line in [
+        f"Candidate {i}", f"candidate{i}@example.com | +1 555 {i:04d} | Austin, TX",
+        "Summary", "Engineer building reliable distributed systems.",
+        "Experience", "Software Engineer, Example Corp", "Jan 2019 - Present",
+        "- Built REST APIs in Python and FastAPI",
+        "Education", "B.S. Computer Science, Example University", "2014 - 2018",
+        "Skills", "Languages: Python, Go, SQL",
+    ]:
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+class LagMonitor:
+    """Samples how late ``asyncio.sleep`` wakes up, i.e. how long the loop was blocked"""
+
+    def __init__(self, interval: float = LAG_INTERVAL):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(time.perf_counter() - started - self.interval, 0.0))
+
+    def start(self) -> None:
+        self.samples = []
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> List[float]:
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        return self.samples
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class Context:
+    """State shared by scenarios: the HTTP client and ids of seeded resumes"""
+
+    def __init__(self, http, resume_ids: List[str], user_id: str):
+        self.http = http
+        self.resume_ids = resume_ids
+        self.user_id = user_id
+
+    def resume_id(self, i: int) -> str:
+        return self.resume_ids[i % len(self.resume_ids)]
+
+
+Scenario = Callable[[Context, int], Awaitable[Any]]
+
+# name -> request for the i-th call; every /api endpoint except jobs, bulk import and WebSocket
+SCENARIOS: Dict[str, Scenario] = {
+    "root": lambda c, i: c.http.get("/api/"),
+    "create": lambda c, i: c.http.post("/api/resume", json={**resume_payload(i), "user_id": c.user_id}),
+    "get": lambda c, i: c.http.get(f"/api/resume/{c.resume_id(i)}"),
+    "update": lambda c, i: c.http.put(f"/api/resume/{c.resume_id(i)}", json=resume_payload(i + 1)),
+    "patch": lambda c, i: c.http.patch(f"/api/resume/{c.resume_id(i)}", json={"fields": {"summary": f"Revision {i}"}}),
+    "list": lambda c, i: c.http.get("/api/resumes", params={"user_id": c.user_id, "limit": 20}),
+    "search": lambda c, i: c.http.get("/api/resumes/search", params={"q": SKILLS[i % len(SKILLS)]}),
+    "upload": lambda c, i: c.http.post("/api/resume/upload", files={
+        "file": (f"resume{i}.docx", docx_bytes(i), "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+    }),
+    "ats": lambda c, i: c.http.post(f"/api/resume/{c.resume_id(i)}/ats-analysis", params={"job_description": JOB_DESCRIPTION}),
+    "ats-history": lambda c, i: c.http.get(f"/api/resume/{c.resume_id(i)}/ats-analyses"),
+    "rank": lambda c, i: c.http.post("/api/ats/rank", json={"job_description": JOB_DESCRIPTION, "top_k": 10}),
+    "analysis": lambda c, i: c.http.post(f"/api/resume/{c.resume_id(i)}/analysis"),
+    "interview": lambda c, i: c.http.post(f"/api/resume/{c.resume_id(i)}/interview-questions"),
+    "interview-stream": lambda c, i: c.http.post(f"/api/resume/{c.resume_id(i)}/interview-questions", params={"stream": "true"}),
+    "quiz": lambda c, i: c.http.post(f"/api/resume/{c.resume_id(i)}/quiz"),
+    "suggestions": lambda c, i: c.http.post("/api/ai-suggestions", json={"job_role": f"{ROLES[i % len(ROLES)]} {i % 20}"}),
+    "export": lambda c, i: c.http.get("/api/export/resumes", params={"fields": "id,personal_info,updated_at"}),
+    "llm-stats": lambda c, i: c.http.get("/api/llm/stats"),
+}
+
+
+async def run_scenario(ctx: Context, scenario: Scenario, requests: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    counter = iter(range(requests))
+
+    async def client() -> None:
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                response = await scenario(ctx, i)
+                # Drain streamed bodies so the full response time is measured
+                await response.aread()
+                status = str(response.status_code)
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    monitor = LagMonitor()
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    lag = await monitor.stop()
+
+    errors = sum(n for status, n in statuses.items() if not status.startswith("2"))
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "statuses": statuses,
+        "rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        "loop_lag_p99_ms": round(percentile(lag, 99) * 1000, 2),
+        "loop_lag_max_ms": round(max(lag, default=0.0) * 1000, 2),
+    }
+
+
+def use_mongo_stand_in() -> None:
+    """Point server.py's AsyncIOMotorClient at mongomock-motor before it is imported"""
+    import motor.motor_asyncio
+    from mongomock_motor import AsyncMongoMockClient
+
+    motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+
+
+async def load_test(args) -> Dict[str, Any]:
+    import httpx
+
+    os.environ["MONGO_URL"] = args.mongo_url or "mongodb://localhost:27017"
+    os.environ["DB_NAME"] = args.db_name
+    if not args.mongo_url:
+        use_mongo_stand_in()
+    import server
+
+    # server.py configures INFO logging; injected failures would flood the report
+    if not args.verbose:
+        logging.disable(logging.ERROR)
+    fake = FakeLLM(
+        latency=args.llm_latency,
+        jitter=args.llm_jitter,
+        distribution=args.llm_distribution,
+        error_rate=args.llm_error_rate,
+        malformed_rate=args.llm_malformed_rate,
+        seed=args.seed,
+    )
+    fake.install(server.llm_client)
+    if args.mongo_url:
+        await server.client.drop_database(args.db_name)
+
+    await server.app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as http:
+            user_id = "loadtest-user"
+            seed_ctx = Context(http, [], user_id)
+            seeded = await asyncio.gather(*(SCENARIOS["create"](seed_ctx, i) for i in range(args.seed_resumes)))
+            ctx = Context(http, [response.json()["id"] for response in seeded], user_id)
+
+            results = {}
+            for name in args.scenarios:
+                results[name] = await run_scenario(ctx, SCENARIOS[name], args.requests, args.concurrency)
+                print_row(name, results[name])
+    finally:
+        await server.app.router.shutdown()
+
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "mongo": "mongod" if args.mongo_url else "mongomock",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed_resumes": args.seed_resumes,
+            "llm": {
+                "latency": args.llm_latency,
+                "jitter": args.llm_jitter,
+                "distribution": args.llm_distribution,
+                "error_rate": args.llm_error_rate,
+                "malformed_rate": args.llm_malformed_rate,
+                **fake.stats(),
+            },
+        },
+        "results": results,
+    }
+
+
+COLUMNS = ("requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms", "loop_lag_p99_ms", "loop_lag_max_ms")
+
+
+def print_header() -> None:
+    print(f"{'scenario':<18}" + "".join(f"{column:>17}" for column in COLUMNS))
+
+
+def print_row(name: str, result: Dict[str, Any]) -> None:
+    print(f"{name:<18}" + "".join(f"{result[column]:>17}" for column in COLUMNS), flush=True)
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Print changes against ``baseline``; returns the regressions"""
+    regressions = []
+    print(f"\nCompared with baseline from {baseline['meta'].get('created_at', 'unknown')} (tolerance {tolerance:.0%})")
+    for name, result in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<18} no baseline")
+            continue
+        changes = []
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "rps"):
+            old, new = before[metric], result[metric]
+            change = (new - old) / old if old else 0.0
+            # Higher latency or lower throughput is worse
+            worse = change < -tolerance if metric == "rps" else change > tolerance
+            changes.append(f"{metric} {old} -> {new} ({change:+.0%})")
+            if worse:
+                regressions.append(f"{name} {metric}: {old} -> {new}")
+        print(f"{name:<18} " + ", ".join(changes))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the SmartHirePro API")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated scenario names")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients per scenario")
+    parser.add_argument("--seed-resumes", type=int, default=100, help="resumes created before the run")
+    parser.add_argument("--mongo-url", help="local mongod to use instead of the in-memory stand-in")
+    parser.add_argument("--db-name", default="smarthire_loadtest")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="fake LLM latency in seconds")
+    parser.add_argument("--llm-jitter", type=float, default=0.2, help="spread: seconds, or sigma for lognormal")
+    parser.add_argument("--llm-distribution", choices=DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-malformed-rate", type=float, default=0.0, help="share of answers cut off mid-JSON")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save-baseline", metavar="PATH", help="write results as a baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare results with a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--output", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="keep server and httpx logging")
+    args = parser.parse_args()
+
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)} (available: {', '.join(SCENARIOS)})")
+
+    print_header()
+    report = asyncio.run(load_test(args))
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report["results"], json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: resume response serialization
+
+Compares the previous read path (``Resume(**doc)``, FastAPI's response_model
+validation and the standard JSON encoder) with ``trusted_response``
+(field copy + orjson) on a stored resume document.
+
+Usage: python benchmarks/resume_serialization.py [--experience 25] [--iterations 2000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+# server.py reads these at import time; no connection is made
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from server import Resume, trusted_response  # noqa: E402
+
+RESPONSE_ADAPTER = TypeAdapter(Resume)
+
+
+def build_document(experience_count: int) -> dict:
+    """A stored resume document as find_resume returns it"""
+    now = datetime.utcnow()
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": str(uuid.uuid4()),
+        "personal_info": {
+            "full_name": "Jordan Example",
+            "email": "jordan@example.com",
+            "phone": "+1 555 0100",
+            "location": "Austin, TX",
+            "linkedin": "linkedin.com/in/jordan",
+            "github": "github.com/jordan",
+            "website": "",
+        },
+        "education": [
+            {"id": str(uuid.uuid4()), "degree": "B.S. Computer Science", "institution": f"University {i}",
+             "location": "Austin, TX", "start_date": "2010", "end_date": "2014", "gpa": "3.8",
+             "relevant_coursework": "Algorithms, Databases, Distributed Systems"}
+            for i in range(2)
+        ],
+        "experience": [
+            {"id": str(uuid.uuid4()), "title": "Senior Software Engineer", "company": f"Company {i}",
+             "location": "Remote", "start_date": f"{2000 + i}-01", "end_date": f"{2001 + i}-01",
+             "description": "Led the migration of a monolith to services; cut p95 latency by 40%. " * 4,
+             "is_current": False}
+            for i in range(experience_count)
+        ],
+        "projects": [
+            {"id": str(uuid.uuid4()), "name": f"Project {i}", "description": "Open-source tooling for data pipelines. " * 3,
+             "technologies": "Python, Kafka, PostgreSQL", "github_link": f"https://github.com/jordan/p{i}", "live_link": ""}
+            for i in range(5)
+        ],
+        "skills": [
+            {"category": "Languages", "skills": ["Python", "Go", "TypeScript", "SQL"]},
+            {"category": "Infrastructure", "skills": ["Kubernetes", "Terraform", "AWS", "MongoDB"]},
+        ],
+        "certifications": [
+            {"id": str(uuid.uuid4()), "name": "AWS Solutions Architect", "issuer": "Amazon", "date": "2021", "credential_id": "ABC123"}
+        ],
+        "summary": "Backend engineer with fifteen years of experience building reliable distributed systems.",
+        "created_at": now,
+        "updated_at": now,
+        "derived": {"content_hash": "0" * 64, "readability_score": 42.0, "word_count": 900,
+                    "token_estimate": 1400, "version": 1, "computed_at": now},
+    }
+
+
+def legacy_response(document: dict) -> bytes:
+    resume = Resume(**document)
+    # What FastAPI does with response_model: validate, dump to JSON types, json.dumps
+    value = RESPONSE_ADAPTER.validate_python(resume, from_attributes=True)
+    return JSONResponse(RESPONSE_ADAPTER.dump_python(value, mode="json")).body
+
+
+def fast_response(document: dict) -> bytes:
+    return trusted_response(Resume, document).body
+
+
+def measure(fn, document: dict, iterations: int) -> float:
+    """Best-of-5 microseconds per call"""
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn(document)
+        best = min(best, (time.perf_counter() - started) / iterations)
+    return best * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--experience", type=int, default=25, help="experience entries per resume")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    document = build_document(args.experience)
+    if json.loads(legacy_response(document)) != json.loads(fast_response(document)):
+        sys.exit("Fast path output differs from the legacy response")
+
+    legacy_us = measure(legacy_response, document, args.iterations)
+    fast_us = measure(fast_response, document, args.iterations)
+    print(f"Resume with {args.experience} experience entries ({len(fast_response(document))} bytes)")
+    print(f"  legacy (validate + response_model + json): {legacy_us:8.1f} us/request")
+    print(f"  trusted (field copy + orjson):            {fast_us:8.1f} us/request")
+    print(f"  speedup: {legacy_us / fast_us:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The backend runs from backend/ and imports its modules absolutely
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+# server.py reads these at import time; no connection is made until a query runs
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "smarthire_test")
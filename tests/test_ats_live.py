@@ -0,0 +1,95 @@
+import copy
+import random
+
+import pytest
+
+from ats_engine import (
+    IncrementalATSScorer,
+    LiveATSSession,
+    ats_engine,
+    build_resume_text,
+    parse_job_description,
+    resume_text_parts,
+)
+
+JOB = "Senior Python engineer with Django, PostgreSQL, Docker, Kubernetes and AWS experience. Experience with Redis."
+
+RESUME = {
+    "personal_info": {"full_name": "Ada Lovelace", "email": "ada@example.com", "phone": "555-123-4567"},
+    "summary": "Backend engineer. Experience with Python and Django.",
+    "experience": [
+        {"id": "e1", "title": "Engineer", "company": "Acme", "description": "Built Django services on AWS"},
+        {"id": "e2", "title": "Developer", "company": "Initech", "description": "Maintained PostgreSQL"},
+    ],
+    "education": [{"id": "d1", "degree": "B.S. Computer Science", "institution": "State University"}],
+    "skills": [{"category": "Languages", "skills": ["Python", "Go"]}],
+}
+
+WORDS = ["python", "docker", "kubernetes", "redis", "aws", "django", "postgresql", "java", "experience",
+         "education", "skills", "summary", "lead", "ada@example.com", "555-987-6543"]
+
+
+def expected(session):
+    return ats_engine.score(build_resume_text(session._document()), session.scorer.job)
+
+
+def random_delta(rng):
+    text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 6)))
+    section = rng.choice(["personal_info", "summary", "skills", "experience", "education", "remove", "job"])
+    if section == "personal_info":
+        return {"type": "update", "section": section, "value": {rng.choice(["full_name", "email", "phone"]): text}}
+    if section == "summary":
+        return {"type": "update", "section": section, "value": text}
+    if section == "skills":
+        return {"type": "update", "section": section, "value": [{"category": "Tools", "skills": text.split()}]}
+    if section == "job":
+        return {"type": "job_description", "value": rng.choice([JOB, "Java developer with Spring", ""])}
+    if section == "remove":
+        return {"type": "remove", "section": rng.choice(["experience", "education"]), "item_id": rng.choice(["e1", "e2", "n1"])}
+    if rng.random() < 0.2:
+        return {"type": "update", "section": section, "value": [{"id": "r1", "title": text}, {"description": text}]}
+    return {"type": "update", "section": section, "item_id": rng.choice(["e1", "e2", "d1", "n1"]),
+            "value": {"description" if section == "experience" else "degree": text}}
+
+
+def test_scorer_parts_match_full_score():
+    job = parse_job_description(JOB)
+    scorer = IncrementalATSScorer(job)
+    for key, text in resume_text_parts(RESUME):
+        scorer.set_part(key, text)
+    assert scorer.result() == ats_engine.score(build_resume_text(RESUME), job)
+
+    scorer.remove_part(("experience", "e1"))
+    without = dict(RESUME, experience=RESUME["experience"][1:])
+    assert scorer.result() == ats_engine.score(build_resume_text(without), job)
+
+
+def test_random_deltas_match_full_recompute():
+    rng = random.Random(7)
+    session = LiveATSSession(copy.deepcopy(RESUME), JOB)
+    assert session.scorer.result() == expected(session)
+    for _ in range(300):
+        result = session.apply(random_delta(rng))
+        assert result == expected(session)
+    assert session.apply({"type": "verify"})["consistent"]
+
+
+@pytest.mark.parametrize("message", [
+    ["not", "an", "object"],
+    {"type": "update", "section": "personal_info", "value": "Ada"},
+    {"type": "update", "section": "summary", "value": ["text"]},
+    {"type": "update", "section": "skills", "value": ["Python"]},
+    {"type": "update", "section": "skills", "value": [{"skills": "Python"}]},
+    {"type": "update", "section": "experience", "value": ["Engineer"]},
+    {"type": "update", "section": "experience", "item_id": "e1", "value": "Engineer"},
+    {"type": "update", "section": "experience", "item_id": 3, "value": {}},
+    {"type": "job_description", "value": {"text": JOB}},
+    {"type": "update", "section": "certifications", "value": []},
+])
+def test_malformed_deltas_leave_the_session_unchanged(message):
+    session = LiveATSSession(copy.deepcopy(RESUME), JOB)
+    before = (copy.deepcopy(session.resume), session.scorer.result())
+    with pytest.raises(ValueError):
+        session.apply(message)
+    assert (session.resume, session.scorer.result()) == before
+    assert session.verify()
@@ -0,0 +1,133 @@
+import re
+from typing import Any, Dict
+
+import pytest
+
+from ats_engine import ats_engine, parse_job_description
+
+
+def baseline_calculate_ats_score(resume_text: str, job_description: str = "") -> Dict[str, Any]:
+    """calculate_ats_score as it was before the ATS engine, verbatim"""
+    score = 60  # Base score
+    recommendations = []
+    matched_keywords = []
+    missing_keywords = []
+
+    # Check for contact information
+    if re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', resume_text):
+        score += 5
+    else:
+        recommendations.append("Add email address")
+
+    if re.search(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', resume_text):
+        score += 5
+    else:
+        recommendations.append("Add phone number")
+
+    # Check for sections
+    sections = ['experience', 'education', 'skills', 'summary']
+    section_scores = {}
+
+    for section in sections:
+        if section.lower() in resume_text.lower():
+            score += 7
+            section_scores[section] = 85
+        else:
+            recommendations.append(f"Add {section} section")
+            section_scores[section] = 0
+
+    # Job description keyword matching
+    if job_description:
+        job_keywords = re.findall(r'\b[A-Za-z]+\b', job_description.lower())
+        job_keywords = [kw for kw in job_keywords if len(kw) > 3]
+        resume_keywords = re.findall(r'\b[A-Za-z]+\b', resume_text.lower())
+
+        for keyword in set(job_keywords):
+            if keyword in resume_keywords:
+                matched_keywords.append(keyword)
+                score += 1
+            else:
+                missing_keywords.append(keyword)
+
+    return {
+        "ats_score": min(score, 100),
+        "matched_keywords": matched_keywords[:10],
+        "missing_keywords": missing_keywords[:10],
+        "section_scores": section_scores,
+        "recommendations": recommendations
+    }
+
+
+FULL = """Ada Lovelace ada@example.com 555-123-4567
+Summary: Backend engineer building Python services.
+Experience: Senior Engineer at Acme, Python, FastAPI, MongoDB, Docker.
+Education: BSc Computer Science.
+Skills: Python Kubernetes Terraform"""
+
+RESUMES = {
+    "full": FULL,
+    "empty": "",
+    "no_sections": "Ada Lovelace, ada@example.com. Python and Docker.",
+    "no_contact": "Summary and skills only: python, docker, kubernetes",
+    # Section names are substrings, in any case
+    "uppercase_sections": "EXPERIENCE EDUCATION SKILLS SUMMARY 555.123.4567",
+    "punctuation": "E-mail: ada@example.co.uk; phone 5551234567; skills: C++, C#, Go-lang",
+}
+
+JOBS = {
+    "none": "",
+    "short_words_only": "C, Go, SQL and R are a plus",
+    "small": "Python backend engineer with Docker and MongoDB",
+    "overlapping": "python PYTHON Python docker DOCKER kubernetes",
+    "punctuation": "Go-lang, C++ (senior), e-mail: skills@corp.com",
+}
+
+# More than MAX_REPORTED_KEYWORDS on both sides, where the lists get truncated
+LONG_JOB = (
+    "python docker mongodb kubernetes terraform fastapi engineer services backend building "
+    "rust scala haskell erlang elixir clojure kotlin swift ocaml fortran"
+)
+
+
+@pytest.mark.parametrize("job", sorted(JOBS))
+@pytest.mark.parametrize("resume", sorted(RESUMES))
+def test_score_matches_the_baseline(resume, job):
+    expected = baseline_calculate_ats_score(RESUMES[resume], JOBS[job])
+    actual = ats_engine.score(RESUMES[resume], JOBS[job])
+    assert actual["ats_score"] == expected["ats_score"]
+    assert actual["section_scores"] == expected["section_scores"]
+    assert actual["recommendations"] == expected["recommendations"]
+    # The baseline iterated a set, so only list contents are comparable
+    assert sorted(actual["matched_keywords"]) == sorted(expected["matched_keywords"])
+    assert sorted(actual["missing_keywords"]) == sorted(expected["missing_keywords"])
+
+
+@pytest.mark.parametrize("job", sorted(JOBS))
+def test_score_batch_matches_the_baseline(job):
+    texts = [RESUMES[name] for name in sorted(RESUMES)]
+    parsed = parse_job_description(JOBS[job])
+    scores, matches = ats_engine.score_batch(texts, parsed)
+    for text, score, row in zip(texts, scores, matches):
+        expected = baseline_calculate_ats_score(text, JOBS[job])
+        assert score == expected["ats_score"]
+        matched = [keyword for keyword, hit in zip(parsed.keywords, row) if hit]
+        assert sorted(matched) == sorted(expected["matched_keywords"])
+
+
+def test_truncated_keyword_lists_agree_with_the_baseline():
+    text = FULL + " rust scala haskell erlang elixir"
+    expected = baseline_calculate_ats_score(text, LONG_JOB)
+    actual = ats_engine.score(text, LONG_JOB)
+    assert actual["ats_score"] == expected["ats_score"]
+    scores, _ = ats_engine.score_batch([text], parse_job_description(LONG_JOB))
+    assert scores[0] == expected["ats_score"]
+
+    # The baseline kept an arbitrary 10 of each list; the engine keeps the
+    # first 10 in job description order, from the same full lists.
+    keywords = LONG_JOB.split()
+    matched = [keyword for keyword in keywords if re.search(rf"\b{keyword}\b", text.lower())]
+    missing = [keyword for keyword in keywords if keyword not in matched]
+    assert len(matched) > 10 and len(missing) < 10
+    assert actual["matched_keywords"] == matched[:10]
+    assert sorted(actual["missing_keywords"]) == sorted(expected["missing_keywords"]) == sorted(missing)
+    assert set(expected["matched_keywords"]) <= set(matched)
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+import server  # noqa: E402
+
+JOB = "python docker kubernetes terraform golang"
+
+
+def resume(resume_id, *skills):
+    return {"id": resume_id, "personal_info": {"full_name": resume_id.upper()}, "skills": [{"skills": list(skills)}]}
+
+
+@pytest.fixture
+def resumes(monkeypatch):
+    db = mongomock_motor.AsyncMongoMockClient().db
+    monkeypatch.setattr(server, "db", db)
+
+    def insert(*documents):
+        asyncio.run(db.resumes.insert_many([dict(document) for document in documents]))
+
+    return insert
+
+
+def rank(**request):
+    return asyncio.run(server.rank_resumes(server.ATSRankRequest(job_description=JOB, **request)))
+
+
+def test_top_k_keeps_the_highest_scores_across_batches(resumes):
+    resumes(
+        resume("one", "python"),
+        resume("four", "python", "docker", "kubernetes", "terraform"),
+        resume("none", "cobol"),
+        resume("three", "python", "docker", "kubernetes"),
+        resume("two", "python", "docker"),
+    )
+    ranking = rank(top_k=3, batch_size=2)
+    assert ranking.scanned == 5 and ranking.keyword_count == 5
+    assert [result.resume_id for result in ranking.results] == ["four", "three", "two"]
+    assert [result.ats_score for result in ranking.results] == [64, 63, 62]
+    assert ranking.results[0].full_name == "FOUR"
+    assert ranking.results[0].matched_keywords == ["python", "docker", "kubernetes", "terraform"]
+    assert ranking.results[0].missing_keywords == ["golang"]
+    assert ranking.results[2].matched_count == 2
+
+
+def test_ties_keep_the_first_resumes_scanned(resumes):
+    resumes(*(resume(f"tied-{i}", "python", "docker") for i in range(4)), resume("best", "python", "docker", "golang"))
+    ranking = rank(top_k=3, batch_size=2)
+    assert [result.resume_id for result in ranking.results] == ["best", "tied-0", "tied-1"]
+
+
+def test_fewer_resumes_than_top_k(resumes):
+    resumes(resume("a", "python"), resume("b", "docker", "golang"))
+    assert [result.resume_id for result in rank(top_k=10).results] == ["b", "a"]
+
+
+def test_resume_ids_restrict_the_scan(resumes):
+    resumes(resume("a", "python"), resume("b", "python", "docker"), resume("c", "golang"))
+    ranking = rank(resume_ids=["a", "c"])
+    assert ranking.scanned == 2
+    assert [result.resume_id for result in ranking.results] == ["a", "c"]
+
+
+def test_job_description_without_keywords_is_rejected(resumes):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.rank_resumes(server.ATSRankRequest(job_description="C, Go and R")))
+    assert error.value.status_code == 400
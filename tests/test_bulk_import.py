@@ -0,0 +1,112 @@
+import asyncio
+import hashlib
+import os
+import time
+import zipfile
+
+import httpx
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+import server  # noqa: E402
+from bulk_import import BulkImporter, sweep_spool  # noqa: E402
+
+
+async def process(filename, content):
+    if content == b"broken":
+        raise ValueError("Could not parse resume structure")
+    return {"summary": content.decode()}, hashlib.sha256(content).hexdigest()
+
+
+def write(path, content):
+    with open(path, "wb") as f:
+        f.write(content)
+    return str(path)
+
+
+def test_import_counts_duplicates_separately_from_failures(tmp_path):
+    archive = tmp_path / "batch.zip"
+    with zipfile.ZipFile(archive, "w") as z:
+        z.writestr("a.pdf", b"resume a")
+        z.writestr("copy-of-a.pdf", b"resume a")
+        z.writestr("notes.txt", b"not a resume")
+    files = [
+        {"filename": "batch.zip", "path": str(archive)},
+        {"filename": "b.docx", "path": write(tmp_path / "b", b"resume b")},
+        {"filename": "c.pdf", "path": write(tmp_path / "c", b"broken")},
+    ]
+
+    async def scenario():
+        collection = mongomock_motor.AsyncMongoMockClient().db.resumes
+        importer = BulkImporter(collection, process, concurrency=1, batch_size=2)
+        result = await importer.run("import-1", files, {"user_id": "u1"})
+        assert (result["total"], result["processed"], result["imported"]) == (5, 5, 2)
+        assert result["duplicates"] == 1
+        assert result["duplicate_files"] == [{"filename": "batch.zip/copy-of-a.pdf", "duplicate_of": "batch.zip/a.pdf"}]
+        assert result["failed"] == 2
+        assert sorted(f["filename"] for f in result["failures"]) == ["batch.zip/notes.txt", "c.pdf"]
+        assert await collection.count_documents({"user_id": "u1"}) == 2
+
+        # A retried job upserts the same ids instead of creating new resumes
+        await importer.run("import-1", files, {"user_id": "u1"})
+        assert await collection.count_documents({}) == 2
+
+    asyncio.run(scenario())
+
+
+def test_sweep_spool_removes_only_old_files(tmp_path):
+    old = write(tmp_path / "old", b"x")
+    fresh = write(tmp_path / "fresh", b"x")
+    past = time.time() - 3600
+    os.utime(old, (past, past))
+
+    assert sweep_spool(str(tmp_path), max_age_seconds=60) == 1
+    assert not os.path.exists(old) and os.path.exists(fresh)
+    assert sweep_spool(str(tmp_path / "missing"), max_age_seconds=60) == 0
+
+
+@pytest.fixture
+def submitted(tmp_path, monkeypatch):
+    jobs = []
+
+    async def submit_job(kind, params):
+        jobs.append(params)
+        return server.JSONResponse(status_code=202, content={"job_id": "job-1"})
+
+    monkeypatch.setattr(server, "submit_job", submit_job)
+    monkeypatch.setattr(server, "BULK_IMPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(server, "BULK_IMPORT_MAX_FILES", 2)
+    return jobs
+
+
+def post_import(**kwargs):
+    async def send():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/resumes/bulk-import", **kwargs)
+
+    return asyncio.run(send())
+
+
+def test_bulk_import_endpoint_spools_files_and_submits_a_job(submitted):
+    response = post_import(
+        files=[("files", ("a.pdf", b"resume a")), ("files", ("b.docx", b"resume b"))], data={"user_id": "u1"}
+    )
+    assert response.status_code == 202 and response.json() == {"job_id": "job-1"}
+    params = submitted[0]
+    assert params["user_id"] == "u1"
+    assert [f["filename"] for f in params["files"]] == ["a.pdf", "b.docx"]
+    assert open(params["files"][1]["path"], "rb").read() == b"resume b"
+
+
+def test_bulk_import_file_limit_is_configurable_and_named(submitted, tmp_path):
+    response = post_import(files=[("files", (f"{i}.pdf", b"resume")) for i in range(3)])
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Import exceeds the limit of 2 files per request"
+    assert submitted == [] and os.listdir(tmp_path) == []
+
+
+def test_bulk_import_without_files_is_rejected(submitted):
+    response = post_import(data={"user_id": "u1"})
+    assert response.status_code == 422
@@ -0,0 +1,60 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from data_access import INDEXES, QUERY_SHAPES, decode_page_token, encode_page_token, find_page
+
+
+def test_every_indexed_collection_has_query_shapes():
+    shaped = {collection for collection, _ in QUERY_SHAPES}
+    assert {collection for collection, _, _ in INDEXES} <= shaped
+
+
+def test_components_with_their_own_indexes_list_their_shapes():
+    import server
+
+    shapes = [*server.llm_cache.query_shapes(), *server.upload_cache.query_shapes(), *server.job_queue.query_shapes()]
+    assert {collection for collection, _ in shapes} == {"llm_cache", "upload_cache", "jobs"}
+
+
+def test_page_tokens_round_trip():
+    created_at = datetime(2024, 5, 6, 7, 8, 9, 123000)
+    token = encode_page_token({"created_at": created_at, "id": "abc"})
+    assert "=" not in token
+    assert decode_page_token(token) == (created_at, "abc")
+
+
+@pytest.mark.parametrize("token", ["", "not-base64!", "bnVsbA", "WzFd"])
+def test_malformed_page_tokens_are_rejected(token):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_page_token(token)
+
+
+def test_find_page_walks_ties_without_gaps_or_repeats():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient().db
+        start = datetime(2024, 1, 1)
+        # Groups of three documents share a timestamp, so pages split ties
+        await db.resumes.insert_many([
+            {"id": f"r{i:02d}", "user_id": "u1" if i % 5 else "u2", "created_at": start + timedelta(seconds=i // 3)}
+            for i in range(30)
+        ])
+        seen, cursor, pages = [], None, 0
+        while True:
+            docs, cursor = await find_page(db, "resumes", {"user_id": "u1"}, {"_id": 0, "id": 1, "created_at": 1}, 4, cursor)
+            seen.extend(doc["id"] for doc in docs)
+            pages += 1
+            if cursor is None:
+                break
+        expected = sorted(
+            (f"r{i:02d}" for i in range(30) if i % 5),
+            key=lambda doc_id: (int(doc_id[1:]) // 3, doc_id),
+            reverse=True,
+        )
+        assert seen == expected
+        assert pages == 6
+
+    asyncio.run(scenario())
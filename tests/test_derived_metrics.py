@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+import derived_metrics  # noqa: E402
+from derived_metrics import DERIVED_VERSION, is_current, refresh_derived  # noqa: E402
+
+UPDATED_AT = datetime(2024, 5, 1, 12, 0, 0, 123000)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    # Readability needs nltk data that is not available offline
+    monkeypatch.setattr(derived_metrics.textstat, "flesch_reading_ease", lambda text: 42.0)
+    return mongomock_motor.AsyncMongoMockClient().db
+
+
+def make_resume(**fields):
+    return {"id": "r1", "summary": "Backend engineer", "experience": [], "updated_at": UPDATED_AT, **fields}
+
+
+def test_metrics_are_written_when_content_changed(db):
+    async def scenario():
+        resume = make_resume()
+        await db.resumes.insert_one(dict(resume))
+        derived = await refresh_derived(db, resume)
+        assert derived["word_count"] == 2 and derived["readability_score"] == 42.0
+        assert derived["version"] == DERIVED_VERSION
+
+        stored = await db.resumes.find_one({"id": "r1"})
+        assert stored["derived"]["content_hash"] == derived["content_hash"]
+        # Metrics are not an edit: updated_at is left alone
+        assert stored["updated_at"] == UPDATED_AT
+        assert is_current(stored)
+
+    asyncio.run(scenario())
+
+
+def test_current_metrics_are_not_rewritten(db):
+    async def scenario():
+        resume = make_resume()
+        await db.resumes.insert_one(dict(resume))
+        resume["derived"] = await refresh_derived(db, resume)
+        computed_at = (await db.resumes.find_one({"id": "r1"}))["derived"]["computed_at"]
+
+        # Only ids/timestamps/whitespace changed: same content hash, no write
+        same_content = {**resume, "summary": " Backend   engineer ", "updated_at": datetime(2030, 1, 1)}
+        assert await refresh_derived(db, same_content) is resume["derived"]
+        assert (await db.resumes.find_one({"id": "r1"}))["derived"]["computed_at"] == computed_at
+
+        # A content change recomputes
+        changed = {**resume, "summary": "Frontend engineer with React"}
+        assert (await refresh_derived(db, changed))["word_count"] == 4
+        assert (await db.resumes.find_one({"id": "r1"}))["derived"]["word_count"] == 4
+
+    asyncio.run(scenario())
+
+
+def test_outdated_versions_are_recomputed(db):
+    async def scenario():
+        resume = make_resume()
+        await db.resumes.insert_one(dict(resume))
+        resume["derived"] = {**await refresh_derived(db, resume), "version": DERIVED_VERSION - 1}
+        assert not is_current(resume)
+        assert (await refresh_derived(db, resume))["version"] == DERIVED_VERSION
+
+    asyncio.run(scenario())
+
+
+def test_a_stale_refresh_does_not_overwrite_a_newer_edit(db):
+    async def scenario():
+        newer = make_resume(summary="Newer summary text", updated_at=datetime(2024, 6, 1))
+        await db.resumes.insert_one(dict(newer))
+        await refresh_derived(db, make_resume())
+        assert "derived" not in await db.resumes.find_one({"id": "r1"})
+
+        await refresh_derived(db, newer)
+        assert (await db.resumes.find_one({"id": "r1"}))["derived"]["word_count"] == 3
+
+    asyncio.run(scenario())
@@ -0,0 +1,121 @@
+import asyncio
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+import export  # noqa: E402
+import server  # noqa: E402
+from export import gzip_chunks, ndjson_chunks  # noqa: E402
+
+
+async def cursor(documents):
+    for document in documents:
+        yield dict(document)
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+def lines(body):
+    return [json.loads(line) for line in body.decode("utf-8").splitlines()]
+
+
+def test_ndjson_lines_are_grouped_into_chunks(monkeypatch):
+    monkeypatch.setattr(export, "CHUNK_BYTES", 40)
+    documents = [{"id": str(i), "at": datetime(2024, 1, 1, i), "name": "Zoë"} for i in range(5)]
+    chunks = asyncio.run(collect(ndjson_chunks([(cursor(documents[:3]), None), (cursor(documents[3:]), {"type": "x"})])))
+
+    # Every chunk but the last reaches the threshold, and only whole lines are emitted
+    assert all(len(chunk) >= 40 for chunk in chunks[:-1])
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    rows = lines(b"".join(chunks))
+    assert [row["id"] for row in rows] == ["0", "1", "2", "3", "4"]
+    assert rows[0] == {"id": "0", "at": "2024-01-01T00:00:00", "name": "Zoë"}
+    assert "type" not in rows[2] and rows[3]["type"] == "x"
+
+
+def test_empty_sources_produce_no_chunks():
+    assert asyncio.run(collect(ndjson_chunks([(cursor([]), None)]))) == []
+    assert gzip.decompress(b"".join(asyncio.run(collect(gzip_chunks(cursor([])))))) == b""
+
+
+def test_gzip_output_decompresses_to_the_input():
+    async def source():
+        for i in range(200):
+            yield b'{"id":"%d"}\n' % i
+
+    body = b"".join(asyncio.run(collect(gzip_chunks(source()))))
+    assert body[:2] == b"\x1f\x8b"
+    assert lines(gzip.decompress(body)) == [{"id": str(i)} for i in range(200)]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = mongomock_motor.AsyncMongoMockClient().db
+    monkeypatch.setattr(server, "db", db)
+    documents = [
+        {"id": "b", "personal_info": {"full_name": "Bea", "email": "b@x.io"}, "updated_at": datetime(2024, 3, 1)},
+        {"id": "a", "personal_info": {"full_name": "Al", "email": "a@x.io"}, "updated_at": datetime(2024, 1, 1)},
+        {"id": "c", "personal_info": {"full_name": "Cy", "email": "c@x.io"}, "updated_at": datetime(2024, 3, 1)},
+    ]
+    asyncio.run(db.resumes.insert_many(documents))
+    return db
+
+
+def body(response):
+    return b"".join(asyncio.run(collect(response.body_iterator)))
+
+
+def test_resume_export_projection_and_updated_since(db):
+    response = asyncio.run(server.export_resumes(
+        updated_since=datetime(2024, 2, 1, 1, tzinfo=timezone(timedelta(hours=2))),
+        fields="id,personal_info.full_name", gzip=False, batch_size=1
+    ))
+    assert response.media_type == "application/x-ndjson"
+    # updated_at order, ids breaking ties; aware timestamps compare in UTC
+    assert lines(body(response)) == [
+        {"id": "b", "personal_info": {"full_name": "Bea"}},
+        {"id": "c", "personal_info": {"full_name": "Cy"}},
+    ]
+
+
+def test_resume_export_gzip(db):
+    response = asyncio.run(server.export_resumes(updated_since=None, fields=None, gzip=True, batch_size=1000))
+    assert response.media_type == "application/gzip"
+    assert 'resumes.ndjson.gz' in response.headers["content-disposition"]
+    rows = lines(gzip.decompress(body(response)))
+    assert [row["id"] for row in rows] == ["a", "b", "c"]
+    assert "_id" not in rows[0] and rows[0]["personal_info"]["email"] == "a@x.io"
+
+
+def test_invalid_fields_are_rejected(db):
+    for fields in ("_id", "id,$where"):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(server.export_resumes(updated_since=None, fields=fields, gzip=False, batch_size=1000))
+        assert error.value.status_code == 400
+
+
+def test_analyses_export_tags_each_type(db):
+    asyncio.run(db.ats_analyses.insert_one({"id": "a1", "ats_score": 80, "created_at": datetime(2024, 2, 1)}))
+    asyncio.run(db.resume_analyses.insert_many([
+        {"id": "r1", "pros": [], "created_at": datetime(2024, 1, 1)},
+        {"id": "r2", "pros": [], "created_at": datetime(2024, 3, 1)},
+    ]))
+
+    response = asyncio.run(server.export_analyses(
+        updated_since=None, analysis_type=None, fields="id", gzip=False, batch_size=1000
+    ))
+    assert lines(body(response)) == [
+        {"id": "a1", "type": "ats"}, {"id": "r1", "type": "resume"}, {"id": "r2", "type": "resume"}
+    ]
+
+    response = asyncio.run(server.export_analyses(
+        updated_since=datetime(2024, 2, 1), analysis_type="resume", fields=None, gzip=False, batch_size=1000
+    ))
+    assert [(row["id"], row["type"]) for row in lines(body(response))] == [("r2", "resume")]
@@ -0,0 +1,140 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+import extraction
+from extraction import (
+    DocumentExtractor, ExtractionCrashError, ExtractionLimitError, ExtractionTimeoutError, split_pdf
+)
+
+
+def make_pdf(page_texts):
+    """Minimal PDF with one line of Helvetica text per page"""
+    count = len(page_texts)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(count)) + b"] /Count %d >>" % count,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(page_texts):
+        stream = b"BT /F1 12 Tf 72 720 Td (" + text.encode() + b") Tj ET"
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * i)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+PAGES = [f"Page {i} text" for i in range(7)]
+
+
+def nap(file_content):
+    """Stand-in parser that takes as many seconds as the file says"""
+    time.sleep(float(file_content))
+    return "rested"
+
+
+def crash(file_content):
+    os._exit(1)
+
+
+def test_split_pdf_extracts_small_documents_directly():
+    page_count, text, parts = split_pdf(make_pdf(PAGES[:2]), pages_per_task=4, max_pages=10)
+    assert page_count == 2 and parts == []
+    assert "Page 0 text" in text and "Page 1 text" in text
+
+
+def test_split_pdf_splits_large_documents_into_page_ranges():
+    page_count, text, parts = split_pdf(make_pdf(PAGES), pages_per_task=3, max_pages=10)
+    assert page_count == 7 and text == ""
+    texts = [extraction.parse_pdf(part) for part in parts]
+    assert [t.count("text") for t in texts] == [3, 3, 1]
+    assert "Page 3 text" in texts[1]
+
+
+def test_extractor_joins_page_ranges_in_order():
+    extractor = DocumentExtractor(max_workers=2, pages_per_task=2, max_pages=10)
+    try:
+        text = asyncio.run(extractor.extract("resume.pdf", make_pdf(PAGES)))
+    finally:
+        extractor.shutdown()
+    positions = [text.index(page) for page in PAGES]
+    assert positions == sorted(positions)
+
+
+def test_extractor_rejects_too_many_pages():
+    extractor = DocumentExtractor(max_workers=1, max_pages=3)
+    try:
+        with pytest.raises(ExtractionLimitError):
+            asyncio.run(extractor.extract("resume.pdf", make_pdf(PAGES)))
+    finally:
+        extractor.shutdown()
+
+
+def test_timeout_terminates_and_replaces_the_pool(monkeypatch):
+    extractor = DocumentExtractor(max_workers=1, timeout=0.5)
+    monkeypatch.setattr(extraction, "parse_docx", nap)
+
+    async def scenario():
+        with pytest.raises(ExtractionTimeoutError):
+            await extractor.extract("resume.docx", b"60")
+        assert extractor._pool is None and extractor.counters["recycled"] == 1
+        assert not extractor._retired
+        # The next document gets a fresh pool instead of queueing behind the stuck worker
+        return await asyncio.wait_for(extractor.extract("resume.pdf", make_pdf(PAGES[:1])), 20)
+
+    try:
+        assert "Page 0 text" in asyncio.run(scenario())
+    finally:
+        extractor.shutdown()
+
+
+def test_timeout_does_not_fail_other_documents_in_the_pool(monkeypatch):
+    extractor = DocumentExtractor(max_workers=2, timeout=2.0)
+    monkeypatch.setattr(extraction, "parse_docx", nap)
+
+    async def scenario():
+        # Start both workers so timings below do not include process startup
+        await asyncio.gather(extractor.extract("a.docx", b"0.1"), extractor.extract("b.docx", b"0.1"))
+        stuck = asyncio.ensure_future(extractor.extract("stuck.docx", b"60"))
+        await asyncio.sleep(1.0)
+        other = asyncio.ensure_future(extractor.extract("other.docx", b"1.5"))
+        with pytest.raises(ExtractionTimeoutError):
+            await stuck
+        # The old pool waits for the other document before it is terminated
+        assert len(extractor._retired) == 1
+        assert await other == "rested"
+        assert not extractor._retired and extractor.counters["failures"] == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        extractor.shutdown()
+
+
+def test_worker_crash_is_a_server_error(monkeypatch):
+    extractor = DocumentExtractor(max_workers=1)
+    monkeypatch.setattr(extraction, "parse_docx", crash)
+
+    async def scenario():
+        with pytest.raises(ExtractionCrashError) as error:
+            await extractor.extract("resume.docx", b"docx")
+        assert error.value.status_code == 500
+        assert extractor._pool is None
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        extractor.shutdown()
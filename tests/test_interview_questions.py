@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+import server  # noqa: E402
+from question_bank import QuestionBank  # noqa: E402
+
+RESUME = {
+    "id": "r1",
+    "personal_info": {"full_name": "Ada Lovelace"},
+    "experience": [{"title": "Engineer", "company": "Analytical Engines Ltd", "description": "Wrote the first program"}],
+    "skills": [{"category": "Languages", "skills": ["Python"]}],
+}
+
+
+def question(category, text, skill=""):
+    return {"question": text, "category": category, "difficulty": "Medium", "skill_category": skill}
+
+
+@pytest.fixture
+def prompts(monkeypatch):
+    bank = QuestionBank(mongomock_motor.AsyncMongoMockClient().db.question_bank, min_stock=0)
+    monkeypatch.setattr(server, "question_bank", bank)
+    seen = []
+
+    async def get_ai_json(prompt, schema, endpoint, cache=False):
+        seen.append((schema, prompt))
+        if schema is server.ResumeInterviewQuestions:
+            return {"behavioral_questions": [question("Behavioral", f"About Analytical Engines {i}?") for i in range(6)]}
+        return {
+            "hr_questions": [question("HR", f"HR {i}?") for i in range(5)],
+            "behavioral_questions": [question("Behavioral", f"Generic {i}?") for i in range(5)],
+            "technical_questions": [question("Technical", f"Python {i}?", "python") for i in range(5)],
+        }
+
+    monkeypatch.setattr(server, "get_ai_json", get_ai_json)
+    return seen
+
+
+def test_behavioral_questions_come_from_the_resume(prompts):
+    result = asyncio.run(server.assemble_interview_questions(RESUME))
+    assert [q["question"] for q in result["behavioral_questions"]] == [f"About Analytical Engines {i}?" for i in range(5)]
+    assert len(result["hr_questions"]) == 5 and len(result["technical_questions"]) == 5
+
+    schemas = {schema: prompt for schema, prompt in prompts}
+    assert "Analytical Engines Ltd" in schemas[server.ResumeInterviewQuestions]
+    # The bank is asked for HR and technical questions only, without the candidate's details
+    bank_prompt = schemas[server.InterviewQuestionSet]
+    assert "0 behavioral questions" in bank_prompt and "Analytical" not in bank_prompt
+
+    # The bank now covers HR and technical; only the resume-specific call repeats
+    prompts.clear()
+    asyncio.run(server.assemble_interview_questions(RESUME))
+    assert [schema for schema, _ in prompts] == [server.ResumeInterviewQuestions]
+
+
+def test_bank_only_when_resume_questions_are_disabled(prompts, monkeypatch):
+    monkeypatch.setattr(server, "INTERVIEW_RESUME_QUESTIONS", 0)
+    result = asyncio.run(server.assemble_interview_questions(RESUME))
+    assert [q["question"] for q in result["behavioral_questions"]] == [f"Generic {i}?" for i in range(5)]
+    assert [schema for schema, _ in prompts] == [server.InterviewQuestionSet]
@@ -0,0 +1,100 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from jobs import JobQueue  # noqa: E402
+
+
+async def noop(params):
+    return None
+
+
+def make_queue(collection):
+    queue = JobQueue(collection, max_queued=10)
+    queue.register("noop", noop)
+    # Local queue without worker tasks, so jobs stay queued
+    queue._queue = asyncio.Queue(maxsize=queue.max_queued)
+    return queue
+
+
+async def expire(collection, **query):
+    await collection.update_many(query, {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}})
+
+
+def test_queued_jobs_are_only_recovered_after_their_process_stops_renewing():
+    async def scenario():
+        collection = mongomock_motor.AsyncMongoMockClient().db.jobs
+        first, second = make_queue(collection), make_queue(collection)
+        for _ in range(3):
+            await first.submit("noop", {})
+
+        # Fresh leases: neither the submitter nor another process re-enqueues them
+        assert await first.recover() == 0
+        assert await second.recover() == 0
+        assert first.queued == 3 and second.queued == 0
+
+        # The submitter died: its leases lapse and exactly one sweep takes the jobs over
+        await expire(collection, status="queued")
+        assert await second.recover() == 3
+        assert await second.recover() == 0
+        third = make_queue(collection)
+        assert await third.recover() == 0
+        assert second.queued == 3
+
+    asyncio.run(scenario())
+
+
+def test_sweep_renews_leases_of_locally_queued_jobs():
+    async def scenario():
+        collection = mongomock_motor.AsyncMongoMockClient().db.jobs
+        first, second = make_queue(collection), make_queue(collection)
+        job_id = await first.submit("noop", {})
+        await expire(collection, id=job_id)
+
+        await first.recover()
+        assert await second.recover() == 0
+        job = await collection.find_one({"id": job_id})
+        assert job["lease_expires_at"] > datetime.utcnow()
+
+    asyncio.run(scenario())
+
+
+def test_running_jobs_with_expired_lease_are_requeued():
+    async def scenario():
+        collection = mongomock_motor.AsyncMongoMockClient().db.jobs
+        first, second = make_queue(collection), make_queue(collection)
+        job_id = await first.submit("noop", {})
+        first._pending.discard(job_id)
+        assert await first._claim(job_id) is not None
+        await expire(collection, id=job_id)
+
+        assert await second.recover() == 1
+        assert (await collection.find_one({"id": job_id}))["status"] == "queued"
+
+    asyncio.run(scenario())
+
+
+def test_abandoned_jobs_run_their_give_up_hook():
+    async def scenario():
+        collection = mongomock_motor.AsyncMongoMockClient().db.jobs
+        released = []
+
+        async def release(params):
+            released.append(params)
+
+        queue = make_queue(collection)
+        queue.max_attempts = 1
+        queue.register("noop", noop, on_give_up=release)
+        job_id = await queue.submit("noop", {"files": ["spooled"]})
+        # Pretend it already crashed a worker max_attempts times
+        await collection.update_one({"id": job_id}, {"$set": {"attempts": 1}})
+        worker = asyncio.create_task(queue._worker())
+        await asyncio.wait_for(queue._queue.join(), 5)
+        worker.cancel()
+        assert released == [{"files": ["spooled"]}]
+        assert (await queue.get(job_id))["status"] == "failed"
+
+    asyncio.run(scenario())
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from json_stream import JSONItemStream, extract_json, repair_json
+
+ANSWER = {
+    "pros": ["Clear {structure}", "Uses \"quotes\" and \\ escapes"],
+    "cons": [{"text": "Too long, [see] page 3", "weight": 2}],
+    "suggestions": [],
+}
+TEXT = "Sure! Here is the analysis:\n```json\n" + json.dumps(ANSWER, indent=2) + "\n```\nHope it helps."
+
+
+def feed_in_chunks(parser, text, size):
+    items = []
+    for start in range(0, len(text), size):
+        items.extend(parser.feed(text[start:start + size]))
+    return items
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, len(TEXT)])
+def test_items_are_emitted_across_any_chunking(size):
+    parser = JSONItemStream()
+    items = feed_in_chunks(parser, TEXT, size)
+    assert items == [("pros", ANSWER["pros"][0]), ("pros", ANSWER["pros"][1]), ("cons", ANSWER["cons"][0])]
+    assert parser.complete
+    assert parser.result() == ANSWER
+
+
+def test_items_are_emitted_as_soon_as_they_close():
+    parser = JSONItemStream()
+    assert parser.feed('{"pros": ["one", "tw') == [("pros", "one")]
+    assert parser.feed('o"') == []
+    assert parser.feed(']') == [("pros", "two")]
+    assert not parser.complete and parser.result() is None
+
+
+def test_keys_filter_and_malformed_items_are_skipped():
+    parser = JSONItemStream(keys=["cons"])
+    assert parser.feed('{"pros": ["a"], "cons": [1, tru, 3]}') == [("cons", 1), ("cons", 3)]
+    assert parser.result() is None
+
+
+def test_extract_json_finds_the_object_without_repair():
+    assert extract_json(TEXT) == (ANSWER, False)
+    assert extract_json("no json here") == (None, False)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"pros": ["a", "b",], "cons": [],}', {"pros": ["a", "b"], "cons": []}),
+    ('```json\n{"pros": ["a", "b"], "cons": ["cut off', {"pros": ["a", "b"], "cons": ["cut off"]}),
+    ('{"pros": [{"text": "a"}, ', {"pros": [{"text": "a"}]}),
+    ('{"a": 1} trailing {"b": 2}', {"a": 1}),
+    ("nothing", None),
+])
+def test_repair_json(text, expected):
+    assert repair_json(text) == expected
+
+
+def test_extract_json_reports_repairs():
+    assert extract_json('{"pros": ["a",]}') == ({"pros": ["a"]}, True)
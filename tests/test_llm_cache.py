@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+import server  # noqa: E402
+import llm_cache  # noqa: E402
+from llm_cache import LLMResponseCache, LRUCache  # noqa: E402
+from llm_parsing import LLMResponseError  # noqa: E402
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic for the LRU's TTL"""
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_lru_entries_expire_after_their_ttl(clock):
+    cache = LRUCache(max_size=4, ttl=10)
+    cache.set("a", "1")
+    clock[0] += 9
+    assert cache.get("a") == "1"
+    # Reading does not extend the TTL; writing again does
+    clock[0] += 2
+    assert cache.get("a") is None and len(cache) == 0
+    cache.set("a", "2")
+    clock[0] += 9
+    assert cache.get("a") == "2"
+
+
+def test_lru_evicts_the_least_recently_used_entry(clock):
+    cache = LRUCache(max_size=2, ttl=10)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c"), len(cache)) == ("1", "3", 2)
+    # Overwriting an entry counts as a use and does not grow the cache
+    cache.set("a", "4")
+    cache.set("d", "5")
+    assert (cache.get("c"), cache.get("a"), len(cache)) == (None, "4", 2)
+
+
+def test_hits_and_misses_are_counted_per_tier(clock):
+    async def scenario():
+        collection = mongomock_motor.AsyncMongoMockClient().db.llm_cache
+        cache = LLMResponseCache(collection, max_size=2, memory_ttl=10)
+        assert await cache.get("a") is None
+        await cache.set("a", "1", model="m")
+        assert await cache.get("a") == "1"
+
+        # Expired in memory but still in Mongo: a Mongo hit that refills memory
+        clock[0] += 11
+        assert await cache.get("a") == "1"
+        assert await cache.get("a") == "1"
+
+        stats = cache.stats()
+        assert (stats["memory_hits"], stats["mongo_hits"], stats["misses"], stats["writes"]) == (2, 1, 1, 1)
+        assert stats["hit_rate"] == 0.75 and stats["memory_entries"] == 1
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def answers(monkeypatch):
+    """Queue of raw LLM answers; every call to the model pops the next one
+
+    An answer is either text from the route's primary provider or a
+    (text, provider) pair.
+    """
+    queue = []
+
+    async def complete(prompt, endpoint):
+        answer = queue.pop(0)
+        return answer if isinstance(answer, tuple) else (answer, server.llm_client.primary(endpoint))
+
+    cache = LLMResponseCache(mongomock_motor.AsyncMongoMockClient().db.llm_cache)
+    monkeypatch.setattr(server, "llm_cache", cache)
+    monkeypatch.setattr(server, "complete_llm", complete)
+    return queue
+
+
+def test_only_validated_answers_are_cached(answers):
+    async def scenario():
+        answers.extend(["not json", "still not json"])
+        with pytest.raises(LLMResponseError):
+            await server.get_ai_json("prompt", server.AnalysisFeedback, "suggestions", cache=True)
+        assert server.llm_cache.counters["writes"] == 0
+        assert await server.llm_cache.collection.count_documents({}) == 0
+
+        answers.append('Sure! {"pros": ["Clear"], "cons": [], "suggestions": []}')
+        first = await server.get_ai_json("prompt", server.AnalysisFeedback, "suggestions", cache=True)
+        second = await server.get_ai_json("prompt", server.AnalysisFeedback, "suggestions", cache=True)
+        assert first == second == {"pros": ["Clear"], "cons": [], "suggestions": []}
+        assert answers == [] and server.llm_cache.counters["memory_hits"] == 1
+
+        # The validated JSON is stored, not the chatty raw answer
+        document = await server.llm_cache.collection.find_one({})
+        assert document["response"] == '{"pros": ["Clear"], "cons": [], "suggestions": []}'
+
+    asyncio.run(scenario())
+
+
+def test_repaired_answers_are_cached_after_repair(answers):
+    async def scenario():
+        answers.extend(['{"pros": "Clear"}', '{"pros": ["Clear"], "cons": [], "suggestions": []}'])
+        await server.get_ai_json("prompt", server.AnalysisFeedback, "suggestions", cache=True)
+        document = await server.llm_cache.collection.find_one({})
+        assert document["response"] == '{"pros": ["Clear"], "cons": [], "suggestions": []}'
+
+    asyncio.run(scenario())
+
+
+def test_fallback_answers_are_not_cached(answers):
+    async def scenario():
+        answers.extend([
+            ('{"pros": ["Placeholder"], "cons": [], "suggestions": []}', "local"),
+            '{"pros": ["Clear"], "cons": [], "suggestions": []}',
+        ])
+        fallback = await server.get_ai_json("prompt", server.AnalysisFeedback, "suggestions", cache=True)
+        assert fallback["pros"] == ["Placeholder"]
+        assert await server.llm_cache.collection.count_documents({}) == 0
+
+        # The primary's answer is fetched (and cached) on the next request
+        primary = await server.get_ai_json("prompt", server.AnalysisFeedback, "suggestions", cache=True)
+        assert primary["pros"] == ["Clear"]
+        assert await server.llm_cache.collection.count_documents({}) == 1
+
+    asyncio.run(scenario())
+
+
+def test_upstream_errors_are_not_returned_to_the_client(monkeypatch):
+    async def failing(prompt, endpoint):
+        raise RuntimeError("400 Bad Request for url '...generateContent?key=secret-key'")
+
+    monkeypatch.setattr(server, "complete_llm", failing)
+    with pytest.raises(server.HTTPException) as error:
+        asyncio.run(server.get_ai_suggestions("prompt", endpoint="analysis"))
+    assert (error.value.status_code, error.value.detail) == (500, "AI service error")
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+import server
+from llm_client import LLMClient, LLMSaturatedError
+from llm_providers import LocalProvider, ProviderRouter
+
+
+def make_client(**options):
+    return LLMClient(ProviderRouter({"default": LocalProvider()}), "system", **options)
+
+
+async def hold(client, endpoint, release):
+    async with client.slot(endpoint):
+        await release.wait()
+
+
+def test_full_queue_is_rejected_immediately():
+    async def scenario():
+        client = make_client(max_in_flight=1, max_waiting=1, queue_timeout=5)
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(client, "quiz", release))
+        waiter = asyncio.ensure_future(hold(client, "quiz", release))
+        await asyncio.sleep(0)
+        assert (client.in_flight, client.waiting) == (1, 1)
+
+        with pytest.raises(LLMSaturatedError, match="queue is full"):
+            async with client.slot("quiz"):
+                pass
+        assert client.counters["rejected"] == 1
+
+        release.set()
+        await asyncio.gather(holder, waiter)
+        assert (client.in_flight, client.waiting) == (0, 0)
+
+    asyncio.run(scenario())
+
+
+def test_waiting_longer_than_the_queue_timeout_fails():
+    async def scenario():
+        client = make_client(max_in_flight=2, queue_timeout=0.05, endpoint_budgets={"quiz": 1})
+        release = asyncio.Event()
+        holders = [asyncio.ensure_future(hold(client, "analysis", release)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        # Blocked on the global limit after taking the endpoint budget
+        with pytest.raises(LLMSaturatedError, match="within 0.05s"):
+            async with client.slot("quiz"):
+                pass
+        assert client.counters["timeouts"] == 1 and client.waiting == 0
+
+        # The endpoint slot taken before the timeout was given back
+        release.set()
+        await asyncio.gather(*holders)
+        async with client.slot("quiz"):
+            assert client.in_flight == 1
+
+    asyncio.run(scenario())
+
+
+def test_endpoint_budget_queues_only_that_endpoint():
+    async def scenario():
+        client = make_client(max_in_flight=3, queue_timeout=0.05, endpoint_budgets={"quiz": 1})
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(client, "quiz", release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(LLMSaturatedError):
+            async with client.slot("quiz"):
+                pass
+        # Other endpoints still get the global slots quiz is not using
+        async with client.slot("analysis"):
+            async with client.slot("interview"):
+                assert client.in_flight == 3
+
+        release.set()
+        await holder
+
+    asyncio.run(scenario())
+
+
+def test_budgets_are_caps_below_the_global_limit():
+    with pytest.raises(ValueError, match="quiz"):
+        make_client(max_in_flight=4, endpoint_budgets={"analysis": 3, "quiz": 4})
+
+    # The shipped defaults add up to more than the global limit, each below it
+    budgets, limit = server.llm_client.endpoint_budgets, server.llm_client.max_in_flight
+    assert sum(budgets.values()) > limit and max(budgets.values()) < limit
+
+    async def scenario():
+        client = make_client(max_in_flight=limit, queue_timeout=0.05, endpoint_budgets=budgets)
+        busiest = max(budgets, key=budgets.get)
+        release = asyncio.Event()
+        holders = [asyncio.ensure_future(hold(client, busiest, release)) for _ in range(limit)]
+        await asyncio.sleep(0.1)
+        # The busiest endpoint stops at its budget and the rest of the global slots stay free
+        assert client.in_flight == budgets[busiest]
+        async with client.slot("analysis"):
+            assert client.in_flight == budgets[busiest] + 1
+        release.set()
+        await asyncio.gather(*holders, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+
+def test_complete_reports_the_answering_provider():
+    client = make_client()
+    assert asyncio.run(client.complete('Return {"a": 1}')) == ('{"a": 1}', "default")
+    assert client.counters["requests"] == 1 and client.in_flight == 0
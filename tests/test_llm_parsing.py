@@ -0,0 +1,111 @@
+import asyncio
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+
+from llm_parsing import MAX_REPAIR_INPUT_CHARS, LLMResponseError, ParseMetrics, parse_response
+
+
+class Question(BaseModel):
+    question: str
+    difficulty: str = "medium"
+
+
+class Answer(BaseModel):
+    summary: str
+    questions: List[Question]
+
+
+class Repairer:
+    """Stand-in repair call answering from a script and keeping the prompts"""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.prompts = []
+
+    async def __call__(self, prompt):
+        self.prompts.append(prompt)
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def parse(response, repair, metrics=None, payload=None):
+    metrics = metrics or ParseMetrics()
+    return asyncio.run(parse_response(response, Answer, repair, metrics, "quiz", payload=payload)), metrics
+
+
+def counts(metrics):
+    stats = metrics.stats()["quiz"]
+    return {outcome: count for outcome, count in stats.items() if count and outcome != "success_rate"}
+
+
+def test_valid_answers_need_no_repair():
+    repair = Repairer()
+    result, metrics = parse('Here: {"summary": "ok", "questions": [{"question": "Why?"}]}', repair)
+    # Only fields the model sent are returned
+    assert result == {"summary": "ok", "questions": [{"question": "Why?"}]}
+    assert repair.prompts == [] and counts(metrics) == {"valid": 1}
+
+
+def test_truncated_json_is_repaired_without_a_call():
+    repair = Repairer()
+    result, metrics = parse('{"summary": "ok", "questions": [{"question": "Why?"}', repair)
+    assert result["questions"] == [{"question": "Why?"}]
+    assert repair.prompts == [] and counts(metrics) == {"repaired_locally": 1}
+
+
+def test_invalid_list_items_are_pruned_locally():
+    repair = Repairer()
+    result, metrics = parse(
+        '{"summary": "ok", "questions": [{"question": "Why?"}, {"difficulty": "hard"}, "How?"]}', repair
+    )
+    assert result["questions"] == [{"question": "Why?"}]
+    assert repair.prompts == []
+    assert counts(metrics) == {"schema_errors": 1, "repaired_locally": 1}
+
+
+def test_a_list_with_no_valid_items_goes_to_the_llm():
+    repair = Repairer('{"summary": "ok", "questions": [{"question": "Fixed?"}]}')
+    result, metrics = parse('{"summary": "ok", "questions": [{"difficulty": "hard"}]}', repair)
+    assert result["questions"] == [{"question": "Fixed?"}]
+    assert len(repair.prompts) == 1 and "questions" in repair.prompts[0]
+    assert counts(metrics) == {"schema_errors": 1, "repaired_by_llm": 1}
+
+
+def test_errors_outside_lists_go_to_the_llm():
+    repair = Repairer('{"summary": "fixed", "questions": []}')
+    result, metrics = parse('{"questions": [{"question": "Why?"}]}', repair)
+    assert result == {"summary": "fixed", "questions": []}
+    assert "summary" in repair.prompts[0] and "Field required" in repair.prompts[0]
+    assert counts(metrics) == {"schema_errors": 1, "repaired_by_llm": 1}
+
+
+def test_answers_without_json_are_sent_to_the_llm_trimmed():
+    response = "I cannot help with that. " * 2000
+    repair = Repairer('{"summary": "ok", "questions": []}')
+    result, metrics = parse(response, repair)
+    assert result == {"summary": "ok", "questions": []}
+    assert "no complete JSON object found" in repair.prompts[0]
+    assert len(repair.prompts[0]) < MAX_REPAIR_INPUT_CHARS + 2000
+    assert counts(metrics) == {"invalid_json": 1, "repaired_by_llm": 1}
+
+
+def test_a_failed_repair_raises_and_is_counted():
+    repair = Repairer('{"summary": 3}')
+    with pytest.raises(LLMResponseError):
+        parse("nope", repair)
+
+    metrics = ParseMetrics()
+    with pytest.raises(RuntimeError):
+        parse("nope", Repairer(RuntimeError("upstream down")), metrics)
+    assert counts(metrics) == {"invalid_json": 1, "failed": 1}
+    assert metrics.stats()["quiz"]["success_rate"] == 0.0
+
+
+def test_a_parsed_payload_skips_extraction():
+    repair = Repairer()
+    result, _ = parse("not json at all", repair, payload={"summary": "streamed", "questions": []})
+    assert result == {"summary": "streamed", "questions": []} and repair.prompts == []
@@ -0,0 +1,135 @@
+import asyncio
+
+import httpx
+import pytest
+
+from llm_providers import (
+    MIN_LATENCY_SAMPLES,
+    LLMProvider,
+    LlmChatProvider,
+    LocalProvider,
+    ProviderRouter,
+    parse_latency_budgets,
+    parse_providers,
+    parse_routes,
+)
+
+
+class ScriptedProvider(LLMProvider):
+    kind = "scripted"
+
+    def __init__(self, answer="ok", delay=0.0, error=None):
+        super().__init__(answer)
+        self.answer = answer
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def complete(self, prompt, system_message):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.answer
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+def test_provider_interface_is_abstract():
+    with pytest.raises(TypeError):
+        LLMProvider()
+
+
+def test_spec_parsing():
+    providers = parse_providers("default=local,fast=local:tiny")
+    assert [provider.model_name for provider in providers.values()] == ["local", "local/tiny"]
+    assert parse_routes("suggestions=fast > default, quiz=default") == {
+        "suggestions": ["fast", "default"], "quiz": ["default"]
+    }
+    assert parse_latency_budgets("suggestions=2.5") == {"suggestions": 2.5}
+    with pytest.raises(ValueError):
+        parse_providers("default=nope:model")
+
+
+def test_unknown_providers_in_routes_are_rejected():
+    with pytest.raises(ValueError):
+        ProviderRouter({"default": ScriptedProvider()}, {"quiz": ["fast", "default"]})
+
+
+def test_local_provider_echoes_the_prompt_template():
+    prompt = 'Return a JSON object with:\n{"pros": ["text"], "cons": []}'
+    assert asyncio.run(LocalProvider().complete(prompt, "")) == '{"pros": ["text"], "cons": []}'
+
+
+def test_errors_fall_back_to_the_next_provider():
+    fast = ScriptedProvider("fast", error=RuntimeError("down"))
+    router = ProviderRouter({"default": ScriptedProvider("default"), "fast": fast}, {"quiz": ["fast", "default"]})
+    assert asyncio.run(router.complete("p", "s", "quiz")) == ("default", "default")
+    # Unrouted endpoints use the default provider only
+    assert asyncio.run(router.complete("p", "s", "analysis")) == ("default", "default")
+    assert fast.calls == 1
+    stats = router.stats()
+    assert stats["decisions"]["quiz"] == {"fallbacks": 1, "default": 1}
+    assert stats["providers"]["fast"]["errors"] == 1
+
+
+def test_last_provider_errors_propagate():
+    router = ProviderRouter({"default": ScriptedProvider(error=RuntimeError("down"))})
+    with pytest.raises(RuntimeError):
+        asyncio.run(router.complete("p", "s"))
+
+
+def test_latency_budget_cuts_off_all_but_the_last_provider():
+    slow = ScriptedProvider("slow", delay=1.0)
+    router = ProviderRouter(
+        {"default": ScriptedProvider("default", delay=0.05), "slow": slow},
+        {"quiz": ["slow", "default"]},
+        {"quiz": 0.01},
+    )
+    assert asyncio.run(router.complete("p", "s", "quiz")) == ("default", "default")
+    assert router.stats()["providers"]["slow"]["timeouts"] == 1
+
+
+def test_providers_slower_than_the_budget_are_skipped():
+    slow = ScriptedProvider("slow")
+    router = ProviderRouter(
+        {"default": ScriptedProvider("default"), "slow": slow},
+        {"quiz": ["slow", "default"]},
+        {"quiz": 0.5},
+    )
+    for _ in range(MIN_LATENCY_SAMPLES - 1):
+        router.provider_stats["slow"].observe(2.0)
+    asyncio.run(router.complete("p", "s", "quiz"))
+    assert slow.calls == 1
+
+    router.provider_stats["slow"].observe(2.0)
+    assert asyncio.run(router.complete("p", "s", "quiz")) == ("default", "default")
+    assert slow.calls == 1
+    assert router.stats()["decisions"]["quiz"]["skipped_slow"] == 1
+
+
+def test_stream_falls_back_before_the_first_chunk():
+    router = ProviderRouter(
+        {"default": ScriptedProvider("default"), "fast": ScriptedProvider(error=RuntimeError("down"))},
+        {"quiz": ["fast", "default"]},
+    )
+    assert asyncio.run(collect(router.stream("p", "s", "quiz"))) == ["default"]
+    assert router.stats()["decisions"]["quiz"] == {"fallbacks": 1, "default": 1}
+
+
+def test_gemini_stream_sends_the_api_key_in_a_header():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(429, text="quota exceeded")
+
+    provider = LlmChatProvider("secret-key", "gemini", "gemini-2.0-flash")
+    provider._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with pytest.raises(httpx.HTTPStatusError) as error:
+        asyncio.run(collect(provider.stream("p", "s")))
+    assert requests[0].headers["x-goog-api-key"] == "secret-key"
+    assert "secret-key" not in str(requests[0].url)
+    assert "secret-key" not in str(error.value)
@@ -0,0 +1,66 @@
+from local_parser import group_entries, parse_experience, parse_projects, parse_resume_text
+
+RESUME = """Jane Doe
+jane.doe@example.com | (555) 123-4567 | Austin, TX
+
+Summary
+Backend engineer building reliable data services.
+
+Experience
+Senior Engineer | Acme Corp | Jan 2020 - Present
+- Led the migration to event-driven billing
+- Cut p95 latency by 40%
+Engineer | Initech | Jun 2016 - Dec 2019
+- Built internal reporting tools
+
+Education
+B.S. Computer Science, University of Texas, 2016
+
+Skills
+Languages: Python, Go, SQL
+Tools: Docker, Kubernetes
+
+Projects
+Resume Parser
+- Rule-based parser for PDF resumes
+Technologies: Python, regex
+Search Engine
+- Inverted index over job postings
+Tech stack: Go
+"""
+
+
+def test_well_formed_resume_parses_with_full_confidence():
+    result = parse_resume_text(RESUME)
+    parsed = result["parsed_data"]
+    assert parsed["personal_info"]["full_name"] == "Jane Doe"
+    assert [e["company"] for e in parsed["experience"]] == ["Acme Corp", "Initech"]
+    assert parsed["experience"][0]["is_current"]
+    assert result["section_confidence"]["experience"] == 1.0
+    assert result["section_confidence"]["projects"] == 1.0
+    assert result["confidence"] == 1.0
+
+
+def test_technologies_lines_continue_the_previous_project():
+    lines = RESUME.split("Projects\n", 1)[1].splitlines()
+    assert len(group_entries(lines)) == 2
+    projects, confidence = parse_projects(lines)
+    assert [p["name"] for p in projects] == ["Resume Parser", "Search Engine"]
+    assert [p["technologies"] for p in projects] == ["Python, regex", "Go"]
+    assert confidence == 1.0
+
+
+def test_entries_without_description_lower_confidence():
+    projects, confidence = parse_projects(["Resume Parser", "- Rule-based parser", "Search Engine"])
+    assert projects[1]["description"] == ""
+    assert confidence == 0.75
+
+    _, confidence = parse_experience(["Engineer | Initech | Jun 2016 - Dec 2019"])
+    assert confidence == 0.5
+
+
+def test_missing_core_sections_lower_document_confidence():
+    result = parse_resume_text("Jane Doe\njane.doe@example.com\n\nProjects\nResume Parser\n- Parser")
+    assert result["section_confidence"]["experience"] == 0.0
+    assert result["section_confidence"]["skills"] == 0.0
+    assert result["confidence"] < 0.5
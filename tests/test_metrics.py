@@ -0,0 +1,91 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from metrics import Metric, MetricsMiddleware, MetricsRegistry, MongoCommandMetrics
+
+
+def test_counter_and_gauge_rendering():
+    registry = MetricsRegistry()
+    requests = registry.counter("jobs_total", "Jobs by outcome", ("outcome",))
+    requests.inc("ok")
+    requests.inc("ok", amount=2)
+    requests.inc('bad "quoted"\nvalue')
+    registry.gauge("queue_depth", "Queued work", function=lambda: 3)
+
+    assert registry.render() == "\n".join([
+        "# HELP jobs_total Jobs by outcome",
+        "# TYPE jobs_total counter",
+        'jobs_total{outcome="ok"} 3',
+        'jobs_total{outcome="bad \\"quoted\\"\\nvalue"} 1',
+        "# HELP queue_depth Queued work",
+        "# TYPE queue_depth gauge",
+        "queue_depth 3",
+    ]) + "\n"
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value, "/a")
+
+    assert histogram.samples() == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1.0"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 2.65',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_metric_subclasses_must_define_samples():
+    class Incomplete(Metric):
+        kind = "gauge"
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", "No samples")
+
+
+def test_registry_returns_existing_metrics_and_rejects_kind_changes():
+    registry = MetricsRegistry()
+    assert registry.counter("x", "X") is registry.counter("x", "X")
+    with pytest.raises(ValueError):
+        registry.gauge("x", "X")
+
+
+def test_middleware_labels_requests_by_route_template():
+    registry = MetricsRegistry()
+
+    async def endpoint():
+        pass
+
+    async def app(scope, receive, send):
+        scope["endpoint"] = endpoint
+        await send({"type": "http.response.start", "status": 404})
+
+    async def send(message):
+        pass
+
+    middleware = MetricsMiddleware(app, registry)
+    routes = SimpleNamespace(routes=[SimpleNamespace(path="/api/resume/{resume_id}", endpoint=endpoint)])
+    scope = {"type": "http", "method": "GET", "path": "/api/resume/123", "app": routes}
+    asyncio.run(middleware(scope, None, send))
+
+    samples = middleware.duration.samples()
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/resume/{resume_id}",status="404"} 1' in samples
+    assert middleware.in_flight.samples() == ["http_requests_in_flight 0"]
+
+
+def test_mongo_listener_times_commands_by_collection():
+    registry = MetricsRegistry()
+    listener = MongoCommandMetrics(registry)
+    listener.started(SimpleNamespace(command={"find": "resumes"}, command_name="find", request_id=1))
+    listener.succeeded(SimpleNamespace(command_name="find", request_id=1, duration_micros=1500))
+    listener.started(SimpleNamespace(command={"getMore": 42, "collection": "jobs"}, command_name="getMore", request_id=2))
+    listener.failed(SimpleNamespace(command_name="getMore", request_id=2, duration_micros=100))
+
+    samples = listener.duration.samples()
+    assert 'mongodb_command_duration_seconds_sum{command="find",collection="resumes"} 0.0015' in samples
+    assert listener.failures.samples() == ['mongodb_command_failures_total{command="getMore",collection="jobs"} 1']
@@ -0,0 +1,77 @@
+from prompt_serializer import TRUNCATION_MARKER, estimate_tokens, serialize_resume
+
+REPEAT = 60
+
+
+def words(word):
+    return " ".join([word] * REPEAT)
+
+
+# Entries newest first, as resumes are written; every trimmable field has its own marker word
+RESUME = {
+    "id": "r1",
+    "personal_info": {"full_name": "Ada Lovelace", "email": "ada@example.com", "phone": ""},
+    "summary": words("golf"),
+    "experience": [
+        {"id": "e1", "title": "TitleOne", "company": "Acme", "description": words("alpha")},
+        {"id": "e2", "title": "TitleTwo", "company": "Initech", "description": words("bravo")},
+        {"id": "e3", "title": "TitleThree", "company": "Globex", "description": words("charlie")},
+    ],
+    "education": [{"id": "d1", "degree": "BSc", "institution": "MIT", "relevant_coursework": words("foxtrot")}],
+    "skills": [{"category": "Languages", "skills": ["Python", ""]}],
+    "projects": [
+        {"id": "p1", "name": "ProjOne", "description": words("delta")},
+        {"id": "p2", "name": "ProjTwo", "description": words("echo")},
+    ],
+    "certifications": [{"id": "c1", "name": "CertOne"}, {"id": "c2", "name": "CertTwo"}],
+    "created_at": "2024-01-01T00:00:00",
+}
+
+# What happens, in order, as the budget shrinks
+TRIMMING_ORDER = [
+    ("shortened", "charlie"), ("shortened", "bravo"), ("shortened", "echo"), ("shortened", "delta"),
+    ("removed", "foxtrot"),
+    ("removed", "charlie"), ("removed", "bravo"), ("removed", "echo"), ("removed", "delta"),
+    ("removed", "CertTwo"), ("removed", "CertOne"), ("removed", "ProjTwo"), ("removed", "ProjOne"),
+    ("shortened", "golf"), ("shortened", "alpha"),
+    ("removed", "TitleThree"), ("removed", "TitleTwo"),
+]
+
+
+def events(text):
+    for _, word in TRIMMING_ORDER:
+        count = text.count(word)
+        if count == 0:
+            yield "removed", word
+        elif count < REPEAT and word.islower():
+            yield "shortened", word
+
+
+def test_without_a_budget_only_metadata_is_dropped():
+    serialized = serialize_resume(RESUME)
+    assert not serialized.truncated and serialized.tokens == estimate_tokens(serialized.text)
+    assert "r1" not in serialized.text and "2024" not in serialized.text and "Phone" not in serialized.text
+    assert list(events(serialized.text)) == []
+
+
+def test_content_is_trimmed_least_useful_first():
+    full = serialize_resume(RESUME).tokens
+    first_seen = {}
+    for budget in range(full, 0, -1):
+        serialized = serialize_resume(RESUME, budget)
+        assert serialized.tokens <= budget
+        assert serialized.truncated == (budget < full)
+        for event in events(serialized.text):
+            first_seen.setdefault(event, budget)
+        if "TitleTwo" not in serialized.text:
+            break
+    assert sorted(first_seen, key=first_seen.get, reverse=True) == TRIMMING_ORDER
+    # The newest role, contact details and skills survive every reduction
+    assert "Ada Lovelace" in serialized.text and "TitleOne" in serialized.text and "Python" in serialized.text
+
+
+def test_hard_cut_when_reductions_are_not_enough():
+    serialized = serialize_resume(RESUME, 5)
+    assert serialized.truncated and serialized.text.endswith(TRUNCATION_MARKER)
+    assert serialized.tokens <= 5
+    assert serialized.text.startswith("Name: Ada")
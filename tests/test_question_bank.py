@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from question_bank import QuestionBank, normalize_skill, spread  # noqa: E402
+
+
+def test_normalize_skill_keeps_language_punctuation():
+    assert normalize_skill("  C++ ") == "c++"
+    assert normalize_skill("C#") == "c#"
+    assert normalize_skill("Node.JS (backend)") == "node.js backend"
+
+
+def test_spread_splits_evenly_with_earlier_keys_first():
+    assert spread(5, [("", "a"), ("", "b")]) == {("", "a"): 3, ("", "b"): 2}
+    assert spread(1, [("", "a"), ("", "b")]) == {("", "a"): 1}
+
+
+def test_cold_bank_refills_in_one_capped_call_per_request():
+    async def scenario():
+        bank = QuestionBank(mongomock_motor.AsyncMongoMockClient().db.question_bank, refill_batch=4, refill_keys=3)
+        calls = []
+        release = asyncio.Event()
+
+        async def refill(counts, difficulty):
+            calls.append(counts)
+            await release.wait()
+
+        wanted = spread(15, [("", f"skill{i}") for i in range(10)])
+        found, shortfall = await bank.assemble("quiz", wanted, refill)
+        assert found == {} and shortfall == wanted
+        # A second request while the first refill runs takes the next keys
+        await bank.assemble("quiz", wanted, refill)
+        await asyncio.sleep(0)
+        assert [list(counts) for counts in calls] == [
+            [("", "skill0"), ("", "skill1"), ("", "skill2")],
+            [("", "skill3"), ("", "skill4"), ("", "skill5")],
+        ]
+        assert all(n == 4 for counts in calls for n in counts.values())
+        assert bank.stats()["refills_in_progress"] == 6
+
+        release.set()
+        await asyncio.gather(*bank._tasks)
+        assert bank.stats()["refills_in_progress"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_stocked_keys_are_sampled_without_refill():
+    async def scenario():
+        collection = mongomock_motor.AsyncMongoMockClient().db.question_bank
+        await collection.create_index([("kind", 1), ("question_hash", 1)], unique=True)
+        bank = QuestionBank(collection, min_stock=3)
+        key = ("", "python")
+        stored = await bank.add("quiz", [(key, "Easy", {"question": f"Python question {i}?"}) for i in range(5)])
+        assert stored == 5
+        assert await bank.add("quiz", [(key, "Easy", {"question": "python  QUESTION 0"})]) == 0
+
+        calls = []
+
+        async def refill(counts, difficulty):
+            calls.append(counts)
+
+        found, shortfall = await bank.assemble("quiz", {key: 2}, refill)
+        assert len(found[key]) == 2 and shortfall == {}
+        assert calls == []
+
+    asyncio.run(scenario())
@@ -0,0 +1,84 @@
+import pytest
+from fastapi import HTTPException
+
+from server import ResumePatch, build_resume_patch
+
+
+def build(**patch):
+    return build_resume_patch(ResumePatch(**patch))
+
+
+def assert_status(status_code, **patch):
+    with pytest.raises(HTTPException) as error:
+        build(**patch)
+    assert error.value.status_code == status_code
+
+
+def test_field_replacements():
+    extra_filter, update, array_filters = build(fields={"summary": "New", "personal_info.email": "a@b.c"})
+    assert update["$set"]["summary"] == "New"
+    assert update["$set"]["personal_info.email"] == "a@b.c"
+    assert "updated_at" in update["$set"]
+    assert extra_filter == {} and array_filters == []
+
+
+def test_section_replacement_is_validated():
+    _, update, _ = build(fields={"skills": [{"category": "Languages", "skills": ["Python"]}]})
+    assert update["$set"]["skills"] == [{"category": "Languages", "skills": ["Python"]}]
+
+
+@pytest.mark.parametrize("fields", [
+    {"personal_info": "x"},
+    {"skills": "x"},
+    {"experience": ["x"]},
+    {"summary": 3},
+    {"derived": {}},
+])
+def test_malformed_fields_are_rejected(fields):
+    assert_status(422, fields=fields)
+
+
+def test_item_operations():
+    extra_filter, update, array_filters = build(items=[
+        {"op": "add", "section": "projects", "value": {"name": "CLI"}},
+        {"op": "update", "section": "experience", "item_id": "e1", "value": {"title": "Lead"}},
+        {"op": "update", "section": "experience", "item_id": "e1", "value": {"company": "Acme"}},
+        {"op": "remove", "section": "education", "item_id": "d1"},
+    ])
+    assert update["$push"]["projects"]["$each"][0]["name"] == "CLI"
+    assert update["$set"]["experience.$[i0].title"] == "Lead"
+    assert update["$set"]["experience.$[i0].company"] == "Acme"
+    # One filter per targeted item, each used by the update
+    assert array_filters == [{"i0.id": "e1"}]
+    assert update["$pull"] == {"education": {"id": {"$in": ["d1"]}}}
+    assert extra_filter == {"$and": [{"experience.id": "e1"}, {"education.id": "d1"}]}
+
+
+def test_update_without_value_is_rejected():
+    assert_status(422, items=[{"op": "update", "section": "experience", "item_id": "e1", "value": {}}])
+
+
+def test_update_of_unknown_or_id_field_is_rejected():
+    assert_status(422, items=[{"op": "update", "section": "experience", "item_id": "e1", "value": {"id": "x"}}])
+    assert_status(422, items=[{"op": "update", "section": "experience", "item_id": "e1", "value": {"salary": 1}}])
+
+
+def test_missing_item_id_is_rejected():
+    assert_status(422, items=[{"op": "remove", "section": "experience"}])
+
+
+def test_same_field_updated_twice_conflicts():
+    assert_status(409, items=[
+        {"op": "update", "section": "experience", "item_id": "e1", "value": {"title": "A"}},
+        {"op": "update", "section": "experience", "item_id": "e1", "value": {"title": "B"}},
+    ])
+
+
+def test_mixed_operators_on_one_section_conflict():
+    assert_status(409, items=[
+        {"op": "add", "section": "experience", "value": {"title": "A"}},
+        {"op": "remove", "section": "experience", "item_id": "e1"},
+    ])
+    assert_status(409, fields={"experience": []}, items=[
+        {"op": "remove", "section": "experience", "item_id": "e1"},
+    ])
@@ -0,0 +1,64 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from search_index import SEARCH_COLLECTION, SearchIndex  # noqa: E402
+
+
+def resume(resume_id, summary):
+    return {"id": resume_id, "summary": summary}
+
+
+def test_search_ranks_matching_resumes():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient().db
+        index = SearchIndex()
+        await index.index_resume(db, resume("a", "python django postgres"))
+        await index.index_resume(db, resume("b", "java spring"))
+        await index.index_resume(db, resume("c", "python python flask"))
+        total, ranked = index.search("python")
+        assert total == 2
+        assert [resume_id for resume_id, _ in ranked] == ["c", "a"]
+
+    asyncio.run(scenario())
+
+
+def test_sync_picks_up_writes_that_land_behind_the_watermark():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient().db
+        reader, writer = SearchIndex(sync_interval=0), SearchIndex()
+        await writer.index_resume(db, resume("a", "python"))
+        await reader.load(db)
+
+        # Another worker with a slow clock (or an earlier-stamped, later commit)
+        await writer.index_resume(db, resume("b", "golang"))
+        await db[SEARCH_COLLECTION].update_one(
+            {"resume_id": "b"}, {"$set": {"indexed_at": reader.watermark - timedelta(seconds=2)}}
+        )
+        await reader.sync(db)
+        assert reader.search("golang")[0] == 1
+
+    asyncio.run(scenario())
+
+
+def test_rereads_and_stale_vectors_do_not_replace_newer_ones():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient().db
+        index = SearchIndex(sync_interval=0)
+        await index.index_resume(db, resume("a", "python"))
+        assert index.doc_versions["a"] == 1
+
+        added = []
+        index.add = lambda resume_id, terms: added.append(resume_id)
+        await index.sync(db)
+        # Same version as applied: the re-read is skipped
+        assert added == []
+        del index.add
+
+        index._apply({"resume_id": "a", "terms": {"cobol": 1}, "version": 0, "indexed_at": datetime.utcnow()})
+        assert index.search("cobol")[0] == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,37 @@
+import asyncio
+import json
+
+import server
+
+
+def events(response):
+    async def read():
+        return "".join([chunk async for chunk in response.body_iterator])
+
+    blocks = [block for block in asyncio.run(read()).split("\n\n") if block]
+    return [(block.split("\n")[0][7:], json.loads(block.split("\n")[1][6:])) for block in blocks]
+
+
+def test_upstream_errors_are_not_forwarded_to_the_client(monkeypatch):
+    async def failing_stream(prompt, endpoint):
+        raise RuntimeError("Client error '429' for url '...streamGenerateContent?alt=sse&key=secret-key'")
+        yield ""
+
+    monkeypatch.setattr(server, "stream_llm", failing_stream)
+    response = server.stream_ai_response("prompt", "analysis", server.AnalysisFeedback, server.passthrough)
+    assert events(response) == [("error", {"status_code": 500, "detail": "AI service error"})]
+
+
+def test_items_then_result_are_streamed(monkeypatch):
+    async def answer(prompt, endpoint):
+        for chunk in ['{"pros": ["Clear"', ', "Concise"], "cons": [], "suggestions": ["Quantify"]}']:
+            yield chunk
+
+    monkeypatch.setattr(server, "stream_llm", answer)
+    response = server.stream_ai_response("prompt", "analysis", server.AnalysisFeedback, server.passthrough)
+    assert events(response) == [
+        ("item", {"key": "pros", "item": "Clear"}),
+        ("item", {"key": "pros", "item": "Concise"}),
+        ("item", {"key": "suggestions", "item": "Quantify"}),
+        ("result", {"pros": ["Clear", "Concise"], "cons": [], "suggestions": ["Quantify"]}),
+    ]
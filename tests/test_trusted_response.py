@@ -0,0 +1,45 @@
+import json
+from datetime import datetime
+
+from server import Resume, trusted_response
+
+
+def body(response):
+    return json.loads(response.body)
+
+
+def stored_resume(**overrides):
+    document = Resume(personal_info={"full_name": "Ada"}, summary="Engineer").dict()
+    document["_id"] = "mongo-object-id"
+    document.update(overrides)
+    return document
+
+
+def test_stored_resume_matches_validated_response():
+    document = stored_resume()
+    expected = json.loads(Resume(**document).model_dump_json())
+    assert body(trusted_response(Resume, document)) == expected
+
+
+def test_missing_plain_defaults_are_filled():
+    document = stored_resume()
+    del document["certifications"], document["derived"], document["summary"]
+    content = body(trusted_response(Resume, document))
+    assert content["certifications"] == [] and content["derived"] is None and content["summary"] == ""
+    assert "_id" not in content
+
+
+def test_legacy_document_without_personal_info_is_validated():
+    document = stored_resume()
+    del document["personal_info"]
+    content = body(trusted_response(Resume, document))
+    assert content["personal_info"]["full_name"] == ""
+    assert content["created_at"] == document["created_at"].isoformat()
+
+
+def test_legacy_document_without_created_at_is_validated():
+    document = stored_resume(updated_at=datetime(2020, 1, 2, 3, 4, 5))
+    del document["created_at"]
+    content = body(trusted_response(Resume, document))
+    assert content["updated_at"] == "2020-01-02T03:04:05"
+    assert "created_at" in content
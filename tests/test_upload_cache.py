@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from upload_cache import UploadCache  # noqa: E402
+
+
+def test_lookups_do_not_write_and_hits_are_counted_in_process():
+    async def scenario():
+        collection = mongomock_motor.AsyncMongoMockClient().db.upload_cache
+        cache = UploadCache(collection)
+        digest = cache.digest(b"resume")
+
+        assert await cache.get(digest, 6) is None
+        await cache.put(digest, 6, "raw text")
+        assert (await cache.get(digest, 6))["raw_text"] == "raw text"
+        await cache.put(digest, 6, "raw text", {"summary": "Engineer"})
+        stored = await collection.find_one({"_id": digest})
+
+        for _ in range(3):
+            assert (await cache.get(digest, 6))["parsed_data"] == {"summary": "Engineer"}
+        assert await collection.find_one({"_id": digest}) == stored
+        assert "hits" not in stored
+
+        stats = cache.stats()
+        assert (stats["misses"], stats["partial_hits"], stats["hits"]) == (1, 1, 3)
+        assert stats["bytes_saved"] == 18 and stats["hit_rate"] == 0.6
+
+    asyncio.run(scenario())
+
+
+def test_entries_expire_from_their_creation_time():
+    async def scenario():
+        collection = mongomock_motor.AsyncMongoMockClient().db.upload_cache
+        await UploadCache(collection, ttl=3600).ensure_indexes()
+        indexes = await collection.index_information()
+        assert any(
+            index["key"] == [("created_at", 1)] and index.get("expireAfterSeconds") == 3600
+            for index in indexes.values()
+        )
+
+    asyncio.run(scenario())